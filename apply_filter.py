@@ -1,22 +1,37 @@
-from signalprocessing.filter import butterlowpass
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+import argparse
+import hashlib
+import json
+import os
+
+from signalprocessing.filter import butterlowpass_batch, plot_filter_comparison
+from signalprocessing.quaternion import quaternion_to_euler
+from signalprocessing.outlier import interpolate_nan, remove_outliers_with_hampel
+from storage.backends import STORAGE_BACKENDS, read_recording, storage_for_path
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+RAW_DATA_SUFFIX = "_raw_data"
+FILT_DATA_SUFFIX = "_filt_data"
+# Per-session record of the processed recordings, used to skip them on the next run
+MANIFEST_NAME = ".apply_filter_manifest.json"
+
 def remove_outliers_with_z_score(data, threshold=3):
     """
     Removes outliers based on Z-score.
     
     Args:
-        data (numpy array): The input data array.
+        data (numpy array): The input data array of shape (N,) or (N, C). Every column is scored separately.
         threshold (float): The Z-score threshold above which data is considered an outlier.
 
     Returns:
         numpy array: The data with outliers replaced by NaN.
     """
     data = data.astype(float) 
-    mean = np.mean(data)
-    std = np.std(data)
+    mean = np.mean(data, axis=0)
+    std = np.std(data, axis=0)
     z_scores = (data - mean) / std
     is_outlier = np.abs(z_scores) > threshold
     if np.any(is_outlier):
@@ -28,15 +43,15 @@ def remove_outliers_with_iqr(data, multiplier=1.5):
     Removes outliers based on the Interquartile Range (IQR).
 
     Args:
-        data (numpy array): The input data array.
+        data (numpy array): The input data array of shape (N,) or (N, C). Every column has its own range.
         multiplier (float): The multiplier for the IQR to define outliers.
 
     Returns:
         numpy array: The data with outliers replaced by NaN.
     """
     data = data.astype(float)
-    q1 = np.percentile(data, 25)
-    q3 = np.percentile(data, 75)
+    q1 = np.percentile(data, 25, axis=0)
+    q3 = np.percentile(data, 75, axis=0)
     iqr = q3 - q1
     lower_bound = q1 - (multiplier * iqr)
     upper_bound = q3 + (multiplier * iqr)
@@ -47,64 +62,356 @@ def remove_outliers_with_iqr(data, multiplier=1.5):
     
     return data
 
-def filtering(df, SAMPLING_FREQUENCY, FPASS, FSTOP, GPASS, GSTOP, labellist, checkflag=False, remove_outlier_method="z-score"):
+QUATERNION_COLUMNS = ["quaternion_1", "quaternion_2", "quaternion_3", "quaternion_4"]
+QUATERNION_EULER_COLUMNS = ["quat_roll", "quat_pitch", "quat_yaw"]
+
+def derive_euler_from_quaternion(df):
+    """
+    Recompute the quaternion Euler angles from the quaternion columns.
+
+    Args:
+        df (pd.DataFrame): The data containing the quaternion_1..4 (w, x, y, z) columns.
+
+    Returns:
+        pd.DataFrame: The data with the quat_roll, quat_pitch and quat_yaw columns
+            recomputed (or added) in degrees.
+    """
+    missing = [column for column in QUATERNION_COLUMNS if column not in df.columns]
+    if missing:
+        print(f"Quaternion columns {missing} are missing. Euler angles are not derived.")
+        return df
+    df[QUATERNION_EULER_COLUMNS] = quaternion_to_euler(df[QUATERNION_COLUMNS].to_numpy())
+    return df
+
+def filtering(df, SAMPLING_FREQUENCY, FPASS, FSTOP, GPASS, GSTOP, labellist, checkflag=False, remove_outlier_method="z-score",
+              derive_quaternion_euler=False, hampel_window_sec=0.5, hampel_n_sigmas=3):
     """
     Label list must dropped "Time" label.
     Filter function doesn't need "Time" for the computation.
+    remove_outlier_method is "z-score", "iqr" or "hampel" (rolling median and MAD
+    over hampel_window_sec seconds), or None to keep outliers.
+    If derive_quaternion_euler is True, quat_roll/quat_pitch/quat_yaw are
+    recomputed from the filtered quaternion instead of being filtered as angles.
     """
     filtered_df = df.copy()
     SAMPLING_TIME = 1 / SAMPLING_FREQUENCY
+    labellist = list(labellist)
+    
+    # All columns are cleaned at once as a (samples x columns) matrix
+    # NaNを補完する（線形補間）
+    x = interpolate_nan(df[labellist].to_numpy(dtype=float))
+    
+    # 外れ値を除去してNaNにする
+    if remove_outlier_method == "z-score":
+        x = remove_outliers_with_z_score(x, threshold=3)
+    elif remove_outlier_method == "iqr":
+        x = remove_outliers_with_iqr(x)
+    elif remove_outlier_method == "hampel":
+        x = remove_outliers_with_hampel(x, window_size=int(hampel_window_sec * SAMPLING_FREQUENCY),
+                                        n_sigmas=hampel_n_sigmas)
     
-    for labelname in labellist:
-        x = df[labelname].to_numpy()
-        
-        # NaNを補完する（線形補間）
-        if np.any(np.isnan(x)):
-            x = pd.Series(x).interpolate().to_numpy()
-        
-        
-        # 外れ値を除去してNaNにする　3σ
-        if remove_outlier_method == "z-score":
-            x = remove_outliers_with_z_score(x, threshold=3)
-        elif remove_outlier_method == "iqr":
-            x = remove_outliers_with_iqr(x)
-        
-        # NaNを補完する（線形補間）
-        if np.any(np.isnan(x)):
-            x = pd.Series(x).interpolate().to_numpy()
-        
-        
-        # NaNを無視してフィルタリング
-        if not np.any(np.isnan(x)):
-            filtered_df[labelname] = butterlowpass(
-                x=x,  # Correctly pass the numpy array as 'x'
-                fpass=FPASS,
-                fstop=FSTOP,
-                gpass=GPASS,
-                gstop=GSTOP,
-                fs=SAMPLING_FREQUENCY,
-                dt=SAMPLING_TIME,
-                checkflag=checkflag,
-                labelname=labelname
-            )
+    # NaNを補完する（線形補間）
+    x = interpolate_nan(x)
+    
+    # NaNを無視してフィルタリング
+    is_valid = ~np.isnan(x).any(axis=0)
+    valid_labels = []
+    for labelname, valid in zip(labellist, is_valid):
+        if valid:
+            valid_labels.append(labelname)
         else:
             print(f"Column {labelname} contains NaN after interpolation and is skipped.")
     
+    if valid_labels:
+        # Filter all valid columns with a single filter design and a single call
+        x = x[:, is_valid]
+        y = butterlowpass_batch(x, FPASS, FSTOP, GPASS, GSTOP, SAMPLING_FREQUENCY)
+        filtered_df[valid_labels] = y
+        print(f"Applied filter against {len(valid_labels)} columns")
+        if checkflag:
+            for i, labelname in enumerate(valid_labels):
+                plot_filter_comparison(x[:, i], y[:, i], SAMPLING_TIME, labelname)
+    
+    if derive_quaternion_euler:
+        filtered_df = derive_euler_from_quaternion(filtered_df)
+    
     return filtered_df
 
     
+def find_recordings(paths):
+    """
+    Find the raw recordings below the given session directories or files.
+
+    Args:
+        paths (list of str): Recording files, session directories or the save_data_dir tree.
+
+    Returns:
+        list of str: The paths of the raw recordings ("*_raw_data" with a storage extension), sorted.
+    """
+    extensions = tuple(backend_class.EXTENSION for backend_class in STORAGE_BACKENDS.values())
+    recordings = set()
+    for path in paths:
+        if os.path.isfile(path):
+            recordings.add(os.path.abspath(path))
+            continue
+        for directory, _, file_names in os.walk(path):
+            for file_name in file_names:
+                name, extension = os.path.splitext(file_name)
+                if extension in extensions and name.endswith(RAW_DATA_SUFFIX):
+                    recordings.add(os.path.abspath(os.path.join(directory, file_name)))
+    return sorted(recordings)
+
+
+def output_path_for(raw_path):
+    """
+    Return the path of the processed file written next to a raw recording.
+
+    Args:
+        raw_path (str): The path of the raw recording.
+
+    Returns:
+        str: "<raw name>_filt_data" with the extension of the raw recording.
+    """
+    name, extension = os.path.splitext(raw_path)
+    return name + FILT_DATA_SUFFIX + extension
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """
+    Return the SHA-256 hex digest of the content of a file.
+
+    Args:
+        path (str): The file path.
+        chunk_size (int, optional): The number of bytes read at once.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(session_dir):
+    manifest_path = os.path.join(session_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(session_dir, manifest):
+    manifest_path = os.path.join(session_dir, MANIFEST_NAME)
+    temporary_path = manifest_path + ".tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temporary_path, manifest_path)
+
+
+def is_up_to_date(raw_path, params, manifest):
+    """
+    Check whether a recording was already processed with the same parameters.
+
+    The modification time and size are compared first. Only if they changed is
+    the content hash computed, so a copied or touched but unchanged recording is
+    still skipped. The manifest entry is then updated with the new modification time.
+
+    Args:
+        raw_path (str): The path of the raw recording.
+        params (dict): The processing parameters.
+        manifest (dict): The manifest of the session directory.
+
+    Returns:
+        bool: True if the recording does not need to be processed again.
+    """
+    entry = manifest.get(os.path.basename(raw_path))
+    if entry is None or entry.get("params") != params or not os.path.exists(output_path_for(raw_path)):
+        return False
+    stat = os.stat(raw_path)
+    if entry.get("mtime") == stat.st_mtime and entry.get("size") == stat.st_size:
+        return True
+    if entry.get("size") != stat.st_size or entry.get("sha256") != file_sha256(raw_path):
+        return False
+    entry["mtime"] = stat.st_mtime
+    return True
+
+
+def estimate_sampling_frequency(time):
+    """
+    Estimate the sampling frequency of a recording from its Time column.
+
+    Args:
+        time (numpy.ndarray): The sample times in seconds.
+
+    Returns:
+        float: The inverse of the median sampling period.
+    """
+    periods = np.diff(time[np.isfinite(time)])
+    periods = periods[periods > 0]
+    if len(periods) == 0:
+        raise ValueError("The sampling frequency cannot be estimated from the Time column.")
+    return 1 / np.median(periods)
+
+
+def process_recording(raw_path, params, force=False):
+    """
+    Filter one raw recording and write the result next to it.
+
+    Runs in a worker process. The output is written to a temporary file and
+    renamed, so an interrupted run never leaves a partial output behind.
+
+    Args:
+        raw_path (str): The path of the raw recording.
+        params (dict): The processing parameters (sampling_frequency, gpass, gstop,
+            remove_outlier_method, derive_quaternion_euler).
+        force (bool, optional): Whether to process the recording even if it is up to date.
+
+    Returns:
+        dict: The path, status ("processed", "skipped" or "failed"), number of rows,
+            number of input bytes, processing time and error message.
+    """
+    start_time = perf_counter()
+    result = {"path": raw_path, "status": "processed", "rows": 0, "bytes": 0, "seconds": 0.0, "error": None}
+    session_dir = os.path.dirname(raw_path)
+    manifest = load_manifest(session_dir)
+    try:
+        result["bytes"] = os.path.getsize(raw_path)
+        if not force and is_up_to_date(raw_path, params, manifest):
+            result["status"] = "skipped"
+            save_manifest(session_dir, manifest)
+            return result
+
+        stat = os.stat(raw_path)
+        df = read_recording(raw_path)
+        sampling_frequency = params["sampling_frequency"] or estimate_sampling_frequency(df["Time"].to_numpy())
+        fpass = int(sampling_frequency / 2.56)
+        fstop = int(sampling_frequency / 2)
+        # Time columns and the columns filtered during the measurement are not filtered again
+        labellist = [column for column in df.columns
+                     if not column.startswith("Time") and not column.endswith("_filt")]
+        filtered_df = filtering(df, sampling_frequency, fpass, fstop, params["gpass"], params["gstop"], labellist,
+                                False, params["remove_outlier_method"],
+                                derive_quaternion_euler=params["derive_quaternion_euler"])
+
+        output_path = output_path_for(raw_path)
+        temporary_path = os.path.join(session_dir, "." + os.path.basename(output_path))
+        storage_for_path(output_path).write(temporary_path, filtered_df)
+        os.replace(temporary_path, output_path)
+
+        # Reload the manifest, since another worker may have updated it while this one was filtering
+        manifest = load_manifest(session_dir)
+        manifest[os.path.basename(raw_path)] = {
+            "mtime": stat.st_mtime, "size": stat.st_size, "sha256": file_sha256(raw_path),
+            "params": params, "output": os.path.basename(output_path),
+        }
+        save_manifest(session_dir, manifest)
+        result["rows"] = len(df)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["seconds"] = perf_counter() - start_time
+    return result
+
+
+def process_session(raw_paths, params, force=False):
+    return [process_recording(raw_path, params, force) for raw_path in raw_paths]
+
+
+def process_recordings(raw_paths, params, max_workers=None, force=False):
+    """
+    Process many recordings in a pool of worker processes.
+
+    The recordings of one session are processed by the same worker, one after
+    the other, so the workers never write the same manifest at the same time.
+
+    Args:
+        raw_paths (list of str): The paths of the raw recordings.
+        params (dict): The processing parameters, see process_recording.
+        max_workers (int, optional): The number of worker processes. Defaults to the number of CPU cores.
+        force (bool, optional): Whether to process up-to-date recordings again.
+
+    Returns:
+        tuple: The list of per-recording results and the elapsed wall time in seconds.
+    """
+    sessions = {}
+    for raw_path in raw_paths:
+        sessions.setdefault(os.path.dirname(raw_path), []).append(raw_path)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(sessions) or 1))
+
+    start_time = perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(process_session, session_paths, params, force)
+                   for session_paths in sessions.values()]
+        for future in as_completed(futures):
+            for result in future.result():
+                results.append(result)
+                message = f"[{result['status']}] {result['path']}"
+                if result["status"] == "processed":
+                    message += f" ({result['rows']} rows, {result['seconds']:.2f}s)"
+                elif result["status"] == "failed":
+                    message += f": {result['error']}"
+                print(message)
+    return results, perf_counter() - start_time
+
+
+def format_throughput_summary(results, elapsed_time):
+    """
+    Format the number of processed recordings and the throughput of a batch run.
+
+    Args:
+        results (list of dict): The results of process_recording.
+        elapsed_time (float): The wall time of the run in seconds.
+
+    Returns:
+        str: The summary.
+    """
+    counts = {status: sum(result["status"] == status for result in results)
+              for status in ("processed", "skipped", "failed")}
+    processed = [result for result in results if result["status"] == "processed"]
+    rows = sum(result["rows"] for result in processed)
+    megabytes = sum(result["bytes"] for result in processed) / 1e6
+    worker_time = sum(result["seconds"] for result in processed)
+    lines = [
+        f"Recordings: {len(results)} found, {counts['processed']} processed, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed",
+        f"Elapsed: {elapsed_time:.2f}s wall, {worker_time:.2f}s in workers",
+    ]
+    if elapsed_time > 0 and processed:
+        lines.append(f"Throughput: {len(processed) / elapsed_time:.2f} recordings/s, "
+                     f"{rows / elapsed_time:,.0f} rows/s, {megabytes / elapsed_time:.2f} MB/s")
+    return "\n".join(lines)
+
+
 if __name__ == '__main__':
-    CSV_PATH = "data/20240831160108/20240831160108_measurement_raw_data.csv"
-    SAMPLING_FREQUENCY = 50
-    FPASS = int(SAMPLING_FREQUENCY / 2.56) #10 # int(SAMPLING_FREQUENCY / 2.56)
-    FSTOP = int(SAMPLING_FREQUENCY / 2) #15 # int(SAMPLING_FREQUENCY / 2)
-    GPASS = 3
-    GSTOP = 40
-    SAMPLING_RATE = 1 / SAMPLING_FREQUENCY
-    df = pd.read_csv(CSV_PATH, header=0)
-    labellist = df.columns.drop("Time")
-    filtered_df = filtering(df, SAMPLING_FREQUENCY, FPASS, FSTOP, GPASS, GSTOP, labellist, False, "iqr")
-    filtered_df.to_csv(CSV_PATH.replace('.csv', '_filt_data.csv'), sep=',', encoding='utf-8', index=False, header=True)
-    filtered_df.plot(x='Time', y='linear_accel_x', kind='line', figsize=(12, 6))
-    plt.savefig("graph.png")
-    
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Remove outliers and low-pass filter recorded sessions in parallel.")
+    parser.add_argument("paths", nargs="+", help="Raw recordings, session directories or the save_data_dir tree")
+    parser.add_argument("--fs", type=float, default=None,
+                        help="Sampling frequency [Hz] (default: estimated from the Time column of every recording)")
+    parser.add_argument("--gpass", type=float, default=3, help="Maximum passband loss [dB]")
+    parser.add_argument("--gstop", type=float, default=40, help="Minimum stopband attenuation [dB]")
+    parser.add_argument("--outlier-method", default="iqr", choices=["z-score", "iqr", "hampel", "none"],
+                        help="Outlier removal method")
+    parser.add_argument("--no-quaternion-euler", action="store_true",
+                        help="Filter quat_roll/quat_pitch/quat_yaw instead of deriving them from the quaternion")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of worker processes (default: CPU cores)")
+    parser.add_argument("--force", action="store_true", help="Process recordings that are already up to date")
+    args = parser.parse_args()
+
+    params = {
+        "sampling_frequency": args.fs,
+        "gpass": args.gpass,
+        "gstop": args.gstop,
+        "remove_outlier_method": None if args.outlier_method == "none" else args.outlier_method,
+        "derive_quaternion_euler": not args.no_quaternion_euler,
+    }
+    raw_paths = find_recordings(args.paths)
+    if not raw_paths:
+        print("No raw recordings found.")
+    else:
+        print(f"Processing {len(raw_paths)} recordings")
+        results, elapsed_time = process_recordings(raw_paths, params, args.jobs, args.force)
+        print(format_throughput_summary(results, elapsed_time))
@@ -0,0 +1,315 @@
+import os
+import sys
+import json
+import shutil
+import asyncio
+import argparse
+import platform
+import resource
+import datetime
+import tempfile
+import subprocess
+from time import perf_counter, process_time
+import numpy as np
+import pandas as pd
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from config.config_manager import ConfigDict
+from fusion.sensor_fusion import Sensors
+from storage.backends import read_recording, storage_for_path
+from utils.tools import DeadlineScheduler
+
+# Column schema of the synthetic recording: the BNO055 data columns followed by OBD-II columns
+STUB_COLUMNS = {
+    "bno055": ["linear_accel_x", "linear_accel_y", "linear_accel_z", "gyro_x", "gyro_y", "gyro_z",
+               "euler_x", "euler_y", "euler_z", "quat_roll", "quat_pitch", "quat_yaw",
+               "quaternion_1", "quaternion_2", "quaternion_3", "quaternion_4",
+               "magnetic_x", "magnetic_y", "magnetic_z",
+               "calibstat_sys", "calibstat_gyro", "calibstat_accel", "calibstat_mag"],
+    "obd": ["SPEED", "RPM", "THROTTLE_POS", "THROTTLE_POS_B"],
+}
+STAGES = ("collect", "convert", "buffer", "save", "iteration", "jitter")
+
+
+def write_stub_recording(path, n_samples=10000, sampling_frequency_hz=100):
+    """
+    Write a synthetic recording with the column schema of the real sensors.
+
+    Args:
+        path (str): The path of the recording file. The format follows the extension.
+        n_samples (int, optional): The number of samples.
+        sampling_frequency_hz (float, optional): The sampling frequency of the Time column.
+
+    Returns:
+        list of str: The data columns of the recording.
+    """
+    columns = [column for sensor_columns in STUB_COLUMNS.values() for column in sensor_columns]
+    df = pd.DataFrame(np.random.randn(n_samples, len(columns)), columns=columns)
+    df.insert(0, "Time", np.arange(n_samples) / sampling_frequency_hz)
+    storage_for_path(path).write(path, df)
+    return columns
+
+
+def build_config(recording_path, data_columns, sampling_frequency_hz, save_data_dir,
+                 sequence_length=5, storage_format="csv", is_realtime_filter=False, speed=0):
+    """
+    Build a configuration with a single replay sensor and no hardware.
+
+    Args:
+        recording_path (str): The recording replayed by the sensor.
+        data_columns (list of str): The replayed columns.
+        sampling_frequency_hz (float): The sampling frequency of the measurement loop.
+        save_data_dir (str): The directory receiving the recorded data.
+        sequence_length (int, optional): The length of the data buffer in seconds.
+        storage_format (str, optional): The storage format of the recorded data.
+        is_realtime_filter (bool, optional): Whether the real-time low-pass filter is enabled.
+        speed (float, optional): The replay speed. 0 returns the next recorded sample on every call.
+
+    Returns:
+        ConfigDict: The whole configuration with "sensors" and "master" sections.
+    """
+    fstop = sampling_frequency_hz / 2.5
+    filter_params = {"fpass": fstop / 2, "fstop": fstop, "gpass": 3, "gstop": 40,
+                     "is_filter": False, "is_realtime_filter": is_realtime_filter}
+    return ConfigDict({
+        "sensors": {
+            "replay": {
+                "sampling_frequency_hz": sampling_frequency_hz,
+                "sequence_length": sequence_length,
+                "path": recording_path,
+                "speed": speed,
+                "loop": True,
+                "data_columns": list(data_columns),
+                "filter_params": filter_params,
+                "save_data_dir": save_data_dir,
+                "is_show_real_time_data": False,
+            },
+        },
+        "master": {
+            "sampling_frequency_hz": sampling_frequency_hz,
+            "sequence_length": sequence_length,
+            "filter_params": filter_params,
+            "save_data_dir": save_data_dir,
+            "is_show_real_time_data": False,
+            "is_offline": True,
+            "timezone": "JST",
+            "storage_format": storage_format,
+            "acquisition_mode": "sequential",
+        },
+    })
+
+
+def summarize(durations):
+    """
+    Summarize stage durations.
+
+    Args:
+        durations (numpy.ndarray): The durations in seconds.
+
+    Returns:
+        dict: Count, mean, p50, p99 and max in microseconds.
+    """
+    if len(durations) == 0:
+        return {"count": 0, "mean_us": None, "p50_us": None, "p99_us": None, "max_us": None}
+    durations_us = np.asarray(durations) * 1e6
+    return {
+        "count": int(len(durations_us)),
+        "mean_us": float(durations_us.mean()),
+        "p50_us": float(np.percentile(durations_us, 50)),
+        "p99_us": float(np.percentile(durations_us, 99)),
+        "max_us": float(durations_us.max()),
+    }
+
+
+def current_rss_bytes():
+    """
+    Return the resident set size of the process, read from /proc on Linux.
+
+    Returns:
+        int or None: The RSS in bytes, or None if /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+async def run_measurement_loop(sensors, duration):
+    """
+    Run the measurement loop of sensor_fusion_main and time every stage.
+
+    Flushing the full data buffer is timed as the "save" stage, separately from
+    appending the sample ("buffer"). "jitter" is the delay between the scheduled
+    deadline and the actual start of an iteration.
+
+    Args:
+        sensors (Sensors): The sensors to measure.
+        duration (float): The measurement duration in seconds.
+
+    Returns:
+        dict: The stage durations in seconds, the number of iterations, the elapsed
+            time, the CPU time and the number of missed deadlines.
+    """
+    timings = {stage: [] for stage in STAGES}
+    scheduler = DeadlineScheduler(sensors.SAMPLING_TIME)
+    sensors.on_change_start_measurement()
+    sensors.start_sensor_workers()
+    iterations = 0
+    cpu_start_time = process_time()
+    main_loop_start_time = perf_counter()
+    scheduler.start(main_loop_start_time)
+    sensors.set_time_origin(main_loop_start_time)
+    try:
+        while sensors.is_running:
+            iteration_start_time = perf_counter()
+            # The current iteration was released at the deadline of scheduler.iteration
+            release_time = scheduler.start_time + scheduler.iteration * scheduler.period
+            current_time = iteration_start_time - main_loop_start_time
+            if current_time >= duration:
+                break
+
+            t0 = perf_counter()
+            data = sensors.collect_data()
+            t1 = perf_counter()
+            converted_data = sensors.convert_sample(current_time, data)
+            t2 = perf_counter()
+            if sensors.data_buffer.is_full():
+                await sensors.flush_data_buffer()
+                t3 = perf_counter()
+                timings["save"].append(t3 - t2)
+            else:
+                t3 = t2
+            await sensors.update_data_buffer(converted_data)
+            t4 = perf_counter()
+
+            timings["collect"].append(t1 - t0)
+            timings["convert"].append(t2 - t1)
+            timings["buffer"].append(t4 - t3)
+            timings["iteration"].append(t4 - iteration_start_time)
+            timings["jitter"].append(iteration_start_time - release_time)
+            iterations += 1
+            await scheduler.wait_next_async()
+    finally:
+        elapsed_time = perf_counter() - main_loop_start_time
+        cpu_time = process_time() - cpu_start_time
+        sensors.stop_sensor_workers()
+        sensors.on_change_stop_measurement()
+
+    finalize_start_time = perf_counter()
+    await sensors.finish_measurement_and_save_data()
+    finalize_time = perf_counter() - finalize_start_time
+    return {
+        "timings": timings,
+        "iterations": iterations,
+        "elapsed_s": elapsed_time,
+        "cpu_s": cpu_time,
+        "missed_deadlines": scheduler.missed_deadlines,
+        "finalize_s": finalize_time,
+    }
+
+
+def benchmark_measurement_loop(sampling_frequency_hz=100, duration=10, recording_path=None,
+                               storage_format="csv", is_realtime_filter=False, sequence_length=5):
+    """
+    Benchmark the measurement loop of Sensors with a replay sensor.
+
+    Args:
+        sampling_frequency_hz (float, optional): The sampling frequency of the measurement loop.
+        duration (float, optional): The measurement duration in seconds.
+        recording_path (str, optional): A recording to replay. Defaults to a synthetic recording
+                                        with the schema of the real sensors.
+        storage_format (str, optional): The storage format of the recorded data.
+        is_realtime_filter (bool, optional): Whether the real-time low-pass filter is enabled.
+        sequence_length (int, optional): The length of the data buffer in seconds.
+
+    Returns:
+        dict: The benchmark parameters, per-stage statistics, achieved rate, CPU usage and memory.
+    """
+    work_dir = tempfile.mkdtemp(prefix="vddm_benchmark_")
+    try:
+        if recording_path is None:
+            recording_path = os.path.join(work_dir, "stub_recording.bin")
+            data_columns = write_stub_recording(recording_path)
+        else:
+            data_columns = [column for column in read_recording(recording_path).columns if column != "Time"]
+        config = build_config(recording_path, data_columns, sampling_frequency_hz, work_dir,
+                              sequence_length, storage_format, is_realtime_filter)
+        sensors = Sensors(config["master"], system_config=config)
+        result = asyncio.run(run_measurement_loop(sensors, duration))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    elapsed_time = result["elapsed_s"]
+    return {
+        "sampling_frequency_hz": sampling_frequency_hz,
+        "duration_s": duration,
+        "columns": len(data_columns),
+        "storage_format": storage_format,
+        "is_realtime_filter": is_realtime_filter,
+        "iterations": result["iterations"],
+        "achieved_rate_hz": result["iterations"] / elapsed_time if elapsed_time > 0 else None,
+        "missed_deadlines": result["missed_deadlines"],
+        "cpu_percent": result["cpu_s"] / elapsed_time * 100 if elapsed_time > 0 else None,
+        "rss_bytes": current_rss_bytes(),
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,  # ru_maxrss is in KiB on Linux
+        "finalize_s": result["finalize_s"],
+        "stages": {stage: summarize(durations) for stage, durations in result["timings"].items()},
+    }
+
+
+def environment_info():
+    """
+    Describe the environment of a benchmark run, so results can be compared between commits.
+
+    Returns:
+        dict: The git commit, Python version, platform and time of the run.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=parent_dir, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def print_result(result):
+    print("{0:.0f}Hz: {1} iterations, {2:.1f}Hz achieved, {3} missed deadlines, CPU {4:.1f} %, RSS {5:.1f} MiB".format(
+        result["sampling_frequency_hz"], result["iterations"], result["achieved_rate_hz"],
+        result["missed_deadlines"], result["cpu_percent"], (result["rss_bytes"] or 0) / 2 ** 20))
+    for stage, stats in result["stages"].items():
+        if stats["count"]:
+            print("  {0:<10} n={1:<7} p50: {2:9.1f} us / p99: {3:9.1f} us / max: {4:9.1f} us".format(
+                stage, stats["count"], stats["p50_us"], stats["p99_us"], stats["max_us"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the measurement loop and storage pipeline.")
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 100, 1000], help="Sampling frequencies [Hz]")
+    parser.add_argument("--duration", type=float, default=10, help="Measurement duration per rate [s]")
+    parser.add_argument("--recording", default=None, help="Recording to replay (default: synthetic data)")
+    parser.add_argument("--storage-format", default="csv", help="Storage format of the recorded data")
+    parser.add_argument("--realtime-filter", action="store_true", help="Enable the real-time low-pass filter")
+    parser.add_argument("--sequence-length", type=int, default=5, help="Length of the data buffer [s]")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for rate in args.rates:
+        result = benchmark_measurement_loop(rate, args.duration, args.recording, args.storage_format,
+                                            args.realtime_filter, args.sequence_length)
+        print_result(result)
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment_info(), "results": results}, f, indent=2)
+        print(f"Results were written to {args.output}")
@@ -0,0 +1,136 @@
+import os
+import sys
+import shutil
+import asyncio
+import argparse
+import tempfile
+from time import perf_counter
+import numpy as np
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from signalprocessing.filter import StreamingLowpass, design_butterlowpass_sos
+from fusion.sensor_fusion import Sensors
+from benchmarks.measurement_loop import build_config, summarize, write_stub_recording
+from utils.tools import DeadlineScheduler
+
+
+def benchmark_streaming_filter(sampling_frequency_hz=100, n_columns=23, n_samples=10000,
+                               fpass=15, fstop=25, gpass=3, gstop=40):
+    """
+    Measure the per-tick cost of the real-time low-pass filter.
+
+    Args:
+        sampling_frequency_hz (float, optional): The sampling frequency of the simulated stream.
+        n_columns (int, optional): The number of filtered columns.
+        n_samples (int, optional): The number of ticks to measure.
+        fpass (float, optional): The passband frequency of the filter (Hz).
+        fstop (float, optional): The stopband frequency of the filter (Hz).
+        gpass (float, optional): The maximum loss in the passband (dB).
+        gstop (float, optional): The minimum attenuation in the stopband (dB).
+
+    Returns:
+        dict: Per-tick timings in microseconds and the share of the sampling period used.
+    """
+    sos = design_butterlowpass_sos(fpass, fstop, gpass, gstop, sampling_frequency_hz)
+    streaming_filter = StreamingLowpass(sos, n_columns)
+    samples = np.random.randn(n_samples, n_columns)
+    durations = np.empty(n_samples)
+    for i, sample in enumerate(samples):
+        start = perf_counter()
+        streaming_filter.process_sample(sample)
+        durations[i] = perf_counter() - start
+
+    durations_us = durations * 1e6
+    return {
+        "sections": len(sos),
+        "columns": n_columns,
+        "mean_us": float(durations_us.mean()),
+        "p50_us": float(np.percentile(durations_us, 50)),
+        "p99_us": float(np.percentile(durations_us, 99)),
+        "max_us": float(durations_us.max()),
+        "budget_percent": float(durations.mean() * sampling_frequency_hz * 100),
+    }
+
+
+async def time_buffer_updates(sensors, rows, is_paced):
+    # Time update_data_buffer per sample like the measurement loop: flushing a full buffer is not included
+    durations = np.empty(len(rows))
+    scheduler = DeadlineScheduler(sensors.SAMPLING_TIME)
+    scheduler.start(perf_counter())
+    for i, row in enumerate(rows):
+        if sensors.data_buffer.is_full():
+            await sensors.flush_data_buffer()
+        start = perf_counter()
+        await sensors.update_data_buffer(row)
+        durations[i] = perf_counter() - start
+        if is_paced:
+            await scheduler.wait_next_async()
+    return durations
+
+
+def benchmark_buffer_stage(sampling_frequency_hz=100, n_samples=1000, storage_format="chunked", is_paced=True):
+    """
+    Measure the per-tick cost of Sensors.update_data_buffer with and without the real-time filter.
+
+    This is the "buffer" stage of the measurement loop, including the in-place
+    filtering of the new row, with the column schema of the real sensors. By
+    default the ticks are paced at the sampling frequency like in the measurement
+    loop. Caches are then cold at every tick, which costs several times more than
+    back-to-back calls, so the paced numbers are the ones to compare with the
+    sampling period.
+
+    Args:
+        sampling_frequency_hz (float, optional): The sampling frequency of the measurement.
+        n_samples (int, optional): The number of ticks to measure.
+        storage_format (str, optional): The storage format of the flushed samples.
+        is_paced (bool, optional): Whether to wait for the next sampling deadline after every tick.
+
+    Returns:
+        dict: Per-tick statistics in microseconds keyed by "unfiltered" and "filtered",
+            and the share of the sampling period used by the filtered stage.
+    """
+    work_dir = tempfile.mkdtemp(prefix="vddm_benchmark_")
+    try:
+        recording_path = os.path.join(work_dir, "stub_recording.bin")
+        data_columns = write_stub_recording(recording_path, n_samples=10, sampling_frequency_hz=sampling_frequency_hz)
+        result = {"columns": len(data_columns)}
+        for name, is_realtime_filter in (("unfiltered", False), ("filtered", True)):
+            config = build_config(recording_path, data_columns, sampling_frequency_hz, work_dir,
+                                  storage_format=storage_format, is_realtime_filter=is_realtime_filter)
+            sensors = Sensors(config["master"], system_config=config)
+            rows = np.random.randn(n_samples, len(sensors.sample_schema.columns))
+            rows[:, 0] = np.arange(n_samples) / sampling_frequency_hz
+            result[name] = summarize(asyncio.run(time_buffer_updates(sensors, rows, is_paced)))
+        result["budget_percent"] = result["filtered"]["mean_us"] * 1e-6 * sampling_frequency_hz * 100
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the real-time low-pass filter.")
+    parser.add_argument("--fs", type=float, default=100, help="Sampling frequency [Hz]")
+    parser.add_argument("--columns", type=int, default=23, help="Number of filtered columns")
+    parser.add_argument("--samples", type=int, default=10000, help="Number of ticks to measure")
+    parser.add_argument("--buffer-samples", type=int, default=1000,
+                        help="Number of paced ticks to measure for the buffer stage")
+    parser.add_argument("--unpaced", action="store_true", help="Run the buffer stage ticks back to back")
+    args = parser.parse_args()
+
+    result = benchmark_streaming_filter(args.fs, args.columns, args.samples)
+    print("Streaming low-pass filter: {0} sections x {1} columns".format(result["sections"], result["columns"]))
+    print("per tick mean: {:.1f} us / p50: {:.1f} us / p99: {:.1f} us / max: {:.1f} us".format(
+        result["mean_us"], result["p50_us"], result["p99_us"], result["max_us"]))
+    print("share of the {:.0f}Hz sampling period: {:.3f} %".format(args.fs, result["budget_percent"]))
+
+    # The filter alone is not the whole cost of a tick: measure the buffer stage it runs in
+    result = benchmark_buffer_stage(args.fs, args.buffer_samples, is_paced=not args.unpaced)
+    print("Sensors.update_data_buffer ({0}): {1} data columns".format(
+        "back to back" if args.unpaced else "paced at {:.0f}Hz".format(args.fs), result["columns"]))
+    for name in ("unfiltered", "filtered"):
+        stats = result[name]
+        print("  {0:<10} mean: {1:.1f} us / p50: {2:.1f} us / p99: {3:.1f} us / max: {4:.1f} us".format(
+            name, stats["mean_us"], stats["p50_us"], stats["p99_us"], stats["max_us"]))
+    print("share of the {:.0f}Hz sampling period with the filter: {:.3f} %".format(args.fs, result["budget_percent"]))
@@ -0,0 +1,135 @@
+import threading
+from time import perf_counter
+
+
+def read_sensor_sample(sensor):
+    """
+    Read the latest sample of a sensor with the time at which it was acquired.
+
+    Sensors with a background poller return cached values that may be much older
+    than the read. If the sensor provides get_data_with_age, the sample is
+    stamped with the arrival time of its newest value instead of the read time.
+
+    Args:
+        sensor (object): The sensor instance providing get_data_from_sensor().
+
+    Returns:
+        tuple: A tuple (data, timestamp) with the sample and the perf_counter() time
+            at which it was acquired, or None if no value has been received yet.
+    """
+    get_data_with_age = getattr(sensor, "get_data_with_age", None)
+    if get_data_with_age is None:
+        data = sensor.get_data_from_sensor()
+        return data, perf_counter()
+    latest = get_data_with_age()
+    data = {column: value for column, (value, _, _) in latest.items()}
+    timestamps = [timestamp for _, timestamp, _ in latest.values() if timestamp is not None]
+    return data, max(timestamps) if timestamps else None
+
+
+class SampleSink:
+    """
+    Thread-safe store for the latest timestamped sample of every sensor.
+
+    Sensor workers push samples at their own rate and the measurement loop
+    reads a consistent snapshot of the newest sample of each sensor.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._timestamps = {}
+        self._counts = {}
+
+    def push(self, sensor_type, timestamp, data):
+        """
+        Store a new sample of a sensor, replacing the previous one.
+
+        Args:
+            sensor_type (str): The type of the sensor that produced the sample.
+            timestamp (float): The perf_counter() time at which the sample was acquired.
+            data (dict): The sample as returned by get_data_from_sensor.
+        """
+        with self._lock:
+            self._data[sensor_type] = data
+            self._timestamps[sensor_type] = timestamp
+            self._counts[sensor_type] = self._counts.get(sensor_type, 0) + 1
+
+    def snapshot(self):
+        """
+        Return the newest sample of every sensor.
+
+        Returns:
+            tuple: A tuple (data, timestamps) where data maps sensor types to their
+                latest sample and timestamps maps sensor types to the acquisition time.
+        """
+        with self._lock:
+            return dict(self._data), dict(self._timestamps)
+
+    def sample_counts(self):
+        """
+        Return the number of samples pushed by every sensor.
+
+        Returns:
+            dict: A dictionary mapping sensor types to sample counts.
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def clear(self):
+        """
+        Remove all stored samples and counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self._timestamps.clear()
+            self._counts.clear()
+
+
+class SensorWorker(threading.Thread):
+    """
+    Background worker that polls one sensor at its own sampling frequency.
+
+    Each sensor gets its own worker so that a blocking read (for example a slow
+    OBD query) never delays the other sensors.
+    """
+
+    def __init__(self, sensor_type, sensor, sampling_frequency_hz, sink):
+        """
+        Initialize the worker.
+
+        Args:
+            sensor_type (str): The type of the sensor, used as the key in the sink.
+            sensor (object): The sensor instance providing get_data_from_sensor().
+            sampling_frequency_hz (float): The native sampling frequency of the sensor.
+            sink (SampleSink): The sink receiving the timestamped samples.
+        """
+        super().__init__(name=f"{sensor_type}_acquisition_thread", daemon=True)
+        self.sensor_type = sensor_type
+        self.sensor = sensor
+        self.SAMPLING_TIME = 1 / sampling_frequency_hz
+        self.sink = sink
+        self._stop_event = threading.Event()
+
+    def run(self):
+        next_deadline = perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                data, timestamp = read_sensor_sample(self.sensor)
+                self.sink.push(self.sensor_type, timestamp, data)
+            except Exception as e:
+                print(f"Error in {self.name}: {e}")
+
+            # Keep absolute deadlines so that the rate does not drift
+            next_deadline += self.SAMPLING_TIME
+            wait_time = next_deadline - perf_counter()
+            if wait_time > 0:
+                self._stop_event.wait(wait_time)
+            else:
+                next_deadline = perf_counter()
+
+    def stop(self):
+        """
+        Request the worker to stop after the current read.
+        """
+        self._stop_event.set()
@@ -2,7 +2,7 @@ import os
 import sys
 import importlib
 from time import perf_counter
-from collections import defaultdict
+from collections import defaultdict, deque
 import pandas as pd
 import datetime
 import asyncio
@@ -14,9 +14,17 @@ parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(parent_dir)
 
 from config import config_manager
-from utils.tools import wait_process
+from utils.tools import DeadlineScheduler
+from utils.instrumentation import create_instrumentation
 from utils.visualize_data import format_sensor_fusion_data
-from signalprocessing.filter import butterlowpass
+from signalprocessing.filter import butterlowpass_batch, butterlowpass_chunked, design_butterlowpass_sos, StreamingLowpass
+from signalprocessing.resample import align_session
+from signalprocessing.outlier import StreamingHampel
+from utils.ring_buffer import RingBuffer
+from utils.shared_ring import SharedRingWriter
+from utils.sample_schema import SampleSchema
+from fusion.acquisition import SampleSink, SensorWorker, read_sensor_sample
+from storage.backends import create_storage
 
 config_path = os.path.join(parent_dir, "config", "measurement_system_config.yaml")
 
@@ -37,8 +45,19 @@ class SensorFactory:
         
 
 class Sensors:
-    def __init__(self, config):
-        self.config = config_manager.load_config(config_path)
+    # Number of samples read at once when filtering a recording file
+    FILTER_CHUNK_ROWS = 10000
+
+    def __init__(self, config, system_config=None):
+        """
+        Initialize the sensors and the data buffer.
+
+        Args:
+            config (dict): The master section of the configuration.
+            system_config (dict, optional): The whole configuration holding the "sensors" section.
+                                            Defaults to the configuration file.
+        """
+        self.config = config_manager.load_config(config_path) if system_config is None else system_config
         self.sensor_list = tuple(self.config.sensors.keys())
         self.sensor_instances = {}
         self.is_running = False
@@ -47,7 +66,10 @@ class Sensors:
         self.SAMPLING_FREQUENCY_HZ = config.sampling_frequency_hz
         self.SAMPLING_TIME = 1 / self.SAMPLING_FREQUENCY_HZ
         self.SAVE_DATA_DIR = config.save_data_dir
-        self.SAVE_BUF_CSVDATA_PATH = self.SAVE_DATA_DIR + "/" + "measurement_raw_data.csv"
+        # Storage format of recorded data: "csv", "binary" or "parquet"
+        self.STORAGE_FORMAT = getattr(config, "storage_format", "csv")
+        self.storage = create_storage(self.STORAGE_FORMAT)
+        self.SAVE_BUF_DATA_PATH = self.SAVE_DATA_DIR + "/" + "measurement_raw_data" + self.storage.EXTENSION
         self.SEQUENCE_LENGTH = int(config.sequence_length) # Windows size [s]
         # Buffer size is determined by the relation of sequence length and sampling frequency
         # Buffer secures data for SEQUENCE_LENGTH[s]
@@ -57,16 +79,52 @@ class Sensors:
         self.GPASS = config.filter_params.gpass
         self.GSTOP = config.filter_params.gstop
         self.is_filter = config.filter_params.is_filter
+        # Causal low-pass filter applied to every sample during the measurement
+        self.is_realtime_filter = getattr(config.filter_params, "is_realtime_filter", False)
+        self.streaming_filter = None
+        # Window of the causal Hampel filter applied before the real-time filter. 0 disables it.
+        self.realtime_hampel_window_sec = getattr(config.filter_params, "realtime_hampel_window_sec", 0)
+        self.streaming_outlier_filter = None
         self.is_show_real_time_data = config.is_show_real_time_data
+        # Maximum refresh rate of the real-time display, independent of the sampling frequency
+        self.DISPLAY_RATE_HZ = getattr(config, "display_rate_hz", 10)
         self.TIMEZONE = config.timezone
+        # "sequential": poll every sensor in the main loop
+        # "threaded": poll every sensor in its own worker at its native sampling frequency
+        self.ACQUISITION_MODE = getattr(config, "acquisition_mode", "sequential")
+        self.sample_sink = SampleSink()
+        self.sensor_workers = []
+        # Per-stage timings and event counters of the measurement loop, saved next to the recording
+        self.instrumentation = create_instrumentation(getattr(config, "is_instrumentation", False))
         self.all_data_columns_list = ()
         for sensor_name in self.sensor_list:
             self.all_data_columns_list += tuple(self.config["sensors"][sensor_name]["data_columns"])            
+        # Store the acquisition time of every sensor sample in a "Time_<sensor>" column
+        self.is_sensor_timestamps = getattr(config, "is_sensor_timestamps", False)
+        # Slot layout of one sample, compiled once. Every tick is written into the same pre-allocated row.
+        self.sample_schema = SampleSchema(
+            {sensor_name: self.config["sensors"][sensor_name]["data_columns"] for sensor_name in self.sensor_list},
+            self.is_sensor_timestamps)
+        self.sample_row = self.sample_schema.new_row()
+        self.sensor_time_columns = self.sample_schema.time_columns[1:]
+        self.sample_timestamps = {}  # perf_counter() time of the latest sample of every sensor
+        self.time_origin = None  # perf_counter() time corresponding to Time == 0
             
         
 
         
-        self.data_buffer = pd.DataFrame()  # data buffer
+        self.data_buffer = None  # data buffer
+        # Set when the buffer length changes. The measurement loop then resizes the buffer between two samples.
+        self.is_buffer_resize_pending = False
+        self.reset_data_buffer()
+
+        # Publish every sample to a shared memory ring readable by other processes (utils/shared_ring.py)
+        self.SHARED_MEMORY_NAME = getattr(config, "shared_memory_name", None)
+        self.shared_ring = None
+        if self.SHARED_MEMORY_NAME:
+            self.shared_ring = SharedRingWriter(self.SHARED_MEMORY_NAME, self.data_buffer.columns,
+                                                getattr(config, "shared_memory_capacity", max(1, self.MAX_DATA_BUF_LEN)))
+            print(f"Publishing samples to shared memory '{self.SHARED_MEMORY_NAME}'")
     
         for sensor_type in self.sensor_list:
             sensor_config = self.config.sensors[sensor_type]
@@ -75,11 +133,67 @@ class Sensors:
                 self.sensor_instances[sensor_type] = sensor_instance
                 
                 
-        if os.path.exists(self.SAVE_BUF_CSVDATA_PATH):
-            os.remove(self.SAVE_BUF_CSVDATA_PATH)
-            print(f"File  '{self.SAVE_BUF_CSVDATA_PATH}' was deleted for initialization")                
+        if os.path.exists(self.SAVE_BUF_DATA_PATH):
+            os.remove(self.SAVE_BUF_DATA_PATH)
+            print(f"File  '{self.SAVE_BUF_DATA_PATH}' was deleted for initialization")                
     
 
+    def reset_data_buffer(self):
+        """
+        Allocate an empty ring buffer for the current buffer length.
+
+        The buffer holds the "Time" column followed by all sensor data columns and
+        is sized from MAX_DATA_BUF_LEN. Buffered samples are discarded, so during a
+        measurement the buffer is resized with resize_data_buffer instead. When sensor timestamps are
+        enabled, a "Time_<sensor>" column per sensor follows "Time". When the
+        real-time filter is enabled, a "<column>_filt" column is added for every
+        sensor data column and the filter state is reset for the current sampling
+        frequency.
+        """
+        columns = self.sample_schema.columns
+        # Index of the first sensor data column, after all time columns
+        self.data_column_start = self.sample_schema.data_start
+        if self.is_realtime_filter:
+            columns += tuple(column + "_filt" for column in self.all_data_columns_list)
+            self.reset_streaming_filter()
+        self.data_buffer = RingBuffer(columns=columns, capacity=max(1, self.MAX_DATA_BUF_LEN))
+        self.is_buffer_resize_pending = False
+
+    async def resize_data_buffer(self):
+        """
+        Save the buffered samples and reallocate the buffer for the current buffer length.
+
+        Must be called from the measurement loop, between two samples, so that no
+        sample is lost when the sampling frequency or the sequence length is changed
+        during a measurement. The real-time filter keeps its state unless the
+        sampling frequency it was designed for has changed.
+        """
+        await self.flush_data_buffer()
+        self.data_buffer = RingBuffer(columns=self.data_buffer.columns, capacity=max(1, self.MAX_DATA_BUF_LEN))
+        if self.is_realtime_filter and self.streaming_filter_frequency_hz != self.SAMPLING_FREQUENCY_HZ:
+            self.reset_streaming_filter()
+        self.is_buffer_resize_pending = False
+
+    def reset_streaming_filter(self):
+        """
+        Design the real-time low-pass filter for the current sampling frequency.
+
+        If the filter parameters are not valid for the sampling frequency, the
+        filtered columns are left empty (NaN). If realtime_hampel_window_sec is
+        set, outliers are replaced by a causal Hampel filter before the low-pass filter.
+        """
+        self.streaming_outlier_filter = None
+        self.streaming_filter_frequency_hz = self.SAMPLING_FREQUENCY_HZ
+        if self.realtime_hampel_window_sec > 0:
+            self.streaming_outlier_filter = StreamingHampel(
+                int(self.realtime_hampel_window_sec * self.SAMPLING_FREQUENCY_HZ), len(self.all_data_columns_list))
+        try:
+            sos = design_butterlowpass_sos(self.FPASS, self.FSTOP, self.GPASS, self.GSTOP, self.SAMPLING_FREQUENCY_HZ)
+            self.streaming_filter = StreamingLowpass(sos, len(self.all_data_columns_list))
+        except ValueError as e:
+            print(f"Invalid filter parameters for the real-time filter: {e}")
+            self.streaming_filter = None
+
     def get_sensor(self, sensor_type):
         """
         Retrieve the sensor instance corresponding to the specified sensor type.
@@ -99,7 +213,11 @@ class Sensors:
 
         This method iterates over all sensor instances and collects data from each sensor.
         The collected data is stored in a dictionary where the keys are sensor types and
-        the values are the data collected from the corresponding sensors.
+        the values are the data collected from the corresponding sensors. The time at
+        which each sample was acquired is kept in sample_timestamps. For sensors
+        with a background poller, this is the arrival time of the newest cached value.
+        In threaded acquisition mode, the latest sample of every sensor worker is
+        returned instead and no sensor is read in the calling thread.
 
         Returns:
             dict: A dictionary containing the collected data from all sensors.
@@ -109,17 +227,70 @@ class Sensors:
             Exception: If an error occurs while collecting data from any sensor, the exception
                     is caught and printed.
         """
+        if self.ACQUISITION_MODE == "threaded":
+            data, self.sample_timestamps = self.sample_sink.snapshot()
+            return data
+
         data = {}
         try:
             for sensor_type, sensor in self.sensor_instances.items():
                 # get data from sensors
-                data[sensor_type] = sensor.get_data_from_sensor()
+                data[sensor_type], self.sample_timestamps[sensor_type] = read_sensor_sample(sensor)
             return data
         except Exception as e:
+            self.instrumentation.increment("exceptions")
             print(e)
     
+    def start_sensor_workers(self):
+        """
+        Start the background acquisition of the sensors for a measurement.
+
+        Sensors with a background poller (start_polling, e.g. the OBD-II sensors
+        with is_async) start polling. In threaded mode, one acquisition worker per
+        sensor is also started. Every worker polls its sensor at the
+        sampling_frequency_hz declared in the sensor section of the configuration
+        and pushes timestamped samples into the shared sample sink read by collect_data.
+        """
+        for sensor in self.sensor_instances.values():
+            start_polling = getattr(sensor, "start_polling", None)
+            if start_polling is not None:
+                start_polling()
+        if self.ACQUISITION_MODE != "threaded" or self.sensor_workers:
+            return
+        self.sample_sink.clear()
+        for sensor_type, sensor in self.sensor_instances.items():
+            sampling_frequency_hz = self.config.sensors[sensor_type].sampling_frequency_hz
+            worker = SensorWorker(sensor_type, sensor, sampling_frequency_hz, self.sample_sink)
+            worker.start()
+            self.sensor_workers.append(worker)
+            print(f"Started {worker.name} at {sampling_frequency_hz}Hz")
+
+    def stop_sensor_workers(self):
+        """
+        Stop all acquisition workers and sensor pollers and wait for them to finish.
+        """
+        for worker in self.sensor_workers:
+            worker.stop()
+        for worker in self.sensor_workers:
+            worker.join()
+        self.sensor_workers = []
+        for sensor in self.sensor_instances.values():
+            stop_polling = getattr(sensor, "stop_polling", None)
+            if stop_polling is not None:
+                stop_polling()
     
 
+    def set_time_origin(self, start_time):
+        """
+        Set the perf_counter() time at which the measurement time ("Time") is zero.
+
+        The per-sensor acquisition timestamps are stored relative to this time.
+
+        Args:
+            start_time (float): The perf_counter() time of the start of the main loop.
+        """
+        self.time_origin = start_time
+
     def on_change_start_measurement(self):
         """
         Start the measurement process.
@@ -143,8 +314,8 @@ class Sensors:
         """
         Apply a low-pass filter to the specified columns in the DataFrame.
     
-        This method applies a Butterworth low-pass filter to each column specified
-        in the labellist. The "Time" column should be excluded from the labellist
+        This method applies a Butterworth low-pass filter to all columns specified
+        in the labellist at once. The "Time" column should be excluded from the labellist
         as it is not needed for the computation.
     
         Args:
@@ -156,102 +327,148 @@ class Sensors:
             pd.DataFrame: A new DataFrame with the filtered data.
         """
         filtered_df = df.copy()
-        for labelname in labellist:
-            # Ensure the column is converted to a numpy array
-            x = df[labelname].to_numpy()
-            filtered_df[labelname] = butterlowpass(
-                x=x,  # Correctly pass the numpy array as "x"
-                fpass=self.FPASS,
-                fstop=self.FSTOP,
-                gpass=self.GPASS,
-                gstop=self.GSTOP,
-                fs=self.SAMPLING_FREQUENCY_HZ,
-                dt=self.SAMPLING_TIME,
-                checkflag=False,
-                labelname=labelname
-            )
+        labellist = list(labellist)
+        # Filter all columns with a single filter design and a single call
+        filtered_df[labellist] = butterlowpass_batch(
+            x=df[labellist].to_numpy(dtype=float),
+            fpass=self.FPASS,
+            fstop=self.FSTOP,
+            gpass=self.GPASS,
+            gstop=self.GSTOP,
+            fs=self.SAMPLING_FREQUENCY_HZ
+        )
+        print("Applied filter against {0} columns".format(len(labellist)))
         return filtered_df
 
     def convert_dictdata(self, current_time, sensor_data_dict):
         """
-        Convert nested dictionary data from multiple sensors into a single DataFrame.
+        Convert nested dictionary data from multiple sensors into a single sample.
     
-        This method converts nested dictionary data obtained from multiple sensors
-        into a single dictionary and then converts it into a pandas DataFrame. The
-        current_time information is associated with the data.
+        This method merges nested dictionary data obtained from multiple sensors
+        into a single flat dictionary and associates the current_time information
+        with the data. When sensor timestamps are enabled, the acquisition time of
+        every sensor sample is added as "Time_<sensor>", relative to the time origin.
     
         Args:
             current_time (float): The current time at which the data was obtained.
             sensor_data_dict (dict): A nested dictionary containing data from multiple sensors.
     
         Returns:
-            pd.DataFrame: A DataFrame containing the converted data with the current time information.
+            dict: A flat dictionary containing the converted data with the current time information.
         """
         converted_data = {"Time": current_time}
         for sensor, data in sensor_data_dict.items():
             converted_data.update(data)
-        
-        converted_data = pd.DataFrame([converted_data])
+        if self.is_sensor_timestamps:
+            for sensor in sensor_data_dict:
+                timestamp = self.sample_timestamps.get(sensor)
+                converted_data["Time_" + sensor] = current_time if timestamp is None or self.time_origin is None \
+                    else timestamp - self.time_origin
         
         return converted_data
 
+    def convert_sample(self, current_time, sensor_data_dict):
+        """
+        Write the data from multiple sensors into the pre-allocated sample row.
 
+        Unlike convert_dictdata, no dictionary is built: the values of every sensor
+        are written into their slots of the compiled sample schema, with NaN for
+        missing values. The row is overwritten on the next call, so it must be
+        consumed (e.g. by update_data_buffer) before the next sample is converted.
+
+        Args:
+            current_time (float): The current time at which the data was obtained.
+            sensor_data_dict (dict): A nested dictionary containing data from multiple sensors.
+
+        Returns:
+            numpy.ndarray: The sample row, in the column order of sample_schema.
+        """
+        return self.sample_schema.write(self.sample_row, current_time, sensor_data_dict,
+                                        self.sample_timestamps, self.time_origin)
 
     async def update_data_buffer(self, dict_data):
         """
         Add data from sensors to the buffer and save it if necessary.
     
-        This method adds the provided sensor data to the internal buffer. If the buffer
-        exceeds the specified maximum length, the oldest data is saved to a CSV file
-        and removed from the buffer.
+        This method appends the provided sensor data to the internal ring buffer.
+        When the buffer is full, the buffered block is saved to the recording file directly
+        from zero-copy views of the buffer and the buffer is emptied. If the
+        real-time filter is enabled, the filtered sample is stored next to the raw one.
+        The complete sample is then published to the shared memory ring, if enabled.
     
         Args:
-            dict_data (dict): The data from sensors to be added to the buffer.
+            dict_data (dict or numpy.ndarray): The data from sensors to be added to the buffer,
+                either as a dictionary or as a sample row from convert_sample.
         """
+        # If the buffer is full, save the oldest data before it is overwritten
+        if self.data_buffer.is_full():
+            await self.flush_data_buffer()
         
         # Add data to the buffer
-        self.data_buffer = pd.concat([self.data_buffer, dict_data], ignore_index=True)
+        if isinstance(dict_data, np.ndarray):
+            self.data_buffer.append_row(dict_data)
+        else:
+            self.data_buffer.append_dict(dict_data)
+
+        # Filter the new sample in place, keeping the filter state across ticks
+        if self.streaming_filter is not None:
+            start = self.data_column_start
+            end = start + len(self.all_data_columns_list)
+            row = self.data_buffer.last_row()
+            values = row[start:end]
+            if self.streaming_outlier_filter is not None:
+                values = self.streaming_outlier_filter.process_sample(values)
+            row[end:] = self.streaming_filter.process_sample(values)
+
+        if self.shared_ring is not None:
+            self.shared_ring.append(self.data_buffer.last_row())
+
+    def close_shared_memory(self):
+        """
+        Destroy the shared memory ring. Attached readers keep their mapping until they close it.
+        """
+        if self.shared_ring is not None:
+            self.shared_ring.close()
+            self.shared_ring = None
     
-        # If the buffer exceeds the specified length, save the oldest data
-        if len(self.data_buffer) > self.MAX_DATA_BUF_LEN:
-            # Save the oldest data to a CSV file
-            old_data = self.data_buffer.head(self.MAX_DATA_BUF_LEN)
-            
-            await self.save_data(old_data, self.SAVE_BUF_CSVDATA_PATH)
-            
-            # Update the buffer
-            self.data_buffer = self.data_buffer.tail(len(self.data_buffer) - self.MAX_DATA_BUF_LEN)        
+    async def flush_data_buffer(self):
+        """
+        Save all buffered data to the recording file and empty the buffer.
+        """
+        start_time = self.instrumentation.now()
+        for block in self.data_buffer.views():
+            await self.save_data(block, self.SAVE_BUF_DATA_PATH)
+        self.data_buffer.clear()
+        self.instrumentation.record("save", start_time)
     
     
     
-    async def save_data_async(self, df, path):
+    async def save_data_async(self, block, path):
         """
-        Save the DataFrame to a CSV file asynchronously.
+        Append a block of samples to the recording file asynchronously.
     
-        This method uses asyncio.to_thread to run the synchronous to_csv method
-        in a separate thread, allowing it to be handled asynchronously.
+        This method uses asyncio.to_thread to run the synchronous append of the
+        selected storage backend in a separate thread, allowing it to be handled
+        asynchronously.
     
         Args:
-            df (pd.DataFrame): The DataFrame to be saved.
-            path (str): The file path where the DataFrame should be saved.
+            block (numpy.ndarray): The samples to be saved, in data buffer column order.
+            path (str): The file path where the samples should be saved.
         """
-        if not os.path.isfile(path):
-            await asyncio.to_thread(df.to_csv, path, sep=",", encoding="utf-8", index=False, header=True, mode="w")
-        else:
-            await asyncio.to_thread(df.to_csv, path, sep=",", encoding="utf-8", index=False, header=False, mode="a")
+        await asyncio.to_thread(self.storage.append, path, block, self.data_buffer.columns)
     
-    async def save_data(self, df, path):
+    async def save_data(self, block, path):
         """
-        Save the DataFrame to a CSV file asynchronously.
+        Append a block of samples to the recording file asynchronously.
     
-        This method calls save_data_async to save the DataFrame to a CSV file
-        asynchronously.
+        This method calls save_data_async to save the samples with the selected
+        storage backend asynchronously.
     
         Args:
-            df (pd.DataFrame): The DataFrame to be saved.
-            path (str): The file path where the DataFrame should be saved.
+            block (numpy.ndarray): The samples to be saved, in data buffer column order.
+            path (str): The file path where the samples should be saved.
         """
-        await self.save_data_async(df, path)
+        await self.save_data_async(block, path)
         
 
 
@@ -260,14 +477,15 @@ class Sensors:
         Finish the measurement process and save the data.
 
         This method finalizes the measurement process by saving the buffered data
-        to a CSV file. It also applies filtering if specified and saves the filtered
-        data to a separate CSV file. The method handles time zone settings and
+        to the recording file. It also applies filtering if specified and saves the
+        filtered data to a separate file. The method handles time zone settings and
         generates a timestamp for the file names.
 
-        The buffered data is saved to a temporary CSV file, which is then read back
-        and saved to a final file path with a timestamp. If filtering is enabled,
-        the filtered data is also saved. The temporary CSV file is deleted after
-        the data is saved.
+        Only the samples still in the buffer are written. The temporary recording
+        file is then moved to a final file path with a timestamp by an atomic
+        rename, so the cost does not depend on the length of the measurement. If
+        filtering is enabled, the filtered data is produced from the final file by
+        a streaming pass with bounded memory.
 
         Raises:
             Exception: If an error occurs during the file operations.
@@ -276,24 +494,91 @@ class Sensors:
         TIMEZONE = datetime.timezone(t_delta, self.TIMEZONE)# You have to set your timezone
         now = datetime.datetime.now(TIMEZONE)
         timestamp = now.strftime("%Y%m%d%H%M%S")
-        final_file_path = self.SAVE_BUF_CSVDATA_PATH.replace(self.SAVE_BUF_CSVDATA_PATH.split("/")[-1], 
+        final_file_path = self.SAVE_BUF_DATA_PATH.replace(self.SAVE_BUF_DATA_PATH.split("/")[-1], 
                                                    timestamp + "/" + timestamp + "_" + 
-                                                   self.SAVE_BUF_CSVDATA_PATH.split("/")[-1])
-        await self.save_data_async(self.data_buffer, self.SAVE_BUF_CSVDATA_PATH)
-        raw_df = pd.read_csv(self.SAVE_BUF_CSVDATA_PATH, header=0)
+                                                   self.SAVE_BUF_DATA_PATH.split("/")[-1])
+        await self.flush_data_buffer()
+        self.storage.close(self.SAVE_BUF_DATA_PATH)
+
+        if not os.path.exists(self.SAVE_BUF_DATA_PATH):
+            print(f'File "{self.SAVE_BUF_DATA_PATH}" is not existed')
+            return
         os.makedirs(self.SAVE_DATA_DIR + "/" + timestamp, exist_ok=True)
-        raw_df.to_csv(final_file_path, sep=",", encoding="utf-8", index=False, header=True)
-        
+        os.replace(self.SAVE_BUF_DATA_PATH, final_file_path)
+        print(f'File  "{self.SAVE_BUF_DATA_PATH}" was moved to "{final_file_path}"')
+        if self.instrumentation.enabled:
+            self.instrumentation.dump(os.path.join(self.SAVE_DATA_DIR, timestamp, timestamp + "_instrumentation.json"))
 
         if self.is_filter:
-            filt_df = self.filtering(df=raw_df, labellist=raw_df.columns[1:])
-            filt_df.to_csv(final_file_path.replace("_raw_data.csv", "_filt_data.csv"), sep=",", encoding="utf-8", index=False, header=True)
+            await asyncio.to_thread(self.filter_recording, final_file_path,
+                                    final_file_path.replace("_raw_data", "_filt_data"))
 
-        if os.path.exists(self.SAVE_BUF_CSVDATA_PATH):
-            os.remove(self.SAVE_BUF_CSVDATA_PATH)
-            print(f'File  "{self.SAVE_BUF_CSVDATA_PATH}" was deleted')
-        else:
-            print(f'File "{self.SAVE_BUF_CSVDATA_PATH}" is not existed')
+    def filter_recording(self, raw_path, filt_path):
+        """
+        Apply the low-pass filter to a recording file block by block.
+
+        The recording is read in blocks of FILTER_CHUNK_ROWS samples and filtered
+        with overlapping context, so memory use is bounded regardless of the length
+        of the recording. Only the sensor data columns are filtered. The time columns
+        ("Time" and "Time_<sensor>") and the "<column>_filt" columns of the real-time
+        filter are copied unchanged.
+
+        Args:
+            raw_path (str): The path of the raw recording file.
+            filt_path (str): The path of the filtered file to be written.
+        """
+        sos = design_butterlowpass_sos(self.FPASS, self.FSTOP, self.GPASS, self.GSTOP, self.SAMPLING_FREQUENCY_HZ)
+        columns = None
+        pending_unfiltered = deque()  # Unfiltered columns of raw blocks not output yet
+        data_start = self.data_column_start
+        data_end = data_start + len(self.all_data_columns_list)
+
+        def data_blocks():
+            nonlocal columns
+            for block, columns in self.storage.iter_chunks(raw_path, self.FILTER_CHUNK_ROWS):
+                # Time columns followed by the "<column>_filt" columns, if any
+                pending_unfiltered.append(np.column_stack((block[:, :data_start], block[:, data_end:])))
+                yield block[:, data_start:data_end]
+
+        if os.path.exists(filt_path):
+            os.remove(filt_path)
+        for filt_block in butterlowpass_chunked(data_blocks(), sos):
+            # Filtered blocks come out in order, so they take the oldest pending unfiltered values
+            unfiltered = np.concatenate(pending_unfiltered)
+            pending_unfiltered.clear()
+            pending_unfiltered.append(unfiltered[len(filt_block):])
+            unfiltered = unfiltered[:len(filt_block)]
+            self.storage.append(filt_path, np.column_stack((unfiltered[:, :data_start], filt_block,
+                                                            unfiltered[:, data_start:])), columns)
+        self.storage.close(filt_path)
+        print(f'Filtered data was saved to "{filt_path}"')
+
+    def column_groups(self):
+        """
+        Return the data columns of every sensor keyed by the column holding their timestamps.
+
+        Returns:
+            dict: Mapping of "Time_<sensor>" to the data columns of the sensor, or of
+                "Time" to all data columns when sensor timestamps are disabled.
+        """
+        if not self.is_sensor_timestamps:
+            return {"Time": list(self.all_data_columns_list)}
+        return {"Time_" + sensor_type: list(self.config.sensors[sensor_type].data_columns)
+                for sensor_type in self.sensor_list}
+
+    def get_aligned_data(self, period=None, method="zoh"):
+        """
+        Resample the buffered samples of every sensor onto a common timeline.
+
+        Args:
+            period (float, optional): The period of the timeline in seconds. Defaults to the sampling time.
+            method (str or dict, optional): "zoh", "linear" or "decimate", or a mapping of column to method.
+
+        Returns:
+            pd.DataFrame: The aligned samples with a "Time" column.
+        """
+        return align_session(self.data_buffer.to_dataframe(), self.column_groups(),
+                             self.SAMPLING_TIME if period is None else period, method)
 
 
 
@@ -326,8 +611,11 @@ async def sensor_fusion_main():
     # sensors.start_all_measurements()
     sampling_counter = 0
     current_time = 0
+    scheduler = DeadlineScheduler(sensors.SAMPLING_TIME)
+    instrumentation = sensors.instrumentation
     #sensors.is_running = True
     sensors.on_change_start_measurement()
+    sensors.start_sensor_workers()
     """
     計測メインループ
     実行時間：最大0.04sほど(is_show_real_time_data==True)
@@ -339,15 +627,26 @@ async def sensor_fusion_main():
             
             if main_loop_start_time is None:
                     main_loop_start_time = iteration_start_time  # initialize main loop start time
+                    scheduler.start(main_loop_start_time)
+                    sensors.set_time_origin(main_loop_start_time)
             
             current_time = perf_counter() - main_loop_start_time # Current time
             
+            stage_start_time = instrumentation.now()
             data = sensors.collect_data() # Get data from sensors                                        
+            stage_start_time = instrumentation.record("collect", stage_start_time)
             sampling_counter += 1 # Num of sampling
             
-            converted_data = sensors.convert_dictdata(current_time, data) # Convert data to dataframe format
-            # Update the data buffer. If it reaches the buffer limit, write the data to a CSV file.
+            converted_data = sensors.convert_sample(current_time, data) # Write data into the sample row
+            stage_start_time = instrumentation.record("convert", stage_start_time)
+            instrumentation.count_none(converted_data, sensors.sample_schema.data_slice)
+            # If the buffer is full, write it to the recording file first. The flush is timed as "save", not "buffer".
+            if sensors.data_buffer.is_full():
+                await sensors.flush_data_buffer()
+                stage_start_time = instrumentation.now()
+            # Update the data buffer.
             await sensors.update_data_buffer(converted_data)
+            instrumentation.record("buffer", stage_start_time)
             # Display data in real time. This process is executed on additional thread.
             if sensors.is_show_real_time_data:
                 formatted_data = format_sensor_fusion_data(data, sensors.all_data_columns_list)    
@@ -355,15 +654,12 @@ async def sensor_fusion_main():
                 print("Current Time is: {:.3f}".format(current_time))
                 print(formatted_data)
             
-            # Wait based on the sampling interval and execution time to maintain the sampling frequency.
-            iteration_end_time = perf_counter()
-            iteration_duration = iteration_end_time - iteration_start_time 
-            print("Iteration duration is: {0} [s]".format(iteration_duration))
-            sleep_time = max(0, sensors.SAMPLING_TIME - iteration_duration)
-            if sleep_time > 0:
-                wait_process(sleep_time)
+            # Wait for the next absolute deadline to maintain the sampling frequency.
+            instrumentation.record("iteration", iteration_start_time)
+            instrumentation.increment("missed_deadlines", await scheduler.wait_next_async())
     
     except Exception as e:
+        instrumentation.increment("exceptions")
         print(e)
     
     except KeyboardInterrupt:
@@ -372,6 +668,8 @@ async def sensor_fusion_main():
         await sensors.finish_measurement_and_save_data()
         
     finally:
+        sensors.stop_sensor_workers()
+        sensors.close_shared_memory()
         print("finish")
          # Compute delay of sampling
         main_loop_end_time = perf_counter() - main_loop_start_time
@@ -379,6 +677,9 @@ async def sensor_fusion_main():
         print("main loop is ended. current time is: {:.3f}".format(current_time))
         print("main loop is ended. end time is: {:.3f}".format(main_loop_end_time))
         print("sampling num is: {}".format(sampling_counter))
+        print("missed deadlines: {}".format(scheduler.missed_deadlines))
+        if instrumentation.enabled:
+            print(instrumentation.format_summary())
         
         
         
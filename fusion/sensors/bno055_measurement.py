@@ -1,4 +1,5 @@
 import time
+import struct
 import numpy as np
 import adafruit_bno055
 import board
@@ -9,8 +10,21 @@ parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")
 sys.path.append(parent_dir)
 
 from config.config_manager import load_config
+from signalprocessing.quaternion import quaternion_to_euler_scalar
 config_path = os.path.join(parent_dir, "config", "measurement_system_config.yaml")
 
+# Data registers of the BNO055 read by the burst path:
+# group name -> (register address, struct format, scale, columns in register order)
+BNO055_REGISTER_GROUPS = {
+    "magnetic": (0x0E, "<hhh", 1 / 16, ("magnetic_x", "magnetic_y", "magnetic_z")),  # [uT]
+    "gyro": (0x14, "<hhh", 0.001090830782496456, ("gyro_x", "gyro_y", "gyro_z")),  # [deg/s] / 16 -> [rad/s]
+    "euler": (0x1A, "<hhh", 1 / 16, ("euler_z", "euler_y", "euler_x")),  # Heading, roll, pitch [deg]
+    "quaternion": (0x20, "<hhhh", 1 / (1 << 14), ("quaternion_1", "quaternion_2", "quaternion_3", "quaternion_4")),  # w, x, y, z
+    "linear_acceleration": (0x28, "<hhh", 1 / 100, ("linear_accel_x", "linear_accel_y", "linear_accel_z")),  # [m/s^2]
+    "calibration_status": (0x35, "<B", 1, ("calibstat_sys", "calibstat_gyro", "calibstat_accel", "calibstat_mag")),
+}
+QUATERNION_EULER_COLUMNS = ("quat_roll", "quat_pitch", "quat_yaw")
+
 
 class BNO055:
     def __init__(self, config):
@@ -32,6 +46,57 @@ class BNO055:
         i2c_instance = board.I2C() # Create i2c instance
         self.bno055_sensor = adafruit_bno055.BNO055_I2C(i2c_instance) # create BNO055_I2C instance
 
+        # Read all required data registers in a single I2C transaction
+        self.is_burst_read = getattr(config, "use_burst_read", True) and hasattr(self.bno055_sensor, "i2c_device")
+        self.setup_burst_read()
+
+    def setup_burst_read(self):
+        """
+        Prepare the burst read of the register groups required by self.COLUMNS.
+
+        Only the register groups containing a requested column are decoded, and
+        the read covers the contiguous address range from the first to the last
+        of these groups.
+        """
+        groups = [name for name, (_, _, _, columns) in BNO055_REGISTER_GROUPS.items()
+                  if any(column in self.COLUMNS for column in columns)]
+        if any(column in self.COLUMNS for column in QUATERNION_EULER_COLUMNS) and "quaternion" not in groups:
+            groups.append("quaternion")
+        self.burst_groups = [(BNO055_REGISTER_GROUPS[name], name) for name in groups]
+        if not self.burst_groups:
+            self.is_burst_read = False
+            return
+        start = min(address for (address, _, _, _), _ in self.burst_groups)
+        end = max(address + struct.calcsize(fmt) for (address, fmt, _, _), _ in self.burst_groups)
+        self.burst_start_register = bytes([start])
+        self.burst_buffer = bytearray(end - start)
+
+    def read_registers_burst(self):
+        """
+        Read the required data registers of the BNO055 in one I2C transaction.
+
+        Returns:
+            dict: A dictionary containing the decoded values of the required register groups.
+        """
+        with self.bno055_sensor.i2c_device as i2c:
+            i2c.write_then_readinto(self.burst_start_register, self.burst_buffer)
+
+        data_dict = {}
+        start = self.burst_start_register[0]
+        for (address, fmt, scale, columns), name in self.burst_groups:
+            values = struct.unpack_from(fmt, self.burst_buffer, address - start)
+            if name == "calibration_status":
+                status = values[0]
+                values = ((status >> 6) & 0x03, (status >> 4) & 0x03, (status >> 2) & 0x03, status & 0x03)
+            else:
+                values = [value * scale for value in values]
+            data_dict.update(zip(columns, values))
+
+        if "quaternion_1" in data_dict:
+            data_dict["quat_roll"], data_dict["quat_pitch"], data_dict["quat_yaw"] = self.calcEulerfromQuaternion(
+                data_dict["quaternion_1"], data_dict["quaternion_2"], data_dict["quaternion_3"], data_dict["quaternion_4"])
+        return data_dict
+
     def calibration(self):
         print("Start calibration!")
         while not self.bno055_sensor.calibrated:
@@ -56,35 +121,14 @@ class BNO055:
         Returns:
             tuple: A tuple containing the roll, pitch, and yaw angles in degrees.
                 If an error occurs, it returns (0.0, 0.0, 0.0) and prints an error message.
+                A zero quaternion, reported before the sensor fusion is ready, also gives (0.0, 0.0, 0.0).
         """
         if None in (_w, _x, _y, _z):
             print(f"Error: One or more quaternion values are None: {_w}, {_x}, {_y}, {_z}")
             return 0.0, 0.0, 0.0
         
         try:
-            sqw = _w ** 2
-            sqx = _x ** 2
-            sqy = _y ** 2
-            sqz = _z ** 2
-            COEF_EULER2DEG = 57.2957795131
-            
-            # Yaw
-            term1 = 2.0 * (_x * _y + _z * _w)
-            term2 = sqx - sqy - sqz + sqw
-            yaw = np.arctan2(term1, term2)
-            
-            # Pitch
-            term1 = -2.0 * (_x * _z - _y * _w)
-            term2 = sqx + sqy + sqz + sqw
-            pitch = np.arcsin(term1 / term2) if -1 <= term1 / term2 <= 1 else 0.0
-            
-            # Roll
-            term1 = 2.0 * (_y * _z + _x * _w)
-            term2 = -sqx - sqy + sqz + sqw
-            roll = np.arctan2(term1, term2)
-            
-            return COEF_EULER2DEG * roll, COEF_EULER2DEG * pitch, COEF_EULER2DEG * yaw
-        
+            return quaternion_to_euler_scalar(_w, _x, _y, _z)
         except Exception as e:
             print(f"Error in calcEulerfromQuaternion: {e}")
             return 0.0, 0.0, 0.0
@@ -98,10 +142,22 @@ class BNO055:
         and calibration status. It then constructs a dictionary with these values and
         returns only the columns specified in self.COLUMNS.
 
+        By default the registers are read in a single I2C transaction and only the
+        groups needed for self.COLUMNS are decoded. If the burst read fails, the
+        sensor falls back to reading every property of adafruit_bno055 separately.
+
         Returns:
             dict: A dictionary containing the sensor data. Only the columns specified
                 in self.COLUMNS are included in the returned dictionary.
         """
+        if self.is_burst_read:
+            try:
+                data_dict = self.read_registers_burst()
+                return {column: data_dict[column] for column in self.COLUMNS if column in data_dict}
+            except Exception as e:
+                print(f"Burst read failed, falling back to reading properties: {e}")
+                self.is_burst_read = False
+
         # Get data
         euler_z, euler_y, euler_x = [val for val in self.bno055_sensor.euler]  # X: yaw, Y: pitch, Z: roll
         gyro_x, gyro_y, gyro_z = [val for val in self.bno055_sensor.gyro]  # Gyro[rad/s]
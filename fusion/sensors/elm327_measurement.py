@@ -19,7 +19,9 @@ sys.path.append(parent_dir)
 from config.config_manager import load_config
 config_path = os.path.join(parent_dir, 'config', 'measurement_system_config.yaml')
 
-class ELM327:
+from fusion.sensors.obd_sensor import OBDSensorMixin
+
+class ELM327(OBDSensorMixin):
     def __init__(self, config):
         """
         Initialize the ELM327 class with configuration parameters.
@@ -44,6 +46,8 @@ class ELM327:
         self.IsStop = True
         self.Is_show_real_time_data = config.is_show_real_time_data
 
+        self.init_obd_queries(config)
+
     def initialize_BLE(self):
         """
         Initialize Bluetooth Low Energy (BLE) for ELM327 connection.
@@ -78,20 +82,6 @@ class ELM327:
         finally:
             return res
 
-    def get_data_from_sensor(self):
-        """
-        Retrieve data from the sensor.
-
-        Returns:
-            dict: A dictionary containing sensor data.
-        """
-        if self.is_offline:
-            data = self.get_data_from_sensor_stub()
-        else:
-            # Retrieve data and save it in dictionary format
-            data = {column: self.get_obd2_value(column) for column in self.COLUMNS}
-        return data
-
     def get_obd2_value_debug(self, column):
         """
         Retrieve OBD-II value for a specific column with debug information.
@@ -118,23 +108,6 @@ class ELM327:
             print(f"No command found for column '{column}'")
         return None
 
-    def get_obd2_value(self, column):
-        """
-        Retrieve OBD-II value for a specific column.
-
-        Args:
-            column (str): The OBD-II command column.
-
-        Returns:
-            float or None: The value of the OBD-II command, or None if not available.
-        """
-        command = getattr(obd.commands, column, None)
-        if command:
-            response = self.connection.query(command)
-            if response.value is not None:  # Check for None
-                return response.value.magnitude
-        return None
-
     def get_data_from_sensor_stub(self):
         """
         Generate stub data for the sensor.
@@ -225,6 +198,7 @@ def test_main():
     meas_elm327 = ELM327(config.sensors['elm327'])
     # res = meas_elm327.connect_to_elm327()
     
+    meas_elm327.start_polling()
     start_time = perf_counter()
     sampling_counter = 0
     try:
@@ -254,6 +228,7 @@ def test_main():
         print("Interrupted by user")
     
     finally:
+        meas_elm327.stop_polling()
         main_loop_end_time = perf_counter() - main_loop_start_time
         print("Program terminated")
         print("main loop is ended. current time is: {:.3f}".format(current_time))
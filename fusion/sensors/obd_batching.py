@@ -0,0 +1,172 @@
+from obd import OBDCommand
+from obd.protocols import ECU
+from obd.protocols.protocol import Message
+
+
+class MultiPIDQuery:
+    """
+    Query several Mode 01 PIDs with a single request.
+
+    ELM327-class adapters on CAN vehicles accept up to six PIDs in one Mode 01
+    request (e.g. "010D0C11"), and the ECU answers with one message containing
+    every PID followed by its data bytes. This class groups the configured
+    columns into such requests, splits the combined response back into one
+    message per PID and decodes each part with the compiled command table
+    entry of the PID. If the ECU does not answer a batched request completely, the
+    columns are queried separately for that round. Batching is only disabled after
+    MAX_CONSECUTIVE_FAILURES such rounds in a row, so that a single timeout on a slow
+    link does not disable it, and is tried again every REPROBE_INTERVAL_ROUNDS rounds.
+    """
+    MAX_PIDS_PER_REQUEST = 6
+    MODE_01_RESPONSE = 0x41
+    # Number of consecutive empty or incomplete batched responses after which batching is disabled
+    MAX_CONSECUTIVE_FAILURES = 3
+    # Number of rounds after which a disabled batching is tried again
+    REPROBE_INTERVAL_ROUNDS = 500
+
+    def __init__(self, connection, columns, command_table, query_single):
+        """
+        Initialize the batching layer.
+
+        Args:
+            connection (obd.OBD): The connection to the adapter.
+            columns (list of str): The OBD-II command columns to query.
+            command_table (OBDCommandTable): The compiled commands of the columns.
+            query_single (callable): Function querying the value of a single column,
+                                     used for columns that cannot be batched and as fallback.
+        """
+        self.connection = connection
+        self.columns = tuple(columns)
+        self.query_single = query_single
+        self.is_batching = True
+        self.failure_count = 0  # Consecutive failed batched responses
+        self.disabled_rounds = 0  # Rounds since batching was disabled
+        self.is_probing = False  # Whether batching was re-enabled on trial
+
+        batchable = []
+        self.single_columns = []
+        for column in self.columns:
+            entry = command_table.get(column)
+            if (entry is not None and not entry.is_custom and entry.command.mode == 1
+                    and entry.n_bytes > 0 and connection.supports(entry.command)):
+                batchable.append((column, entry))
+            else:
+                self.single_columns.append(column)
+
+        # Each batch is (batch command, [(column, entry), ...])
+        self.batches = []
+        for i in range(0, len(batchable), self.MAX_PIDS_PER_REQUEST):
+            group = batchable[i:i + self.MAX_PIDS_PER_REQUEST]
+            self.batches.append((self.build_batch_command(group), group))
+
+    @staticmethod
+    def build_batch_command(group):
+        """
+        Build the OBD command requesting all PIDs of a group at once.
+
+        The decoder returns the raw messages, which are split per PID afterwards.
+
+        Args:
+            group (list of tuple): The (column, entry) pairs of the group.
+
+        Returns:
+            OBDCommand: The combined Mode 01 command.
+        """
+        command_string = b"01" + b"".join(entry.command.command[2:] for _, entry in group)
+        return OBDCommand(name="MULTI_PID_" + command_string.decode(),
+                          desc="Multi-PID request",
+                          command=command_string,
+                          _bytes=0,
+                          decoder=lambda messages: messages,
+                          ecu=ECU.ALL,
+                          fast=False)
+
+    def query(self):
+        """
+        Query the value of every column.
+
+        Returns:
+            dict: A dictionary mapping columns to their values, or None if not available.
+        """
+        data = {}
+        if not self.is_batching and self.batches:
+            self.disabled_rounds += 1
+            if self.disabled_rounds >= self.REPROBE_INTERVAL_ROUNDS:
+                # Probe once: a single failure disables batching again
+                self.is_batching = True
+                self.is_probing = True
+                self.failure_count = self.MAX_CONSECUTIVE_FAILURES - 1
+        for batch_command, group in self.batches:
+            values = self.query_batch(batch_command, group) if self.is_batching else None
+            if values is None:
+                values = {column: self.query_single(column) for column, _ in group}
+            data.update(values)
+        for column in self.single_columns:
+            data[column] = self.query_single(column)
+        return {column: data.get(column) for column in self.columns}
+
+    def query_batch(self, batch_command, group):
+        """
+        Send one multi-PID request and decode the combined response.
+
+        Args:
+            batch_command (OBDCommand): The combined Mode 01 command.
+            group (list of tuple): The (column, entry) pairs of the request.
+
+        Returns:
+            dict or None: A dictionary mapping the columns of the group to their
+                values, or None if the ECU did not answer the batched request completely.
+        """
+        response = self.connection.query(batch_command, force=True)
+        messages = response.value if response.value is not None else []
+        payloads = self.split_response(messages, group)
+        if payloads is None:
+            self.failure_count += 1
+            if self.failure_count >= self.MAX_CONSECUTIVE_FAILURES:
+                reason = "incomplete" if messages else "empty"
+                if not self.is_probing:
+                    print(f"----------Multi-PID request got {self.failure_count} {reason} responses in a row. "
+                          f"Falling back to single-PID requests for {self.REPROBE_INTERVAL_ROUNDS} rounds----------")
+                self.is_batching = False
+                self.is_probing = False
+                self.disabled_rounds = 0
+            return None
+
+        if self.is_probing:
+            print("----------Multi-PID request is answered again. Batching is re-enabled----------")
+            self.is_probing = False
+        self.failure_count = 0
+        return {column: entry.decode_messages([payloads[entry.pid]]) for column, entry in group}
+
+    def split_response(self, messages, group):
+        """
+        Split the messages of a multi-PID response into one message per PID.
+
+        Args:
+            messages (list of Message): The messages received for the combined request.
+            group (list of tuple): The (column, entry) pairs of the request.
+
+        Returns:
+            dict or None: A dictionary mapping every PID of the group to a message
+                shaped like a single-PID response, or None if any PID is missing.
+        """
+        data_lengths = {entry.pid: entry.n_bytes for _, entry in group}
+        payloads = {}
+        for message in messages:
+            data = message.data
+            if len(data) < 2 or data[0] != self.MODE_01_RESPONSE:
+                continue
+            i = 1
+            while i < len(data) and data[i] in data_lengths:
+                pid = data[i]
+                length = data_lengths[pid]
+                if pid not in payloads:
+                    split_message = Message(message.frames)
+                    split_message.ecu = message.ecu
+                    split_message.data = bytearray([self.MODE_01_RESPONSE, pid]) + data[i + 1:i + 1 + length]
+                    payloads[pid] = split_message
+                i += 1 + length
+
+        if len(payloads) != len(data_lengths):
+            return None
+        return payloads
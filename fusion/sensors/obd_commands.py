@@ -0,0 +1,219 @@
+import obd
+from obd import OBDCommand
+from obd import decoders
+from obd.protocols import ECU
+from obd.protocols.protocol import Message
+
+
+def raw_messages(messages):
+    """
+    Decoder returning the received messages unchanged, so that no pint quantity is built.
+    """
+    return messages
+
+
+class OBDCommandEntry:
+    """
+    A compiled OBD-II command decoding its response straight to a float.
+
+    Most Mode 01 values are a linear function of the unsigned big-endian integer
+    formed by their data bytes. For those, the value is computed directly as
+    raw * scale + offset. Other commands keep their python-OBD decoder, and the
+    magnitude of its result is scaled as magnitude * scale + offset.
+    """
+    __slots__ = ("column", "command", "query_command", "n_bytes", "scale", "offset",
+                 "is_signed", "is_linear", "decoder", "is_custom")
+
+    def __init__(self, column, command, is_linear=False, scale=1.0, offset=0.0, is_signed=False,
+                 decoder=None, is_custom=False):
+        """
+        Initialize the entry.
+
+        Args:
+            column (str): The column name of the command.
+            command (OBDCommand): The python-OBD command.
+            is_linear (bool, optional): Whether the value is decoded directly from the data bytes.
+            scale (float, optional): The scale applied to the raw integer or decoder result.
+            offset (float, optional): The offset applied to the raw integer or decoder result.
+            is_signed (bool, optional): Whether the data bytes are a two's complement integer.
+            decoder (callable, optional): The decoder used when the decoding is not linear.
+                                          Defaults to the decoder of the command.
+            is_custom (bool, optional): Whether the command is not a standard python-OBD command.
+        """
+        self.column = column
+        self.command = command
+        # The queried command returns the raw messages instead of a pint quantity
+        self.query_command = OBDCommand(command.name, command.desc, command.command, command.bytes,
+                                        raw_messages, command.ecu, command.fast, command.header)
+        self.n_bytes = max(command.bytes - 2, 0)  # Data bytes after the mode and PID bytes
+        self.scale = scale
+        self.offset = offset
+        self.is_signed = is_signed
+        self.is_linear = is_linear
+        self.decoder = decoder if decoder is not None else command.decode
+        self.is_custom = is_custom
+
+    @property
+    def pid(self):
+        return self.command.pid
+
+    def decode_messages(self, messages):
+        """
+        Decode the messages of a response to a float.
+
+        Args:
+            messages (list of Message): The messages received for the command.
+
+        Returns:
+            float or None: The decoded value, or None if the response is empty or cannot be decoded.
+        """
+        if not messages:
+            return None
+        if self.is_linear:
+            data = messages[0].data[2:2 + self.n_bytes] if self.n_bytes else messages[0].data[2:]
+            if not data:
+                return None
+            return int.from_bytes(data, "big", signed=self.is_signed) * self.scale + self.offset
+        try:
+            value = self.decoder(messages)
+            value = getattr(value, "magnitude", value)
+            return float(value) * self.scale + self.offset
+        except (TypeError, ValueError, IndexError):
+            return None
+
+
+class OBDCommandTable:
+    """
+    Registry of the OBD-II commands of a sensor, built once at construction.
+
+    Standard python-OBD commands and custom commands declared in the
+    configuration are compiled into OBDCommandEntry objects ordered like the
+    sensor columns, so that the acquisition loop neither resolves command names
+    nor builds pint quantities.
+    """
+
+    def __init__(self, columns, custom_commands=None):
+        """
+        Initialize the table.
+
+        Args:
+            columns (list of str): The OBD-II command columns in sensor order.
+            custom_commands (dict, optional): Custom command definitions keyed by column, each with
+                "command" (hex string of the request, e.g. "0138"), "bytes" (response length including
+                the mode and PID bytes), and optionally "decoder" ("unsigned", "signed" or the name of a
+                python-OBD decoder), "scale", "offset" and "ecu" (name of an obd.protocols.ECU member).
+        """
+        # Accept both plain dictionaries and ConfigDict sections of the YAML configuration
+        custom_commands = {column: dict(definition.items())
+                           for column, definition in (custom_commands or {}).items()}
+        self.entries = []
+        for column in columns:
+            if column in custom_commands:
+                entry = build_custom_entry(column, custom_commands[column])
+            else:
+                command = getattr(obd.commands, column, None)
+                entry = build_standard_entry(column, command) if command is not None else None
+            if entry is None:
+                print(f"No command found for column '{column}'")
+            else:
+                self.entries.append(entry)
+        self.entry_map = {entry.column: entry for entry in self.entries}
+
+    def get(self, column):
+        """
+        Return the entry of a column.
+
+        Args:
+            column (str): The column name.
+
+        Returns:
+            OBDCommandEntry or None: The entry, or None if the column has no command.
+        """
+        return self.entry_map.get(column)
+
+    def query(self, connection, entry):
+        """
+        Query the value of one entry.
+
+        Args:
+            connection (obd.OBD): The connection to the adapter.
+            entry (OBDCommandEntry): The entry to query.
+
+        Returns:
+            float or None: The value, or None if not available.
+        """
+        # Custom commands are not part of the PID support bitmaps, so they are forced
+        response = connection.query(entry.query_command, force=entry.is_custom)
+        return entry.decode_messages(response.value)
+
+
+def build_standard_entry(column, command):
+    """
+    Compile a standard python-OBD command, detecting whether its decoder is linear.
+
+    The decoder is evaluated on a few synthetic payloads. If all results lie on a
+    line through the unsigned integer value of the payload, the command is decoded
+    with that scale and offset. Otherwise the python-OBD decoder is kept.
+
+    Args:
+        column (str): The column name.
+        command (OBDCommand): The python-OBD command.
+
+    Returns:
+        OBDCommandEntry: The compiled entry.
+    """
+    n_bytes = command.bytes - 2
+    if n_bytes < 1 or n_bytes > 4 or command.mode is None or command.pid is None:
+        return OBDCommandEntry(column, command)
+
+    max_raw = (1 << (8 * n_bytes)) - 1
+    raws = (0, 1, max_raw // 3, max_raw)
+    try:
+        values = [_decode_raw(command, raw, n_bytes) for raw in raws]
+    except Exception:
+        return OBDCommandEntry(column, command)
+
+    offset = values[0]
+    scale = values[1] - values[0]
+    is_linear = all(abs(raw * scale + offset - value) <= 1e-9 * max(1.0, abs(value))
+                    for raw, value in zip(raws, values))
+    if is_linear:
+        return OBDCommandEntry(column, command, is_linear=True, scale=scale, offset=offset)
+    return OBDCommandEntry(column, command)
+
+
+def _decode_raw(command, raw, n_bytes):
+    message = Message([])
+    message.ecu = ECU.ENGINE
+    message.data = bytearray([0x40 + command.mode, command.pid]) + raw.to_bytes(n_bytes, "big")
+    value = command.decode([message])
+    return float(getattr(value, "magnitude", value))
+
+
+def build_custom_entry(column, definition):
+    """
+    Compile a custom command declared in the configuration.
+
+    Args:
+        column (str): The column name.
+        definition (dict): The command definition (see OBDCommandTable).
+
+    Returns:
+        OBDCommandEntry: The compiled entry.
+    """
+    decoder_name = definition.get("decoder", "unsigned")
+    scale = float(definition.get("scale", 1.0))
+    offset = float(definition.get("offset", 0.0))
+    ecu = getattr(ECU, definition.get("ecu", "ALL"))
+    decoder = None
+    if decoder_name not in ("unsigned", "signed"):
+        decoder = getattr(decoders, decoder_name)
+    command = OBDCommand(name=column,
+                         desc=definition.get("desc", column),
+                         command=definition["command"].encode(),
+                         _bytes=int(definition["bytes"]),
+                         decoder=decoder if decoder is not None else raw_messages,
+                         ecu=ecu,
+                         fast=True)
+    return OBDCommandEntry(column, command, is_linear=decoder is None, scale=scale, offset=offset,
+                           is_signed=decoder_name == "signed", decoder=decoder, is_custom=True)
@@ -0,0 +1,108 @@
+import threading
+from time import perf_counter
+
+# Minimum time [s] between two polling rounds, so that a query returning immediately never spins the CPU
+DEFAULT_MIN_INTERVAL_SEC = 0.01
+# Wait [s] after the first failed round, doubled after every further failure up to the maximum
+FAILURE_BACKOFF_SEC = 0.1
+MAX_FAILURE_BACKOFF_SEC = 5.0
+
+
+class OBDPoller(threading.Thread):
+    """
+    Background worker that polls OBD-II values continuously and caches the latest ones.
+
+    Every serial round trip to the adapter takes tens of milliseconds, so the
+    queries run in this thread and the measurement loop only reads the cache.
+    Each cached value carries the perf_counter() time at which it was received.
+    A failed query keeps the previous value, whose age then keeps growing.
+    A round that raises or returns no value at all (e.g. the adapter was
+    unplugged) is a failure: the poller then backs off exponentially and logs
+    only the first error of a series of failures.
+    """
+
+    def __init__(self, columns, read_values, min_interval=DEFAULT_MIN_INTERVAL_SEC, name="obd_polling_thread"):
+        """
+        Initialize the poller.
+
+        Args:
+            columns (list of str): The OBD-II command columns to poll.
+            read_values (callable): Function returning a dictionary of the current
+                                    value of every column, or None for missing values.
+            min_interval (float, optional): The minimum time in seconds between two polling rounds.
+            name (str, optional): The name of the thread.
+        """
+        super().__init__(name=name, daemon=True)
+        self.columns = tuple(columns)
+        self.read_values = read_values
+        self.min_interval = min_interval
+        self._stop_event = threading.Event()
+        # column -> (value, timestamp). Entries are replaced as a whole, so readers never see a torn pair.
+        self._cache = {column: (None, None) for column in self.columns}
+        self.round_count = 0
+        self.failure_count = 0  # Number of consecutive failed rounds
+
+    def run(self):
+        while not self._stop_event.is_set():
+            round_start_time = perf_counter()
+            error = None
+            try:
+                values = self.read_values()
+                timestamp = perf_counter()
+                n_valid = 0
+                for column, value in values.items():
+                    if value is not None:
+                        self._cache[column] = (value, timestamp)
+                        n_valid += 1
+                self.round_count += 1
+                if n_valid == 0:
+                    error = "no value received"
+            except Exception as e:
+                error = e
+
+            if error is None:
+                if self.failure_count:
+                    print(f"{self.name} recovered after {self.failure_count} failed rounds")
+                self.failure_count = 0
+                wait_time = self.min_interval - (perf_counter() - round_start_time)
+            else:
+                if self.failure_count == 0:
+                    print(f"Error in {self.name}: {error}")
+                wait_time = min(FAILURE_BACKOFF_SEC * 2 ** self.failure_count, MAX_FAILURE_BACKOFF_SEC)
+                self.failure_count += 1
+            if wait_time > 0:
+                self._stop_event.wait(wait_time)
+
+    def stop(self):
+        """
+        Request the poller to stop after the current polling round.
+        """
+        self._stop_event.set()
+
+    def get_latest(self):
+        """
+        Return the latest cached value of every column.
+
+        Returns:
+            dict: A dictionary mapping columns to their latest value, or None if no
+                value has been received yet.
+        """
+        cache = self._cache
+        return {column: cache[column][0] for column in self.columns}
+
+    def get_latest_with_age(self):
+        """
+        Return the latest cached value of every column with its timestamp and age.
+
+        Returns:
+            dict: A dictionary mapping columns to a tuple (value, timestamp, age),
+                where timestamp is the perf_counter() time at which the value was
+                received and age is the time elapsed since then in seconds. Both are
+                None if no value has been received yet.
+        """
+        now = perf_counter()
+        latest = {}
+        for column in self.columns:
+            value, timestamp = self._cache[column]
+            latest[column] = (value, timestamp, None if timestamp is None else now - timestamp)
+        return latest
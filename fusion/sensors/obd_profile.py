@@ -0,0 +1,202 @@
+import os
+import json
+import obd
+from obd import OBDCommand, OBDStatus
+from obd.protocols import ECU
+
+
+# Mode 09 PID 02: Vehicle Identification Number (not defined in python-OBD 0.7.1)
+VIN_COMMAND = OBDCommand(name="VIN",
+                         desc="Vehicle Identification Number",
+                         command=b"0902",
+                         _bytes=0,
+                         decoder=lambda messages: messages,
+                         ecu=ECU.ENGINE,
+                         fast=False)
+
+
+class ProfileOBD(obd.OBD):
+    """
+    OBD connection that takes the supported commands from a stored profile.
+
+    python-OBD queries the PID support bitmaps of the car on every connection.
+    When a profile is given, the supported commands are restored from it
+    instead, so the connection is ready without any PID probing.
+    """
+
+    def __init__(self, supported_pids, *args, **kwargs):
+        """
+        Initialize the connection.
+
+        Args:
+            supported_pids (list of int): The supported Mode 01 PIDs stored in the profile.
+            *args: Positional arguments of obd.OBD.
+            **kwargs: Keyword arguments of obd.OBD.
+        """
+        self.profile_supported_pids = supported_pids
+        super().__init__(*args, **kwargs)
+
+    # Overrides the name-mangled obd.OBD.__load_commands called from obd.OBD.__init__
+    def _OBD__load_commands(self):
+        if self.status() != OBDStatus.CAR_CONNECTED:
+            return
+        for pid in self.profile_supported_pids:
+            if obd.commands.has_pid(1, pid):
+                self.supported_commands.add(obd.commands[1][pid])
+            if obd.commands.has_pid(2, pid):
+                self.supported_commands.add(obd.commands[2][pid])
+
+
+class ConnectionProfileStore:
+    """
+    Persistent store of OBD connection profiles, keyed by adapter MAC address and VIN.
+
+    A profile holds the detected protocol, the working baud rate and the bitmap
+    of supported Mode 01 PIDs. The store is a JSON file of the form
+    {mac: {"last_vin": vin, "vehicles": {vin: profile}}}.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): The path of the JSON file holding the profiles.
+        """
+        self.path = path
+        self.profiles = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, "r") as f:
+                    self.profiles = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not load connection profiles from {path}: {e}")
+
+    def get(self, device_mac, vin=None):
+        """
+        Return the profile of an adapter.
+
+        Args:
+            device_mac (str): The MAC address of the adapter.
+            vin (str, optional): The VIN of the vehicle. Defaults to the last vehicle connected with the adapter.
+
+        Returns:
+            dict or None: The profile, or None if no profile is stored.
+        """
+        adapter = self.profiles.get(device_mac)
+        if adapter is None:
+            return None
+        return adapter["vehicles"].get(adapter["last_vin"] if vin is None else vin)
+
+    def put(self, device_mac, vin, profile):
+        """
+        Store a profile and make its vehicle the last one connected with the adapter.
+
+        Args:
+            device_mac (str): The MAC address of the adapter.
+            vin (str): The VIN of the vehicle.
+            profile (dict): The profile.
+        """
+        adapter = self.profiles.setdefault(device_mac, {"last_vin": vin, "vehicles": {}})
+        adapter["last_vin"] = vin
+        adapter["vehicles"][vin] = profile
+        self.save()
+
+    def invalidate(self, device_mac, vin=None):
+        """
+        Remove a profile.
+
+        Args:
+            device_mac (str): The MAC address of the adapter.
+            vin (str, optional): The VIN of the vehicle. Defaults to the last vehicle connected with the adapter.
+        """
+        adapter = self.profiles.get(device_mac)
+        if adapter is None:
+            return
+        adapter["vehicles"].pop(adapter["last_vin"] if vin is None else vin, None)
+        if not adapter["vehicles"]:
+            del self.profiles[device_mac]
+        self.save()
+
+    def save(self):
+        """
+        Write all profiles to the JSON file atomically.
+        """
+        tmp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(self.profiles, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save connection profiles to {self.path}: {e}")
+
+
+def query_vin(connection):
+    """
+    Query the VIN of the connected vehicle.
+
+    Args:
+        connection (obd.OBD): The connection to the adapter.
+
+    Returns:
+        str: The VIN, or "UNKNOWN" if the vehicle does not report it.
+    """
+    response = connection.query(VIN_COMMAND, force=True)
+    if response.value:
+        # The response starts with the mode, PID and message count bytes, followed by the 17 characters
+        text = "".join(chr(b) for m in response.value for b in m.data[3:] if chr(b).isalnum())
+        if len(text) >= 17:
+            return text[-17:]
+    return "UNKNOWN"
+
+
+def build_profile(connection):
+    """
+    Build a profile from an established connection.
+
+    Args:
+        connection (obd.OBD): The connection to the adapter.
+
+    Returns:
+        dict: The profile with the protocol, baud rate and supported PID bitmap.
+    """
+    # python-OBD does not expose the baud rate, so it is read from the serial port of the interface
+    port = getattr(connection.interface, "_ELM327__port", None)
+    supported_pids = [command.pid for command in connection.supported_commands
+                      if command.mode == 1 and command.pid is not None]
+    return {
+        "protocol": connection.protocol_id(),
+        "baudrate": getattr(port, "baudrate", None),
+        "supported_pids": pids_to_bitmap(supported_pids),
+    }
+
+
+def pids_to_bitmap(pids):
+    """
+    Encode a list of PIDs as a hexadecimal bitmap where bit n is set if PID n is supported.
+
+    Args:
+        pids (list of int): The PIDs.
+
+    Returns:
+        str: The bitmap as a hexadecimal string.
+    """
+    bitmap = 0
+    for pid in pids:
+        bitmap |= 1 << pid
+    return format(bitmap, "x")
+
+
+def bitmap_to_pids(bitmap):
+    """
+    Decode a hexadecimal PID bitmap.
+
+    Args:
+        bitmap (str): The bitmap as a hexadecimal string.
+
+    Returns:
+        list of int: The PIDs whose bit is set.
+    """
+    value = int(bitmap, 16)
+    return [pid for pid in range(value.bit_length()) if value >> pid & 1]
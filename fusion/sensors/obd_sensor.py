@@ -0,0 +1,131 @@
+from time import perf_counter
+
+import obd
+
+from fusion.sensors.obd_polling import OBDPoller
+from fusion.sensors.obd_batching import MultiPIDQuery
+from fusion.sensors.obd_commands import OBDCommandTable
+
+
+class OBDSensorMixin:
+    """
+    Query, batching and background polling logic shared by the OBD-II sensors.
+
+    The sensor class provides COLUMNS, connection, res, is_offline and
+    get_data_from_sensor_stub, and calls init_obd_queries from its __init__
+    after connecting. The poller is not started here: Sensors starts it with
+    the measurement (start_polling) and stops it when the measurement ends
+    (stop_polling), so the adapter is not queried between measurements.
+    """
+
+    def init_obd_queries(self, config):
+        """
+        Compile the commands of the columns and set up multi-PID requests and polling.
+
+        Args:
+            config (dict): Configuration parameters of the sensor.
+        """
+        # Resolve the commands of the columns once instead of on every query
+        self.command_table = OBDCommandTable(self.COLUMNS, getattr(config, "custom_commands", None))
+
+        # Request up to six PIDs with a single Mode 01 request
+        self.is_multi_pid = getattr(config, "use_multi_pid", False)
+        self.multi_pid_query = None
+        if self.is_multi_pid and self.is_connected():
+            self.multi_pid_query = MultiPIDQuery(self.connection, self.COLUMNS, self.command_table,
+                                                 self.get_obd2_value)
+
+        # Poll the OBD-II values in a background thread during the measurement and serve the latest cached values
+        self.is_async = getattr(config, "is_async", False)
+        self.poller = None
+
+    def is_connected(self):
+        """
+        Check whether values can be queried from a connected vehicle.
+
+        Returns:
+            bool: True if the sensor is online and the car is connected.
+        """
+        return not self.is_offline and self.res == obd.OBDStatus.CAR_CONNECTED
+
+    def start_polling(self):
+        """
+        Start polling the configured columns in a background thread, if is_async is enabled.
+        """
+        if self.is_async and self.poller is None and self.is_connected():
+            self.poller = OBDPoller(self.COLUMNS, self.read_obd2_values,
+                                    name=f"{type(self).__name__.lower()}_polling_thread")
+            self.poller.start()
+
+    def stop_polling(self):
+        """
+        Stop the background polling thread.
+        """
+        if self.poller is not None:
+            self.poller.stop()
+            self.poller.join()
+            self.poller = None
+
+    def get_data_from_sensor(self):
+        """
+        Retrieve data from the sensor.
+
+        While the background poller runs, the latest cached values are returned
+        immediately instead of querying the adapter.
+
+        Returns:
+            dict: A dictionary containing sensor data.
+        """
+        if self.is_offline:
+            data = self.get_data_from_sensor_stub()
+        elif self.poller is not None:
+            # Return the latest values received by the polling thread without blocking
+            data = self.poller.get_latest()
+        else:
+            data = self.read_obd2_values()
+        return data
+
+    def read_obd2_values(self):
+        """
+        Query the OBD-II value of every configured column.
+
+        When multi-PID requests are enabled (use_multi_pid), the columns are
+        requested in batches of up to six PIDs.
+
+        Returns:
+            dict: A dictionary mapping columns to their values, or None if not available.
+        """
+        if self.multi_pid_query is not None:
+            return self.multi_pid_query.query()
+        # Retrieve data and save it in dictionary format
+        return {column: self.get_obd2_value(column) for column in self.COLUMNS}
+
+    def get_data_with_age(self):
+        """
+        Retrieve the latest sensor data with the time at which every value was received.
+
+        Returns:
+            dict: A dictionary mapping columns to a tuple (value, timestamp, age) in
+                seconds. Without background polling, the values are queried now and
+                their age is zero.
+        """
+        if self.poller is not None:
+            return self.poller.get_latest_with_age()
+        data = self.get_data_from_sensor()
+        timestamp = perf_counter()
+        return {column: (value, timestamp, 0.0) for column, value in data.items()}
+
+    def get_obd2_value(self, column):
+        """
+        Retrieve OBD-II value for a specific column.
+
+        Args:
+            column (str): The OBD-II command column.
+
+        Returns:
+            float or None: The value of the OBD-II command, or None if not available.
+        """
+        entry = self.command_table.get(column)
+        if entry is None:
+            return None
+        return self.command_table.query(self.connection, entry)
@@ -19,7 +19,10 @@ sys.path.append(parent_dir)
 from config.config_manager import load_config
 config_path = os.path.join(parent_dir, "config", "measurement_system_config.yaml")
 
-class OBDSCANNER:
+from fusion.sensors.obd_sensor import OBDSensorMixin
+from fusion.sensors.obd_profile import ConnectionProfileStore, ProfileOBD, build_profile, bitmap_to_pids, query_vin
+
+class OBDSCANNER(OBDSensorMixin):
     def __init__(self, config):
         """
         Initialize the ELM327 class with configuration parameters.
@@ -38,6 +41,14 @@ class OBDSCANNER:
         self.GPASS = config.filter_params.gpass
         self.GSTOP = config.filter_params.gstop
         self.Isfilter = config.filter_params.is_filter
+        self.PORT = getattr(config, "port", "/dev/rfcomm0")
+        self.DEVICE_MAC = getattr(config, "device_mac", "")
+        # Connection profiles let later connections skip protocol and PID detection. They are keyed by the
+        # adapter MAC address and kept next to the recorded data, outside the source tree.
+        self.profile_store = None
+        if self.DEVICE_MAC:
+            self.profile_store = ConnectionProfileStore(getattr(config, "connection_profile_path",
+                                                                os.path.join(self.SAVE_DATA_DIR, "obd_connection_profiles.json")))
         self.res = self.connect_to_obdscanner()
         
         self.is_offline = config.is_offline
@@ -45,6 +56,8 @@ class OBDSCANNER:
         self.IsStop = True
         self.Is_show_real_time_data = config.is_show_real_time_data
 
+        self.init_obd_queries(config)
+
     def initialize_BLE(self, device_mac = "00:04:3E:84:7D:4C"):
         """
         Initialize Bluetooth Low Energy (BLE) for OBDScanner connection.
@@ -69,17 +82,30 @@ class OBDSCANNER:
     def connect_to_obdscanner(self):
         """
         Establish a connection to the ELM327 device.
+
+        If a connection profile is stored for the adapter (device_mac is set), the connection is opened
+        with the stored protocol and baud rate and the supported PIDs are restored
+        from the profile, which skips the Bluetooth scan and all detection steps.
+        If this fails, the profile is invalidated and a full connection with
+        detection is made, whose result is stored as the new profile.
     
         Returns:
             res (obd.OBDStatus): The connection status of the ELM327 device.
         """
         res = None
         try:
-            self.initialize_BLE() # Initialize BLE
-            self.connection = obd.OBD("/dev/rfcomm0", baudrate=115200, fast=False, timeout=30)
-            #self.connection = obd.OBD("/dev/rfcomm2")  # Specify the serial port
-            print(self.connection.status())
-            res = self.connection.status()
+            res = self.connect_with_profile()
+            if res != obd.OBDStatus.CAR_CONNECTED:
+                if self.DEVICE_MAC:
+                    self.initialize_BLE(self.DEVICE_MAC) # Initialize BLE
+                else:
+                    self.initialize_BLE()
+                self.connection = obd.OBD(self.PORT, baudrate=115200, fast=False, timeout=30)
+                #self.connection = obd.OBD("/dev/rfcomm2")  # Specify the serial port
+                print(self.connection.status())
+                res = self.connection.status()
+                if res == obd.OBDStatus.CAR_CONNECTED and self.profile_store is not None:
+                    self.profile_store.put(self.DEVICE_MAC, query_vin(self.connection), build_profile(self.connection))
             if res == obd.OBDStatus.CAR_CONNECTED:
                 print("----------Connection establishment is successful!----------")
                 return res
@@ -100,19 +126,63 @@ class OBDSCANNER:
             print(e)
         finally:
             return res
-    def get_data_from_sensor(self):
+
+    def connect_with_profile(self):
         """
-        Retrieve data from the sensor.
+        Connect using the stored connection profile of the adapter.
+
+        The profile is invalidated if the connection fails or raises, so that the
+        caller falls back to a full connection with detection. If the connected
+        vehicle has a different VIN, its own profile is used when available and
+        the supported PIDs are detected otherwise.
 
         Returns:
-            dict: A dictionary containing sensor data.
+            res (obd.OBDStatus): The connection status, or None if no profile could be used.
         """
-        if self.is_offline:
-            data = self.get_data_from_sensor_stub()
-        else:
-            # Retrieve data and save it in dictionary format
-            data = {column: self.get_obd2_value(column) for column in self.COLUMNS}
-        return data
+        if self.profile_store is None:
+            return None
+        profile = self.profile_store.get(self.DEVICE_MAC)
+        if profile is None or not os.path.exists(self.PORT):
+            return None
+
+        print("----------Connecting with the stored connection profile----------")
+        self.connection = None
+        try:
+            self.connection = ProfileOBD(bitmap_to_pids(profile["supported_pids"]), self.PORT,
+                                         baudrate=profile["baudrate"], protocol=profile["protocol"],
+                                         fast=False, timeout=30)
+            res = self.connection.status()
+            if res != obd.OBDStatus.CAR_CONNECTED:
+                print("----------Connection with the stored profile failed. Profile was invalidated----------")
+                self.profile_store.invalidate(self.DEVICE_MAC)
+                self.connection.close()
+                return res
+
+            vin = query_vin(self.connection)
+            vehicle_profile = self.profile_store.get(self.DEVICE_MAC, vin)
+            if vehicle_profile is None:
+                # Another vehicle without a profile: detect its supported PIDs once
+                self.connection.supported_commands = set(obd.commands.base_commands())
+                obd.OBD._OBD__load_commands(self.connection)
+                self.profile_store.put(self.DEVICE_MAC, vin, build_profile(self.connection))
+            elif vehicle_profile is not profile:
+                # Another vehicle with its own profile
+                self.connection.supported_commands = set(obd.commands.base_commands())
+                self.connection.profile_supported_pids = bitmap_to_pids(vehicle_profile["supported_pids"])
+                self.connection._OBD__load_commands()
+                self.profile_store.put(self.DEVICE_MAC, vin, vehicle_profile)
+            return res
+        except Exception as e:
+            print("----------Connection with the stored profile raised an error. Profile was invalidated----------")
+            print(e)
+            self.profile_store.invalidate(self.DEVICE_MAC)
+            if self.connection is not None:
+                try:
+                    self.connection.close()
+                except Exception:
+                    pass
+            self.connection = None
+            return None
 
     def get_obd2_value_debug(self, column):
         """
@@ -140,23 +210,6 @@ class OBDSCANNER:
             print(f"No command found for column '{column}'")
         return None
 
-    def get_obd2_value(self, column):
-        """
-        Retrieve OBD-II value for a specific column.
-
-        Args:
-            column (str): The OBD-II command column.
-
-        Returns:
-            float or None: The value of the OBD-II command, or None if not available.
-        """
-        command = getattr(obd.commands, column, None)
-        if command:
-            response = self.connection.query(command)
-            if response.value is not None:  # Check for None
-                return response.value.magnitude
-        return None
-
     def get_data_from_sensor_stub(self):
         """
         Generate stub data for the sensor.
@@ -247,6 +300,7 @@ def test_main():
     meas_obdscanner = OBDSCANNER(config.sensors["obdscanner"])
     # res = meas_elm327.connect_to_elm327()
     
+    meas_obdscanner.start_polling()
     start_time = perf_counter()
     sampling_counter = 0
     try:
@@ -276,6 +330,7 @@ def test_main():
         print("Interrupted by user")
     
     finally:
+        meas_obdscanner.stop_polling()
         main_loop_end_time = perf_counter() - main_loop_start_time
         print("Program terminated")
         print("main loop is ended. current time is: {:.3f}".format(current_time))
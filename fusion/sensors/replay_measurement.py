@@ -0,0 +1,191 @@
+import os
+import sys
+from time import perf_counter
+import numpy as np
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(parent_dir)
+
+from config.config_manager import load_config
+from storage.backends import read_recording
+config_path = os.path.join(parent_dir, "config", "measurement_system_config.yaml")
+
+
+class REPLAY:
+    """
+    Sensor that plays back a recorded measurement instead of reading hardware.
+
+    The recording (any format supported by storage.backends) is loaded once at
+    construction. get_data_from_sensor returns the recorded sample that is
+    current at the replay time, so the data keeps the timing of the original
+    drive regardless of how often it is polled:
+
+    - speed 1.0 replays in real time, speed N replays N times faster.
+    - speed 0 returns the next recorded sample on every call, as fast as the
+      caller polls.
+
+    At the end of the recording the replay either restarts (loop) or keeps
+    returning the last sample.
+    """
+
+    def __init__(self, config):
+        """
+        Initialize the REPLAY class with configuration parameters.
+
+        Args:
+            config (dict): Configuration parameters for the replay. "path" is the
+                recorded file, "speed" the playback speed (0 for as fast as possible)
+                and "loop" whether to restart at the end of the recording.
+                "data_columns" selects the recorded columns to return.
+        """
+        self.COLUMNS = config.data_columns
+        self.SAMPLING_FREQUENCY_HZ = config.sampling_frequency_hz
+        self.SAMPLING_TIME = 1 / self.SAMPLING_FREQUENCY_HZ
+        self.SEQUENCE_LENGTH = config.sequence_length
+        self.FPASS = config.filter_params.fpass
+        self.FSTOP = config.filter_params.fstop
+        self.GPASS = config.filter_params.gpass
+        self.GSTOP = config.filter_params.gstop
+        self.Isfilter = config.filter_params.is_filter
+        self.SAVE_DATA_DIR = config.save_data_dir
+        self.Is_show_real_time_data = config.is_show_real_time_data
+        self.is_offline = True
+        self.IsStart = False
+        self.IsStop = True
+
+        self.PATH = config.path
+        self.SPEED = float(getattr(config, "speed", 1.0))
+        self.IS_LOOP = getattr(config, "loop", False)
+        self.load_recording(self.PATH)
+        self.rewind()
+
+    def load_recording(self, path):
+        """
+        Load a recorded measurement into memory.
+
+        Columns of self.COLUMNS that are not part of the recording are replayed
+        as None. Without a "Time" column, the samples are assumed to be spaced by
+        the sampling time of the sensor.
+
+        Args:
+            path (str): The path of the recorded file.
+        """
+        df = read_recording(path)
+        if len(df) == 0:
+            raise ValueError(f"Recording {path} contains no samples.")
+        missing = [column for column in self.COLUMNS if column not in df.columns]
+        if missing:
+            print(f"Columns {missing} are not part of the recording and are replayed as None")
+
+        self.values = np.full((len(df), len(self.COLUMNS)), np.nan)
+        for index, column in enumerate(self.COLUMNS):
+            if column in df.columns:
+                self.values[:, index] = df[column].to_numpy(dtype=np.float64)
+        if "Time" in df.columns:
+            self.times = df["Time"].to_numpy(dtype=np.float64)
+        else:
+            self.times = np.arange(len(df)) * self.SAMPLING_TIME
+        self.times = self.times - self.times[0]
+        self.duration = self.times[-1]
+        # Samples are converted to dictionaries once, so a replayed sample costs a lookup only
+        self.samples = [{column: (None if np.isnan(value) else float(value))
+                         for column, value in zip(self.COLUMNS, row)} for row in self.values]
+        print(f"Loaded {len(self.samples)} samples ({self.duration:.3f}s) from {path}")
+
+    def rewind(self):
+        """
+        Restart the replay from the first recorded sample.
+        """
+        self.index = -1
+        self.start_time = None
+        self.loop_count = 0
+        self.is_finished = False
+
+    def get_data_from_sensor(self):
+        """
+        Retrieve the recorded sample that is current at the replay time.
+
+        Returns:
+            dict: A dictionary containing sensor data, with None for missing values.
+        """
+        if self.SPEED <= 0:
+            self.index += 1
+            if self.index >= len(self.samples):
+                self.index = self.on_end_of_recording(self.index)
+            return self.samples[self.index]
+
+        now = perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+        replay_time = (now - self.start_time) * self.SPEED
+        if replay_time > self.duration:
+            if self.IS_LOOP and self.duration > 0:
+                loops = int(replay_time // self.duration)
+                self.loop_count += loops
+                self.start_time += loops * self.duration / self.SPEED
+                replay_time -= loops * self.duration
+            else:
+                self.mark_finished()
+        self.index = max(int(np.searchsorted(self.times, replay_time, side="right")) - 1, 0)
+        return self.samples[self.index]
+
+    def on_end_of_recording(self, index):
+        """
+        Return the sample index to use after the last sample has been replayed.
+
+        Args:
+            index (int): The index past the end of the recording.
+
+        Returns:
+            int: The first sample when looping, otherwise the last sample.
+        """
+        if self.IS_LOOP:
+            self.loop_count += 1
+            return 0
+        self.mark_finished()
+        return len(self.samples) - 1
+
+    def mark_finished(self):
+        if not self.is_finished:
+            self.is_finished = True
+            print(f"Replay of {self.PATH} reached the end of the recording")
+
+    def get_data_from_sensor_stub(self):
+        """
+        Generate stub data for the sensor.
+
+        Returns:
+            dict: The next recorded sample.
+        """
+        return self.get_data_from_sensor()
+
+
+def test_main():
+    """
+    Replay the configured recording and print the sampling statistics.
+    """
+    from utils.tools import DeadlineScheduler
+
+    print("Main start")
+    config = load_config(config_path)
+    meas_replay = REPLAY(config.sensors["replay"])
+    scheduler = DeadlineScheduler(meas_replay.SAMPLING_TIME)
+    sampling_counter = 0
+    start_time = perf_counter()
+    scheduler.start(start_time)
+    try:
+        while not meas_replay.is_finished:
+            data = meas_replay.get_data_from_sensor()
+            sampling_counter += 1
+            if meas_replay.Is_show_real_time_data:
+                print(f"{perf_counter() - start_time:.3f}: {data}")
+            scheduler.wait_next()
+    except KeyboardInterrupt:
+        print("Interrupted by user")
+    finally:
+        print("sampling num is: {}".format(sampling_counter))
+        print("missed deadlines: {}".format(scheduler.missed_deadlines))
+
+
+if __name__ == "__main__":
+    test_main()
@@ -0,0 +1,127 @@
+import tkinter as tk
+from collections import deque
+
+
+class TextLogSink:
+    """
+    File-like log sink that writes to a Tk Text widget from the Tk main loop only.
+
+    write() may be called from any thread: it only appends the text to a queue
+    and never touches the widget. The Tk main loop drains the queue in batches
+    every `drain_interval_ms` and inserts the batch with a single call.
+
+    To keep the GUI responsive under heavy logging:
+    - identical consecutive lines are merged into one line with a repeat count,
+    - lines above `max_lines_per_second` are dropped and replaced by a summary line,
+    - the widget is trimmed to its newest `max_lines` lines,
+    - text beyond `max_queue` pending writes is dropped.
+    """
+
+    def __init__(self, text_widget, max_lines=5000, max_lines_per_second=200,
+                 drain_interval_ms=100, max_queue=10000):
+        """
+        Initialize the sink.
+
+        Args:
+            text_widget (tk.Text): The widget showing the log.
+            max_lines (int, optional): The maximum number of lines kept in the widget.
+            max_lines_per_second (int, optional): The maximum number of lines inserted per second.
+            drain_interval_ms (int, optional): The interval of the drain timer in milliseconds.
+            max_queue (int, optional): The maximum number of pending writes.
+        """
+        self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.max_lines_per_drain = max(1, int(max_lines_per_second * drain_interval_ms / 1000))
+        self.drain_interval_ms = drain_interval_ms
+        self.max_queue = max_queue
+        self._pending = deque()  # deque.append and popleft are thread-safe
+        self._after_id = None
+        self.dropped = 0
+
+    def write(self, text):
+        if not text:
+            return
+        if len(self._pending) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._pending.append(text)
+
+    def flush(self):
+        pass
+
+    def start(self):
+        """
+        Start draining the queue from the Tk main loop.
+        """
+        if self._after_id is None:
+            self._after_id = self.text_widget.after(self.drain_interval_ms, self._drain)
+
+    def stop(self):
+        """
+        Stop the drain timer and show the pending text.
+        """
+        if self._after_id is not None:
+            self.text_widget.after_cancel(self._after_id)
+            self._after_id = None
+        self.drain()
+
+    def _drain(self):
+        self.drain()
+        self._after_id = self.text_widget.after(self.drain_interval_ms, self._drain)
+
+    def drain(self):
+        """
+        Insert the pending text into the widget. Must be called from the Tk main loop.
+        """
+        chunks = []
+        for _ in range(len(self._pending)):
+            chunks.append(self._pending.popleft())
+        if self.dropped:
+            chunks.append(f"... {self.dropped} writes dropped (log queue full) ...\n")
+            self.dropped = 0
+        if not chunks:
+            return
+
+        lines = self.merge_repeated_lines("".join(chunks).splitlines(keepends=True))
+        if len(lines) > self.max_lines_per_drain:
+            suppressed = len(lines) - self.max_lines_per_drain + 1
+            # Keep the newest lines, which describe the current state
+            lines = [f"... {suppressed} lines suppressed ...\n"] + lines[-(self.max_lines_per_drain - 1):] \
+                if self.max_lines_per_drain > 1 else [f"... {suppressed} lines suppressed ...\n"]
+
+        widget = self.text_widget
+        is_at_bottom = widget.yview()[1] >= 0.999
+        widget.insert(tk.END, "".join(lines))
+        n_lines = int(widget.index("end-1c").split(".")[0])
+        if n_lines > self.max_lines:
+            widget.delete("1.0", f"{n_lines - self.max_lines + 1}.0")
+        if is_at_bottom:
+            # Follow the log only if the user has not scrolled up
+            widget.yview(tk.END)
+
+    @staticmethod
+    def merge_repeated_lines(lines):
+        """
+        Merge identical consecutive lines into one line with a repeat count.
+
+        Args:
+            lines (list of str): The lines, with their line endings.
+
+        Returns:
+            list of str: The merged lines.
+        """
+        merged = []
+        previous = None
+        count = 0
+        for line in lines:
+            if line == previous and line.endswith("\n"):
+                count += 1
+                continue
+            if count > 1:
+                merged[-1] = f"{previous.rstrip(chr(10))} (x{count})\n"
+            merged.append(line)
+            previous = line
+            count = 1
+        if count > 1:
+            merged[-1] = f"{previous.rstrip(chr(10))} (x{count})\n"
+        return merged
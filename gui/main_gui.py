@@ -9,21 +9,22 @@ parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(parent_dir)
 
 from measurement.measurement_control import MeasurementControl
+from measurement.acquisition_process import AcquisitionProcessProxy
 from config.config_manager import load_config
-
-class RedirectText:
-    def __init__(self, text_widget):
-        self.text_widget = text_widget
-
-    def write(self, text):
-        self.text_widget.insert(tk.END, text)
-        self.text_widget.yview(tk.END)
-
-    def flush(self):
-        pass
+from gui.log_sink import TextLogSink
 
 def setup_gui():
-    measurement_control = MeasurementControl("config/measurement_system_config.yaml")
+    config_path = "config/measurement_system_config.yaml"
+    # Run the measurement in a separate process, so that the GUI cannot disturb the sampling timing
+    is_acquisition_process = getattr(load_config(config_path)["master"], "is_acquisition_process", False)
+    if is_acquisition_process:
+        measurement_control = AcquisitionProcessProxy(config_path)
+        sampling_frequency_hz = measurement_control.SAMPLING_FREQUENCY_HZ
+        sequence_length = measurement_control.SEQUENCE_LENGTH
+    else:
+        measurement_control = MeasurementControl(config_path)
+        sampling_frequency_hz = measurement_control.sensors.SAMPLING_FREQUENCY_HZ
+        sequence_length = measurement_control.sensors.SEQUENCE_LENGTH
     
     def update_sampling_frequency():
         try:
@@ -53,7 +54,10 @@ def setup_gui():
         stop_button.config(state=tk.NORMAL)  # Enable Stop Button
         save_button.config(state=tk.DISABLED)  # Disable Save Button
         freq_entry.config(state=tk.DISABLED)  # Disable frequency entry
-        Thread(target=lambda: measurement_control.run_async(measurement_control.start_measurement())).start()
+        if is_acquisition_process:
+            measurement_control.start_measurement()
+        else:
+            Thread(target=lambda: measurement_control.run_async(measurement_control.start_measurement())).start()
 
     def stop_measurement():
         measurement_control.stop_measurement()
@@ -62,9 +66,23 @@ def setup_gui():
         save_button.config(state=tk.NORMAL)  # Enable Save Button
         freq_entry.config(state=tk.NORMAL)  # Re-enable frequency entry
 
+    def save_measurement_data():
+        if is_acquisition_process:
+            measurement_control.save_measurement_data()
+        else:
+            Thread(target=lambda: measurement_control.run_async(measurement_control.save_measurement_data())).start()
+
+    def poll_acquisition_process():
+        # Show the logs of the acquisition process without ever blocking on it
+        for event in measurement_control.poll_events():
+            if event[0] == "log":
+                sys.stdout.write(event[1])
+        root.after(100, poll_acquisition_process)
 
     def on_closing():
         measurement_control.cleanup()
+        log_sink.stop()
+        sys.stdout = sys.__stdout__
         root.destroy()
     
     
@@ -85,7 +103,10 @@ def setup_gui():
     log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
     log_scroll.pack(side=tk.RIGHT, fill=tk.Y)
     
-    sys.stdout = RedirectText(log_text)
+    # Prints from any thread are queued and shown in batches by the Tk main loop
+    log_sink = TextLogSink(log_text)
+    sys.stdout = log_sink
+    log_sink.start()
 
     # Button Style Settings
     button_style = {
@@ -111,7 +132,7 @@ def setup_gui():
     stop_button.place(x=100, y=10, width=80, height=60)
 
     # Save Button
-    save_button = tk.Button(root, text="Save", command=lambda: Thread(target=lambda: measurement_control.run_async(measurement_control.save_measurement_data())).start(), **button_style)
+    save_button = tk.Button(root, text="Save", command=save_measurement_data, **button_style)
     save_button.config(bg="blue")
     save_button.place(x=190, y=10, width=80, height=60)
 
@@ -120,7 +141,7 @@ def setup_gui():
     freq_label.place(x=280, y=10)
     
     freq_entry = tk.Entry(root, width=5, font=("Arial", 14))
-    freq_entry.insert(0, str(measurement_control.sensors.SAMPLING_FREQUENCY_HZ))  # Default value
+    freq_entry.insert(0, str(sampling_frequency_hz))  # Default value
     freq_entry.place(x=380, y=10)
 
     # Sequence Length Entry
@@ -128,7 +149,7 @@ def setup_gui():
     sequence_length_label.place(x=480, y=10)
     
     sequence_length_entry = tk.Entry(root, width=5, font=("Arial", 14))
-    sequence_length_entry.insert(0, str(measurement_control.sensors.SEQUENCE_LENGTH))  # Default value
+    sequence_length_entry.insert(0, str(sequence_length))  # Default value
     sequence_length_entry.place(x=610, y=10)
 
     # Update Button
@@ -139,6 +160,9 @@ def setup_gui():
     # Clean up when press a close button
     root.protocol("WM_DELETE_WINDOW", on_closing)
 
+    if is_acquisition_process:
+        poll_acquisition_process()
+
     root.mainloop()  # Call the Main Loop of tk
 
 
@@ -1,3 +1,5 @@
 from gui import main_gui
 # The Application Entry Point
-main_gui.setup_gui()
\ No newline at end of file
+# The guard keeps the spawned acquisition process from starting a second GUI when it re-imports this module
+if __name__ == "__main__":
+    main_gui.setup_gui()
@@ -0,0 +1,224 @@
+import asyncio
+import multiprocessing as mp
+import queue
+import sys
+import os
+import threading
+
+# Add the parent directory to path
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from config.config_manager import load_config
+
+# Maximum number of pending messages from the acquisition process. When the GUI
+# does not read them, further log lines are dropped instead of blocking the measurement.
+EVENT_QUEUE_SIZE = 10000
+
+
+class QueueWriter:
+    """
+    File-like object sending printed text to the GUI process as ("log", text) events.
+    """
+
+    def __init__(self, event_queue):
+        self.event_queue = event_queue
+        self.dropped = 0
+
+    def write(self, text):
+        if not text:
+            return
+        try:
+            self.event_queue.put_nowait(("log", text))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        pass
+
+
+def acquisition_process_main(config_path, command_queue, event_queue):
+    """
+    Entry point of the acquisition process.
+
+    The process owns the MeasurementControl and runs the measurement loop in its
+    own event loop, so the timing does not depend on the GUI. Commands are read
+    from command_queue by a helper thread and executed on the event loop, and
+    logs and status updates are sent back through event_queue.
+
+    Commands are tuples (name, *args):
+        ("start",), ("stop",), ("save",), ("set_sampling_frequency", hz),
+        ("set_sequence_length", seconds), ("status",), ("shutdown",)
+
+    Args:
+        config_path (str): Path to the configuration file.
+        command_queue (multiprocessing.Queue): Commands sent by the GUI.
+        event_queue (multiprocessing.Queue): Events sent to the GUI.
+    """
+    sys.stdout = QueueWriter(event_queue)
+    from measurement.measurement_control import MeasurementControl
+
+    control = MeasurementControl(config_path)
+    loop = control.loop
+    asyncio.set_event_loop(loop)
+    tasks = set()
+
+    def send(event):
+        try:
+            event_queue.put_nowait(event)
+        except queue.Full:
+            sys.stdout.dropped += 1
+
+    def send_status():
+        send(("status", {
+            "is_running": control.is_running,
+            "sampling_frequency_hz": control.sensors.SAMPLING_FREQUENCY_HZ,
+            "sequence_length": control.sensors.SEQUENCE_LENGTH,
+            "dropped_log_lines": sys.stdout.dropped,
+        }))
+
+    def run_task(coroutine, done_event=None):
+        task = loop.create_task(coroutine)
+        tasks.add(task)
+
+        def on_done(finished_task):
+            tasks.discard(finished_task)
+            if done_event is not None:
+                send((done_event,))
+            send_status()
+
+        task.add_done_callback(on_done)
+
+    def execute(command):
+        name, args = command[0], command[1:]
+        try:
+            if name == "start":
+                run_task(control.start_measurement())
+            elif name == "stop":
+                control.stop_measurement()
+            elif name == "save":
+                run_task(control.save_measurement_data(), "saved")
+            elif name == "set_sampling_frequency":
+                control.on_change_sampling_frequency(*args)
+            elif name == "set_sequence_length":
+                control.on_change_sequence_length(*args)
+            elif name == "shutdown":
+                control.cleanup()
+                loop.stop()
+                return
+            elif name != "status":
+                print(f"Unknown command: {name}")
+        except Exception as e:
+            print(f"Error while executing {name}: {e}")
+        send_status()
+
+    def read_commands():
+        while True:
+            command = command_queue.get()
+            loop.call_soon_threadsafe(execute, command)
+            if command[0] == "shutdown":
+                break
+
+    threading.Thread(target=read_commands, name="command_reader_thread", daemon=True).start()
+    send(("ready",))
+    send_status()
+    try:
+        loop.run_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+        send(("stopped",))
+
+
+class AcquisitionProcessProxy:
+    """
+    GUI-side handle of a measurement running in a separate process.
+
+    Offers the controls of MeasurementControl as non-blocking calls that send
+    commands to the acquisition process. Logs and status updates come back as
+    events, which the GUI drains with poll_events (e.g. from Tk's after loop).
+    """
+
+    def __init__(self, config_path):
+        """
+        Start the acquisition process.
+
+        Args:
+            config_path (str): Path to the configuration file.
+        """
+        master_config = load_config(config_path)["master"]
+        self.SAMPLING_FREQUENCY_HZ = master_config.sampling_frequency_hz
+        self.SEQUENCE_LENGTH = int(master_config.sequence_length)
+        self.is_running = False
+        self.is_ready = False
+
+        # spawn avoids forking the Tk process with its open display connection
+        context = mp.get_context("spawn")
+        self.command_queue = context.Queue()
+        self.event_queue = context.Queue(EVENT_QUEUE_SIZE)
+        self.process = context.Process(target=acquisition_process_main,
+                                       args=(os.path.abspath(config_path), self.command_queue, self.event_queue),
+                                       name="acquisition_process", daemon=True)
+        self.process.start()
+
+    def send(self, *command):
+        self.command_queue.put(command)
+
+    def start_measurement(self):
+        self.is_running = True
+        self.send("start")
+
+    def stop_measurement(self):
+        self.send("stop")
+
+    def save_measurement_data(self):
+        self.send("save")
+
+    def on_change_sampling_frequency(self, new_sampling_frequency):
+        self.send("set_sampling_frequency", new_sampling_frequency)
+
+    def on_change_sequence_length(self, new_sequence_length):
+        self.send("set_sequence_length", new_sequence_length)
+
+    def poll_events(self, max_events=1000):
+        """
+        Return the events received from the acquisition process without blocking.
+
+        Status events also update is_running, SAMPLING_FREQUENCY_HZ and SEQUENCE_LENGTH.
+
+        Args:
+            max_events (int, optional): The maximum number of events returned at once.
+
+        Returns:
+            list of tuple: The events, e.g. ("log", text), ("status", dict), ("saved",).
+        """
+        events = []
+        for _ in range(max_events):
+            try:
+                event = self.event_queue.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "status":
+                status = event[1]
+                self.is_running = status["is_running"]
+                self.SAMPLING_FREQUENCY_HZ = status["sampling_frequency_hz"]
+                self.SEQUENCE_LENGTH = status["sequence_length"]
+            elif event[0] == "ready":
+                self.is_ready = True
+            events.append(event)
+        return events
+
+    def cleanup(self, timeout=10):
+        """
+        Stop the measurement and terminate the acquisition process.
+
+        Args:
+            timeout (float, optional): The time in seconds to wait for the process to exit.
+        """
+        if self.process.is_alive():
+            self.send("shutdown")
+            self.process.join(timeout)
+        if self.process.is_alive():
+            print("Acquisition process did not exit. Terminating it.")
+            self.process.terminate()
+        print("Cleanup completed.")
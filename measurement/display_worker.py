@@ -0,0 +1,80 @@
+import threading
+from time import perf_counter
+
+
+class DisplayWorker(threading.Thread):
+    """
+    Persistent worker showing the latest measurement data at a fixed display rate.
+
+    The measurement loop publishes every sample into a single latest-value slot,
+    which never blocks and never queues: a sample published before the previous
+    one was displayed replaces it (the stale frame is dropped). The worker
+    displays at most `display_rate_hz` frames per second, independently of the
+    sampling frequency.
+    """
+
+    def __init__(self, display_function, display_rate_hz=10, name="display_thread"):
+        """
+        Initialize the worker.
+
+        Args:
+            display_function (callable): Function displaying one frame, called with the published arguments.
+            display_rate_hz (float, optional): The maximum number of frames displayed per second.
+            name (str, optional): The name of the thread.
+        """
+        super().__init__(name=name, daemon=True)
+        self.display_function = display_function
+        self.display_period = 1 / display_rate_hz
+        self._frame = None
+        self._new_frame = threading.Event()
+        self._stop_event = threading.Event()
+        self.published_count = 0
+        self.displayed_count = 0
+
+    def publish(self, *args):
+        """
+        Replace the latest frame with a new one. Never blocks.
+
+        Args:
+            *args: The arguments of the display function.
+        """
+        self._frame = args  # A single reference assignment, so the worker never sees a partial frame
+        self.published_count += 1
+        self._new_frame.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._new_frame.wait()
+            if self._stop_event.is_set():
+                break
+            self._new_frame.clear()
+            frame = self._frame
+            display_start_time = perf_counter()
+            try:
+                self.display_function(*frame)
+                self.displayed_count += 1
+            except Exception as e:
+                print(f"Error in {self.name}: {e}")
+            # Frames published while waiting replace each other; only the newest is displayed
+            wait_time = self.display_period - (perf_counter() - display_start_time)
+            if wait_time > 0:
+                self._stop_event.wait(wait_time)
+
+    def stop(self):
+        """
+        Stop the worker after the frame being displayed and wait for it to finish.
+        """
+        self._stop_event.set()
+        self._new_frame.set()
+        if self.is_alive():
+            self.join()
+
+    @property
+    def dropped_count(self):
+        """
+        Return the number of published frames that were not displayed.
+
+        Returns:
+            int: The number of dropped frames.
+        """
+        return self.published_count - self.displayed_count
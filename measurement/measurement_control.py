@@ -7,13 +7,12 @@ parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(parent_dir)
 
 from fusion.sensor_fusion import Sensors
-from utils.tools import perf_counter, wait_process
+from utils.tools import perf_counter, DeadlineScheduler
 from utils.visualize_data import format_sensor_fusion_data
 from config.config_manager import load_config
+from measurement.display_worker import DisplayWorker
 import time
-import threading
 
-import pandas as pd
 
 class MeasurementControl:
     def __init__(self, config_path):
@@ -24,7 +23,8 @@ class MeasurementControl:
             config_path (str): Path to the configuration file.
         """
         self.is_running = False
-        self.sensors = Sensors(load_config(config_path)["master"])  # Initialize sensors
+        config = load_config(config_path)
+        self.sensors = Sensors(config["master"], system_config=config)  # Initialize sensors
         self.loop = asyncio.new_event_loop()  # Create a new event loop for non-main thread usage
         self.config_path = config_path
 
@@ -63,6 +63,10 @@ class MeasurementControl:
         """
         Updates the sampling frequency of the sensors.
 
+        The data buffer is not touched here, since this runs on the GUI thread. A
+        running measurement loop saves the buffered samples and resizes the buffer
+        before its next sample, and a new measurement starts with a new buffer.
+
         Args:
             new_sampling_frequency (float): New sampling frequency in Hz (samples per second).
         """
@@ -73,6 +77,7 @@ class MeasurementControl:
         self.sensors.SAMPLING_FREQUENCY_HZ = new_sampling_frequency
         self.sensors.SAMPLING_TIME = 1 / new_sampling_frequency
         self.sensors.MAX_DATA_BUF_LEN = int(self.sensors.SEQUENCE_LENGTH * self.sensors.SAMPLING_FREQUENCY_HZ)
+        self.sensors.is_buffer_resize_pending = True
         print("----------------------CHANGE SAMPLING FREQUENCY-------------------------------")
         print("--------------------------------BEFORE----------------------------------------")
         print("previous sampling frequency: {0}Hz".format(PREV_SAMPLING_FREQUENCY_HZ))
@@ -88,6 +93,8 @@ class MeasurementControl:
         """
         Updates the sequence length of the sensors.
 
+        The buffer is resized by the measurement loop, as for on_change_sampling_frequency.
+
         Args:
             new_sequence_length (int): New sequence length in sec.
         """
@@ -95,6 +102,7 @@ class MeasurementControl:
         
         self.sensors.SEQUENCE_LENGTH = int(new_sequence_length)
         self.sensors.MAX_DATA_BUF_LEN = int(self.sensors.SEQUENCE_LENGTH * self.sensors.SAMPLING_FREQUENCY_HZ)
+        self.sensors.is_buffer_resize_pending = True
         print("------------------------CHANGE SEQUENCE LENGTH--------------------------------")
         print("--------------------------------BEFORE----------------------------------------")
         print("previous sequence length  : {0}s".format(PREV_SEQUENCE_LENGTH))
@@ -121,44 +129,72 @@ class MeasurementControl:
         print("Measurement function called.")
         main_loop_start_time = None
         sampling_counter = 0
-        self.sensors.data_buffer = pd.DataFrame()
-        if os.path.exists(sensors.SAVE_BUF_CSVDATA_PATH):
-            os.remove(sensors.SAVE_BUF_CSVDATA_PATH)
-            print(f"File  '{self.sensors.SAVE_BUF_CSVDATA_PATH}' was deleted")
+        self.sensors.reset_data_buffer()
+        if os.path.exists(sensors.SAVE_BUF_DATA_PATH):
+            os.remove(sensors.SAVE_BUF_DATA_PATH)
+            print(f"File  '{self.sensors.SAVE_BUF_DATA_PATH}' was deleted")
         else:
-            print(f"File '{self.sensors.SAVE_BUF_CSVDATA_PATH}' is not existed")
+            print(f"File '{self.sensors.SAVE_BUF_DATA_PATH}' is not existed")
+        scheduler = DeadlineScheduler(sensors.SAMPLING_TIME)
+        instrumentation = sensors.instrumentation
+        instrumentation.reset()
+        # One persistent worker displays the latest data at the display rate, dropping stale frames
+        display_worker = None
+        if sensors.is_show_real_time_data:
+            display_worker = DisplayWorker(self.show_real_time_data, sensors.DISPLAY_RATE_HZ)
+            display_worker.start()
+        sensors.start_sensor_workers()
         try:
             while self.is_running:
                 iteration_start_time = perf_counter() # Start time of each iteration
                 
                 if main_loop_start_time is None:
                     main_loop_start_time = iteration_start_time  # Initialize main loop start time
+                    scheduler.start(main_loop_start_time)
+                    sensors.set_time_origin(main_loop_start_time)
                     
                 current_time = perf_counter() - main_loop_start_time # Current time
+                stage_start_time = instrumentation.now()
                 data = sensors.collect_data() # Get data from multiple sensors
+                stage_start_time = instrumentation.record("collect", stage_start_time)
                 sampling_counter += 1 # Count sampling times                                       
-                converted_data = sensors.convert_dictdata(current_time, data) # Convert data to dataframe format
-
-                # Update the data buffer. If it reaches the buffer limit, write the data to a CSV file.
+                converted_data = sensors.convert_sample(current_time, data) # Write data into the sample row
+                stage_start_time = instrumentation.record("convert", stage_start_time)
+                instrumentation.count_none(converted_data, sensors.sample_schema.data_slice)
+
+                # If the buffer is full, write it to the recording file first. The flush is timed as "save", not "buffer".
+                if sensors.data_buffer.is_full():
+                    await sensors.flush_data_buffer()
+                    stage_start_time = instrumentation.now()
+                # Update the data buffer.
                 await sensors.update_data_buffer(converted_data)
-                # Display data in real time. This process is executed on additional thread.
-                if sensors.is_show_real_time_data:
-                    show_real_time_data_thread = threading.Thread(target=self.show_real_time_data, 
-                                                        args=(sensors, data, current_time), 
-                                                        name="show_real_time_data_thread")
-                    show_real_time_data_thread.start()
-
-                # Wait based on the sampling interval and execution time to maintain the sampling frequency.
-                iteration_end_time = perf_counter() # Iteration end time
-                iteration_duration = iteration_end_time - iteration_start_time # Elapsed time of each iteration
-                sleep_time = max(0, sensors.SAMPLING_TIME - iteration_duration) # Sleep time
-                if sleep_time > 0:
-                    wait_process(sleep_time)
-            # Wait the finish of the last thread 
-            show_real_time_data_thread.join()
+                instrumentation.record("buffer", stage_start_time)
+                # Display data in real time. This process is executed on the display thread.
+                if display_worker is not None:
+                    display_worker.publish(sensors, data, current_time)
+
+                # Wait for the next absolute deadline to maintain the sampling frequency.
+                instrumentation.record("iteration", iteration_start_time)
+                # Apply a buffer length change from the GUI here, after the buffered samples are saved
+                if sensors.is_buffer_resize_pending:
+                    await sensors.resize_data_buffer()
+                if scheduler.period != sensors.SAMPLING_TIME:
+                    scheduler.set_period(sensors.SAMPLING_TIME)
+                instrumentation.increment("missed_deadlines", await scheduler.wait_next_async())
                 
         except Exception as e:
+            instrumentation.increment("exceptions")
             print(e)
+        finally:
+            sensors.stop_sensor_workers()
+            if display_worker is not None:
+                display_worker.stop()
+                print("displayed frames: {0} / dropped frames: {1}".format(
+                    display_worker.displayed_count, display_worker.dropped_count))
+            print("sampling num is: {}".format(sampling_counter))
+            print("missed deadlines: {}".format(scheduler.missed_deadlines))
+            if instrumentation.enabled:
+                print(instrumentation.format_summary())
     
     
 
@@ -187,4 +223,7 @@ class MeasurementControl:
         """
         if self.is_running:
             self.stop_measurement()
+        # Write the footers of files still open, so that an unsaved recording stays readable
+        self.sensors.storage.close_all()
+        self.sensors.close_shared_memory()
         print("Cleanup completed.")
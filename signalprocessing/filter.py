@@ -1,3 +1,4 @@
+from functools import lru_cache
 from scipy import signal
 import matplotlib.pyplot as plt
 import numpy as np
@@ -28,21 +29,227 @@ def butterlowpass(x, fpass, fstop, gpass, gstop, fs, dt, checkflag, labelname='S
 
 
     print('Applying filter against: {0}...'.format(labelname))
-    fn = 1 / (2 * dt)
-    Wp = fpass / fn
-    Ws = fstop / fn
-    N, Wn = signal.buttord(Wp, Ws, gpass, gstop)
-    b1, a1 = signal.butter(N, Wn, "low")
-    y = signal.filtfilt(b1, a1, x)
+    sos = design_butterlowpass_sos(fpass, fstop, gpass, gstop, 1 / dt)
+    y = signal.sosfiltfilt(sos, x)
     # print(y)
 
     if checkflag == True:
-        time = np.arange(x.__len__()) * dt
-        plt.figure(figsize = (12, 5))
-        plt.title('Comparison between signals')
-        plt.plot(time, x, color='black', label='Raw signal')
-        plt.plot(time, y, color='red', label='Filtered signal')
-        plt.xlabel('Time[s]')
-        plt.ylabel(labelname)
-        plt.show()
+        plot_filter_comparison(x, y, dt, labelname)
     return y
+
+
+def butterlowpass_batch(x, fpass, fstop, gpass, gstop, fs):
+    """
+    Applies a Butterworth low-pass filter to every column of a 2-D signal at once.
+
+    The filter is designed once (and cached) and applied with a single zero-phase
+    sosfiltfilt call along the sample axis.
+
+    Args:
+        x (numpy.ndarray): The input signal of shape (samples, columns).
+        fpass (float): The passband frequency of the filter (Hz).
+        fstop (float): The stopband frequency of the filter (Hz).
+        gpass (float): The maximum loss in the passband (dB).
+        gstop (float): The minimum attenuation in the stopband (dB).
+        fs (float): The sampling frequency of the input signal (Hz).
+
+    Returns:
+        numpy.ndarray: The filtered signal of shape (samples, columns).
+    """
+    sos = design_butterlowpass_sos(fpass, fstop, gpass, gstop, fs)
+    return _sosfiltfilt(sos, np.asarray(x, dtype=float))
+
+
+def plot_filter_comparison(x, y, dt, labelname='Signal[-]'):
+    """
+    Plots a raw signal and its filtered version for comparison.
+
+    Args:
+        x (array-like): The raw signal.
+        y (array-like): The filtered signal.
+        dt (float): The time step between samples (seconds).
+        labelname (str, optional): The label for the signal in the plot. Defaults to 'Signal[-]'.
+    """
+    time = np.arange(x.__len__()) * dt
+    plt.figure(figsize = (12, 5))
+    plt.title('Comparison between signals')
+    plt.plot(time, x, color='black', label='Raw signal')
+    plt.plot(time, y, color='red', label='Filtered signal')
+    plt.xlabel('Time[s]')
+    plt.ylabel(labelname)
+    plt.show()
+
+
+@lru_cache(maxsize=32)
+def design_butterlowpass_sos(fpass, fstop, gpass, gstop, fs):
+    """
+    Designs a Butterworth low-pass filter as second-order sections.
+
+    The design is cached on (fpass, fstop, gpass, gstop, fs), so repeated calls
+    with the same parameters return the same coefficient array, which must not
+    be modified by the caller.
+
+    Args:
+        fpass (float): The passband frequency of the filter (Hz).
+        fstop (float): The stopband frequency of the filter (Hz).
+        gpass (float): The maximum loss in the passband (dB).
+        gstop (float): The minimum attenuation in the stopband (dB).
+        fs (float): The sampling frequency of the signal (Hz).
+
+    Returns:
+        numpy.ndarray: The filter coefficients as second-order sections.
+    """
+    fn = fs / 2
+    N, Wn = signal.buttord(fpass / fn, fstop / fn, gpass, gstop)
+    return signal.butter(N, Wn, "low", output="sos")
+
+
+def settling_length(sos, tol=1e-9, max_length=1_000_000):
+    """
+    Returns the number of samples after which the impulse response of a filter has decayed.
+
+    Args:
+        sos (numpy.ndarray): The filter coefficients as second-order sections.
+        tol (float, optional): The magnitude, relative to the peak, regarded as decayed.
+        max_length (int, optional): The maximum length returned.
+
+    Returns:
+        int: The settling length in samples.
+    """
+    length = 256
+    while True:
+        impulse = np.zeros(length)
+        impulse[0] = 1.0
+        response = np.abs(signal.sosfilt(sos, impulse))
+        above = np.nonzero(response > tol * response.max())[0]
+        # The response decayed inside the window, or the window reached the limit
+        if above[-1] < length // 2 or length >= max_length:
+            return min(int(above[-1]) + 1, max_length)
+        length *= 2
+
+
+def butterlowpass_chunked(chunks, sos, pad=None):
+    """
+    Applies a zero-phase filter to a stream of sample blocks with bounded memory.
+
+    Every block is filtered together with `pad` samples of context on both
+    sides, and only the part that is not affected by the block edges is output.
+    With a pad longer than the settling length of the filter, the result matches
+    filtering the whole signal at once up to numerical precision, while only
+    one block plus twice the pad is held in memory.
+
+    Args:
+        chunks (iterable of numpy.ndarray): Blocks of shape (rows, columns) in chronological order.
+        sos (numpy.ndarray): The filter coefficients as second-order sections.
+        pad (int, optional): The context length in samples. Defaults to the settling length of the filter.
+
+    Yields:
+        numpy.ndarray: Filtered blocks of shape (rows, columns) in chronological order.
+    """
+    if pad is None:
+        pad = settling_length(sos)
+    left = None  # Raw samples preceding the pending samples
+    pending = None  # Raw samples that are not output yet
+    for chunk in chunks:
+        pending = chunk if pending is None else np.concatenate((pending, chunk))
+        if len(pending) <= 2 * pad:
+            continue
+        window = pending if left is None else np.concatenate((left, pending))
+        offset = 0 if left is None else len(left)
+        ready = len(pending) - pad
+        yield _sosfiltfilt(sos, window)[offset:offset + ready]
+        left = pending[max(0, ready - pad):ready]
+        pending = pending[ready:]
+
+    if pending is not None and len(pending) > 0:
+        window = pending if left is None else np.concatenate((left, pending))
+        offset = 0 if left is None else len(left)
+        yield _sosfiltfilt(sos, window)[offset:]
+
+
+def _sosfiltfilt(sos, x):
+    # Shorten the edge padding for short signals instead of failing
+    padlen = min(3 * (2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())), len(x) - 1)
+    return signal.sosfiltfilt(sos, x, axis=0, padlen=padlen)
+
+
+class StreamingLowpass:
+    """
+    Causal low-pass filter for real-time processing of multi-column samples.
+
+    The filter keeps the state (zi) of every second-order section for every
+    column between calls, so each new sample costs O(filter order) regardless
+    of how many samples were processed before. Missing values (NaN) are
+    replaced by the last valid value of the column so that they do not corrupt
+    the filter state. A column outputs NaN until its first valid value arrives,
+    at which point its state is initialized to the steady state for that value.
+    """
+
+    def __init__(self, sos, n_columns):
+        """
+        Initialize the filter.
+
+        Args:
+            sos (numpy.ndarray): The filter coefficients as second-order sections.
+            n_columns (int): The number of columns of every sample.
+        """
+        self.sos = np.array(sos, dtype=float)
+        self.n_columns = n_columns
+        self._zi_unit = signal.sosfilt_zi(self.sos)  # Steady state for a unit input
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the filter state of all columns.
+        """
+        self.zi = np.zeros((len(self.sos), 2, self.n_columns))
+        self._last = np.full(self.n_columns, np.nan)
+        self._initialized = np.zeros(self.n_columns, dtype=bool)
+        self._all_initialized = False
+
+    def _prepare(self, x):
+        missing = np.isnan(x)
+        if missing.any():
+            x = np.where(missing, self._last, x)
+            missing = np.isnan(x)
+        if not self._all_initialized:
+            new = ~self._initialized & ~missing
+            if new.any():
+                self.zi[:, :, new] = self._zi_unit[:, :, None] * x[new]
+                self._initialized |= new
+                self._all_initialized = bool(self._initialized.all())
+        self._last = x
+        return x
+
+    def process_sample(self, x):
+        """
+        Filter one sample.
+
+        Args:
+            x (numpy.ndarray): The sample of shape (columns,).
+
+        Returns:
+            numpy.ndarray: The filtered sample of shape (columns,).
+        """
+        x = self._prepare(np.asarray(x, dtype=float))
+        y, self.zi = signal.sosfilt(self.sos, x[None, :], axis=0, zi=self.zi)
+        if self._all_initialized:
+            return y[0]
+        return np.where(self._initialized, y[0], np.nan)
+
+    def process(self, x):
+        """
+        Filter a block of samples.
+
+        Args:
+            x (numpy.ndarray): The samples of shape (samples, columns).
+
+        Returns:
+            numpy.ndarray: The filtered samples of shape (samples, columns).
+        """
+        x = np.asarray(x, dtype=float)
+        if not self._all_initialized or np.isnan(x).any():
+            return np.array([self.process_sample(sample) for sample in x]).reshape(x.shape)
+        y, self.zi = signal.sosfilt(self.sos, x, axis=0, zi=self.zi)
+        self._last = x[-1].copy()
+        return y
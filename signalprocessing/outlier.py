@@ -0,0 +1,239 @@
+import warnings
+
+import numpy as np
+from scipy import ndimage
+
+# Scale factor turning the median absolute deviation into a standard deviation estimate for normal data
+MAD_SCALE = 1.4826
+
+
+def interpolate_nan(values):
+    """
+    Replace NaN by linear interpolation along the sample axis, for all columns at once.
+
+    Follows pandas' default interpolate(): NaN between two valid values are
+    interpolated linearly by position, trailing NaN take the last valid value and
+    leading NaN stay NaN.
+
+    Args:
+        values (numpy.ndarray): The samples of shape (N,) or (N, C).
+
+    Returns:
+        numpy.ndarray: A float copy of the samples with the NaN filled.
+    """
+    values = np.array(values, dtype=np.float64)
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+    x = values[:, None] if values.ndim == 1 else values
+    is_valid = ~np.isnan(x)
+    positions = np.arange(len(x))[:, None]
+
+    # Index of the previous and of the next valid sample of every column
+    previous = np.where(is_valid, positions, -1)
+    np.maximum.accumulate(previous, axis=0, out=previous)
+    following = np.where(is_valid, positions, len(x))
+    following = np.minimum.accumulate(following[::-1], axis=0)[::-1]
+
+    has_previous = previous >= 0
+    has_following = following < len(x)
+    previous_values = np.take_along_axis(x, np.maximum(previous, 0), axis=0)
+    following_values = np.take_along_axis(x, np.minimum(following, len(x) - 1), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = (positions - previous) / (following - previous)
+    interpolated = np.where(has_following, previous_values + weight * (following_values - previous_values),
+                            previous_values)
+    filled = np.where(is_valid, x, np.where(has_previous, interpolated, np.nan))
+    return filled.reshape(values.shape)
+
+
+def _fill_for_median(x):
+    # Fill every NaN (including leading ones) so that the median filter is not corrupted.
+    # All-NaN columns become 0 and are never flagged, since they have no valid sample anyway.
+    filled = interpolate_nan(x)
+    if not np.isnan(filled).any():
+        return filled
+    first_valid = np.argmax(~np.isnan(filled), axis=0)
+    first_values = filled[first_valid, np.arange(filled.shape[1])]
+    filled = np.where(np.isnan(filled), first_values, filled)
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def rolling_median_mad(values, window_size, max_chunk_elements=1 << 22):
+    """
+    Compute the centered rolling median and median absolute deviation of every column.
+
+    The whole (samples x columns) matrix is processed at once: the median by a
+    single 1-D median filter pass over all columns, the MAD over sliding window
+    views taken in blocks of rows to bound the memory. The cost is linear in the
+    number of samples for a given window. Edges are padded by reflection. NaN are
+    interpolated before the statistics are computed.
+
+    Args:
+        values (numpy.ndarray): The samples of shape (N,) or (N, C).
+        window_size (int): The number of samples of the window. Even sizes are increased by one.
+        max_chunk_elements (int, optional): The maximum number of window elements processed at once.
+
+    Returns:
+        tuple: The rolling median and MAD, both of the same shape as `values`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    x = _fill_for_median(values[:, None] if values.ndim == 1 else values)
+    window_size = max(1, int(window_size)) | 1
+    half = window_size // 2
+    if half == 0 or len(x) == 0:
+        return x.reshape(values.shape), np.zeros(values.shape)
+
+    padded = np.pad(x, ((half, half), (0, 0)), mode="reflect" if len(x) > 1 else "edge")
+    # SciPy only has a fast (sorted window) median filter for 1-D input. Every column carries
+    # its own padding, so that no window spans two columns, and all are filtered as one signal.
+    median = ndimage.median_filter(padded.T.ravel(), size=window_size, mode="nearest")
+    median = median.reshape(x.shape[1], -1)[:, half:-half].T
+
+    # The MAD is taken about the median of the window itself, so it needs the windows
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window_size, axis=0)  # (N, C, window)
+    mad = np.empty_like(median)
+    chunk_length = max(1, max_chunk_elements // (x.shape[1] * window_size))
+    for start in range(0, len(x), chunk_length):
+        end = start + chunk_length
+        deviation = np.abs(windows[start:end] - median[start:end, :, None])
+        # The window size is odd, so the median is the middle element, which partition finds faster
+        mad[start:end] = np.partition(deviation, half, axis=2)[:, :, half]
+    return median.reshape(values.shape), mad.reshape(values.shape)
+
+
+def hampel_outliers(values, median, mad, n_sigmas, min_mad=0.0):
+    """
+    Flag the samples farther than n_sigmas robust standard deviations from the median.
+
+    The MAD is floored at min_mad, and samples whose (floored) MAD is zero are
+    never flagged. A locally constant signal, e.g. an OBD channel held between
+    two polls, has a zero MAD, and any real change would otherwise be an outlier.
+
+    Args:
+        values (numpy.ndarray): The samples.
+        median (numpy.ndarray): The window median of every sample.
+        mad (numpy.ndarray): The window MAD of every sample.
+        n_sigmas (float): The threshold in robust standard deviations.
+        min_mad (float, optional): The minimum MAD, in the unit of the signal.
+
+    Returns:
+        numpy.ndarray: A boolean mask of the outliers.
+    """
+    scale = np.fmax(mad, min_mad)
+    with np.errstate(invalid="ignore"):
+        return (scale > 0) & (np.abs(values - median) > n_sigmas * MAD_SCALE * scale)
+
+
+def remove_outliers_with_hampel(data, window_size=21, n_sigmas=3, min_mad=0.0):
+    """
+    Removes outliers with a Hampel filter (rolling median and MAD).
+
+    A sample is an outlier if it is more than n_sigmas robust standard deviations
+    (MAD_SCALE * MAD) away from the median of the window centered on it. Unlike
+    the global z-score and IQR methods, the thresholds follow the local signal
+    level, so short spikes are removed without masking real dynamics.
+
+    Args:
+        data (numpy array): The input data of shape (N,) or (N, C).
+        window_size (int): The number of samples of the window.
+        n_sigmas (float): The threshold in robust standard deviations.
+        min_mad (float): The minimum MAD. Samples whose window has a zero MAD are never outliers.
+
+    Returns:
+        numpy array: The data with outliers replaced by NaN.
+    """
+    data = np.array(data, dtype=float)
+    if len(data) == 0:
+        return data
+    median, mad = rolling_median_mad(data, window_size)
+    is_outlier = hampel_outliers(data, median, mad, n_sigmas, min_mad)
+    if np.any(is_outlier):
+        data[is_outlier] = np.nan
+    return data
+
+
+class StreamingHampel:
+    """
+    Causal Hampel filter for real-time processing of multi-column samples.
+
+    Every new sample is compared with the median and MAD of the previous
+    `window_size` raw samples of its column, which are kept between calls, so
+    no look-ahead is needed. Outliers are replaced by the window median, since
+    they cannot be interpolated before the next valid sample arrives. A column
+    is passed through unchanged until its window holds `min_periods` valid values.
+    """
+
+    def __init__(self, window_size, n_columns, n_sigmas=3, min_periods=None, min_mad=0.0):
+        """
+        Initialize the filter.
+
+        Args:
+            window_size (int): The number of previous samples of the window. Even sizes are increased by one.
+            n_columns (int): The number of columns of every sample.
+            n_sigmas (float, optional): The threshold in robust standard deviations.
+            min_periods (int, optional): The minimum number of valid values in the window.
+                Defaults to half of the window.
+            min_mad (float, optional): The minimum MAD. Samples whose window has a zero MAD are never outliers.
+        """
+        self.window_size = max(1, int(window_size)) | 1
+        self.n_columns = n_columns
+        self.n_sigmas = n_sigmas
+        self.min_periods = max(1, self.window_size // 2) if min_periods is None else min_periods
+        self.min_mad = min_mad
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the window of all columns.
+        """
+        self.history = np.full((self.window_size, self.n_columns), np.nan)
+        self.outlier_count = 0
+
+    def process(self, x):
+        """
+        Filter a block of samples.
+
+        Args:
+            x (numpy.ndarray): The samples of shape (samples, columns).
+
+        Returns:
+            numpy.ndarray: The filtered samples of shape (samples, columns).
+        """
+        x = np.asarray(x, dtype=float).reshape(-1, self.n_columns)
+        if len(x) == 0:
+            return x.copy()
+        extended = np.vstack((self.history, x))
+        # Window of sample i: the window_size samples before it, shape (samples, columns, window)
+        windows = np.lib.stride_tricks.sliding_window_view(extended, self.window_size, axis=0)[:len(x)]
+        is_missing = np.isnan(windows)
+        # Windows without NaN: the window size is odd, so the median is the middle element
+        half = self.window_size // 2
+        median = np.partition(windows, half, axis=2)[:, :, half]
+        mad = np.partition(np.abs(windows - median[:, :, None]), half, axis=2)[:, :, half]
+        is_ready = np.ones(x.shape, dtype=bool)
+        has_missing = is_missing.any(axis=2)
+        if has_missing.any():
+            partial = windows[has_missing]  # (windows with NaN, window)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN windows give NaN, which is never flagged
+                median[has_missing] = np.nanmedian(partial, axis=1)
+                mad[has_missing] = np.nanmedian(np.abs(partial - median[has_missing][:, None]), axis=1)
+            is_ready[has_missing] = self.window_size - np.count_nonzero(is_missing[has_missing], axis=1) \
+                >= self.min_periods
+        is_outlier = is_ready & hampel_outliers(x, median, mad, self.n_sigmas, self.min_mad)
+        self.history = extended[-self.window_size:].copy()
+        self.outlier_count += int(np.count_nonzero(is_outlier))
+        return np.where(is_outlier, median, x)
+
+    def process_sample(self, x):
+        """
+        Filter one sample.
+
+        Args:
+            x (numpy.ndarray): The sample of shape (columns,).
+
+        Returns:
+            numpy.ndarray: The filtered sample of shape (columns,).
+        """
+        return self.process(np.asarray(x, dtype=float)[None, :])[0]
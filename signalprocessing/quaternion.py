@@ -0,0 +1,82 @@
+import math
+import numpy as np
+
+COEF_RAD2DEG = 57.2957795131
+
+
+def quaternion_to_euler(q):
+    """
+    Convert quaternions to Euler angles (roll, pitch, yaw) in degrees.
+
+    The conversion is vectorized over the rows of `q` and gives the same angles
+    as quaternion_to_euler_scalar for valid quaternions. Unlike the live path,
+    rows containing NaN or with a zero norm yield NaN angles, so that missing
+    samples stay visible as gaps to the later interpolation and outlier
+    handling. The pitch is 0.0 where the arcsin argument of a valid quaternion
+    lies outside [-1, 1].
+
+    Args:
+        q (numpy.ndarray): Array of shape (N, 4) with the quaternion components (w, x, y, z) in each row.
+
+    Returns:
+        numpy.ndarray: Array of shape (N, 3) with the roll, pitch and yaw angles in degrees.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    if q.ndim != 2 or q.shape[1] != 4:
+        raise ValueError(f"Quaternions must have shape (N, 4), got {q.shape}.")
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    sqw = w * w
+    sqx = x * x
+    sqy = y * y
+    sqz = z * z
+    norm = sqx + sqy + sqz + sqw
+    is_valid = np.isfinite(norm) & (norm > 0)
+
+    euler = np.zeros((q.shape[0], 3))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Roll
+        euler[:, 0] = np.arctan2(2.0 * (y * z + x * w), -sqx - sqy + sqz + sqw)
+        # Pitch
+        sin_pitch = -2.0 * (x * z - y * w) / norm
+        in_range = np.abs(sin_pitch) <= 1
+        euler[:, 1] = np.where(in_range, np.arcsin(np.where(in_range, sin_pitch, 0.0)), 0.0)
+        # Yaw
+        euler[:, 2] = np.arctan2(2.0 * (x * y + z * w), sqx - sqy - sqz + sqw)
+    euler *= COEF_RAD2DEG
+    euler[~is_valid] = np.nan
+    return euler
+
+
+def quaternion_to_euler_scalar(w, x, y, z):
+    """
+    Convert one quaternion to Euler angles (roll, pitch, yaw) in degrees.
+
+    Uses the math module, which is several times faster than NumPy on single
+    floats. Intended for the per-sample acquisition loop, whose output it keeps
+    unchanged: the zero quaternion reported by the BNO055 before the fusion is
+    ready gives (0.0, 0.0, 0.0), like missing components do, and NaN components
+    propagate as in the original per-sample conversion.
+
+    Args:
+        w (float): The w component of the quaternion.
+        x (float): The x component of the quaternion.
+        y (float): The y component of the quaternion.
+        z (float): The z component of the quaternion.
+
+    Returns:
+        tuple: The roll, pitch and yaw angles in degrees. (0.0, 0.0, 0.0) if the
+            quaternion has a zero norm.
+    """
+    sqw = w * w
+    sqx = x * x
+    sqy = y * y
+    sqz = z * z
+    norm = sqx + sqy + sqz + sqw
+    if norm == 0:
+        return 0.0, 0.0, 0.0
+
+    roll = math.atan2(2.0 * (y * z + x * w), -sqx - sqy + sqz + sqw)
+    sin_pitch = -2.0 * (x * z - y * w) / norm
+    pitch = math.asin(sin_pitch) if -1 <= sin_pitch <= 1 else 0.0
+    yaw = math.atan2(2.0 * (x * y + z * w), sqx - sqy - sqz + sqw)
+    return COEF_RAD2DEG * roll, COEF_RAD2DEG * pitch, COEF_RAD2DEG * yaw
@@ -0,0 +1,309 @@
+import numpy as np
+import pandas as pd
+from scipy import signal
+
+from signalprocessing.filter import StreamingLowpass
+
+RESAMPLE_METHODS = ("zoh", "linear", "decimate")
+
+
+def unique_samples(times, values):
+    """
+    Drop repeated samples, keeping the first sample of every acquisition timestamp.
+
+    When a slow sensor is stored in a faster measurement loop, the same sample
+    appears in several rows with the same sensor timestamp. Only the first of
+    them is a real sample. Rows without a valid timestamp are dropped as well.
+
+    Args:
+        times (numpy.ndarray): The acquisition timestamps of shape (N,), non-decreasing.
+        values (numpy.ndarray): The samples of shape (N, C).
+
+    Returns:
+        tuple: The timestamps (M,) and samples (M, C) of the unique samples.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64).reshape(len(times), -1)
+    is_valid = np.isfinite(times)
+    times, values = times[is_valid], values[is_valid]
+    if len(times) == 0:
+        return times, values
+    is_new = np.empty(len(times), dtype=bool)
+    is_new[0] = True
+    np.greater(times[1:], times[:-1], out=is_new[1:])
+    return times[is_new], values[is_new]
+
+
+def hold_nan(values, initial=None):
+    """
+    Replace NaN by the last valid value of the same column (forward fill).
+
+    Args:
+        values (numpy.ndarray): The samples of shape (N, C).
+        initial (numpy.ndarray, optional): The values of shape (C,) held before the first sample.
+
+    Returns:
+        numpy.ndarray: The filled samples. Leading NaN stay NaN unless `initial` is given.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if initial is not None:
+        values = np.vstack((initial, values))
+    is_valid = ~np.isnan(values)
+    index = np.where(is_valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = np.take_along_axis(values, index, axis=0)
+    return filled[1:] if initial is not None else filled
+
+
+def make_timeline(t_start, t_end, period):
+    """
+    Return the common timeline t_start, t_start + period, ... up to t_end.
+
+    Args:
+        t_start (float): The first time.
+        t_end (float): The last time (inclusive).
+        period (float): The period of the timeline in seconds.
+
+    Returns:
+        numpy.ndarray: The timeline.
+    """
+    n = int(np.floor((t_end - t_start) / period + 1e-9)) + 1
+    return t_start + np.arange(max(n, 0)) * period
+
+
+def resample_zoh(times, values, target_times):
+    """
+    Resample with zero-order hold: every target time takes the newest sample at or before it.
+
+    Args:
+        times (numpy.ndarray): The sample timestamps of shape (N,), increasing.
+        values (numpy.ndarray): The samples of shape (N, C).
+        target_times (numpy.ndarray): The target timeline of shape (M,).
+
+    Returns:
+        numpy.ndarray: The resampled values of shape (M, C). NaN before the first sample.
+    """
+    index = np.searchsorted(times, target_times, side="right") - 1
+    resampled = values[np.clip(index, 0, None)] if len(times) else np.full((len(target_times), values.shape[1]), np.nan)
+    resampled[index < 0] = np.nan
+    return resampled
+
+
+def resample_linear(times, values, target_times):
+    """
+    Resample with linear interpolation between the neighbouring samples.
+
+    NaN samples are skipped per column. Target times outside the sampled range are NaN.
+
+    Args:
+        times (numpy.ndarray): The sample timestamps of shape (N,), increasing.
+        values (numpy.ndarray): The samples of shape (N, C).
+        target_times (numpy.ndarray): The target timeline of shape (M,).
+
+    Returns:
+        numpy.ndarray: The resampled values of shape (M, C).
+    """
+    resampled = np.full((len(target_times), values.shape[1]), np.nan)
+    if len(times) == 0:
+        return resampled
+    is_valid = ~np.isnan(values)
+    if is_valid.all():
+        # Interpolate all columns at once: locate the target times once and blend the neighbours
+        right = np.clip(np.searchsorted(times, target_times, side="right"), 1, max(len(times) - 1, 1))
+        left = right - 1
+        if len(times) == 1:
+            weight = np.zeros(len(target_times))
+            right = left
+        else:
+            weight = (target_times - times[left]) / (times[right] - times[left])
+        resampled = values[left] + (values[right] - values[left]) * weight[:, None]
+        resampled[(target_times < times[0]) | (target_times > times[-1])] = np.nan
+        return resampled
+    for column in range(values.shape[1]):
+        valid = is_valid[:, column]
+        if valid.any():
+            resampled[:, column] = np.interp(target_times, times[valid], values[valid, column],
+                                             left=np.nan, right=np.nan)
+    return resampled
+
+
+def design_antialias_sos(source_period, target_period, order=4):
+    """
+    Design the anti-aliasing low-pass filter of a decimation.
+
+    The cutoff is 80 % of the Nyquist frequency of the target timeline.
+
+    Args:
+        source_period (float): The sampling period of the input in seconds.
+        target_period (float): The period of the target timeline in seconds.
+        order (int, optional): The order of the Butterworth filter.
+
+    Returns:
+        numpy.ndarray or None: The filter as second-order sections, or None if the
+            target timeline is not slower than the input (no filtering needed).
+    """
+    source_fs = 1 / source_period
+    cutoff = 0.8 * 0.5 / target_period
+    if cutoff >= 0.5 * source_fs:
+        return None
+    return signal.butter(order, cutoff, "low", output="sos", fs=source_fs)
+
+
+def resample(times, values, target_times, method="zoh"):
+    """
+    Resample irregular samples onto a target timeline.
+
+    Args:
+        times (numpy.ndarray): The sample timestamps of shape (N,). Repeated timestamps are dropped.
+        values (numpy.ndarray): The samples of shape (N,) or (N, C).
+        target_times (numpy.ndarray): The target timeline of shape (M,).
+        method (str, optional): "zoh" (zero-order hold), "linear" (linear interpolation) or
+            "decimate" (zero-phase anti-aliasing low-pass, then linear interpolation).
+
+    Returns:
+        numpy.ndarray: The resampled values of shape (M, C).
+    """
+    if method not in RESAMPLE_METHODS:
+        raise ValueError(f"Unknown resampling method: {method}. Choose from {RESAMPLE_METHODS}.")
+    times, values = unique_samples(times, values)
+    target_times = np.asarray(target_times, dtype=np.float64)
+    if method == "zoh":
+        return resample_zoh(times, values, target_times)
+    if method == "decimate" and len(times) > 1 and len(target_times) > 1:
+        sos = design_antialias_sos(np.median(np.diff(times)), np.median(np.diff(target_times)))
+        if sos is not None:
+            filled = hold_nan(values)
+            is_valid = ~np.isnan(filled).any(axis=1)
+            padlen = min(3 * (2 * len(sos) + 1), is_valid.sum() - 1)
+            if padlen >= 0:
+                filtered = np.full_like(filled, np.nan)
+                filtered[is_valid] = signal.sosfiltfilt(sos, filled[is_valid], axis=0, padlen=padlen)
+                filtered[np.isnan(values)] = np.nan  # Missing samples stay missing
+                values = filtered
+    return resample_linear(times, values, target_times)
+
+
+def align_session(df, column_groups, period, method="zoh", time_column="Time"):
+    """
+    Align the channels of a recorded session onto one common timeline.
+
+    Every group of channels is resampled from its own acquisition timestamps, so
+    slow sensors are neither duplicated nor stamped with the time of the loop.
+
+    Args:
+        df (pd.DataFrame): The recorded session.
+        column_groups (dict): Mapping of a timestamp column (e.g. "Time_elm327") to the
+            channels acquired at those timestamps. Channels mapped to `time_column`
+            use the time of the measurement loop.
+        period (float): The period of the common timeline in seconds.
+        method (str or dict, optional): The resampling method, or a mapping of channel to method.
+        time_column (str, optional): The time column of the measurement loop.
+
+    Returns:
+        pd.DataFrame: The aligned session with `time_column` followed by the channels.
+    """
+    start_times, end_times = [], []
+    for timestamp_column in column_groups:
+        times = df[timestamp_column].to_numpy(dtype=np.float64)
+        if np.isfinite(times).any():
+            start_times.append(np.nanmin(times))
+            end_times.append(np.nanmax(times))
+    if not start_times:
+        return pd.DataFrame(columns=[time_column] + [c for cs in column_groups.values() for c in cs])
+    # The timeline covers the span where every group has samples
+    target_times = make_timeline(max(start_times), min(end_times), period)
+
+    aligned = {time_column: target_times}
+    for timestamp_column, channels in column_groups.items():
+        times = df[timestamp_column].to_numpy(dtype=np.float64)
+        channels = list(channels)
+        methods = {channel: method.get(channel, "zoh") if isinstance(method, dict) else method for channel in channels}
+        for channel_method in dict.fromkeys(methods.values()):
+            selected = [channel for channel in channels if methods[channel] == channel_method]
+            resampled = resample(times, df[selected].to_numpy(dtype=np.float64), target_times, channel_method)
+            aligned.update(zip(selected, resampled.T))
+    return pd.DataFrame(aligned)
+
+
+class StreamResampler:
+    """
+    Incremental resampler emitting a fixed-period timeline from irregular samples.
+
+    Blocks of timestamped samples (e.g. new rows of the measurement buffer) are
+    pushed as they arrive, and every target time up to the newest sample is
+    emitted once. The last sample of every block is kept, so the output is the
+    same as resampling the whole stream at once, except for "decimate", whose
+    anti-aliasing filter is causal here (no look-ahead is possible in real time).
+    """
+
+    def __init__(self, period, n_columns, method="zoh", source_period=None, t_start=None):
+        """
+        Initialize the resampler.
+
+        Args:
+            period (float): The period of the output timeline in seconds.
+            n_columns (int): The number of channels.
+            method (str, optional): "zoh", "linear" or "decimate".
+            source_period (float, optional): The nominal input sampling period, required by "decimate".
+            t_start (float, optional): The first output time. Defaults to the first sample time.
+        """
+        if method not in RESAMPLE_METHODS:
+            raise ValueError(f"Unknown resampling method: {method}. Choose from {RESAMPLE_METHODS}.")
+        self.period = period
+        self.n_columns = n_columns
+        self.method = method
+        self.t_start = t_start
+        self.lowpass = None
+        if method == "decimate":
+            if source_period is None:
+                raise ValueError("source_period is required for decimation.")
+            sos = design_antialias_sos(source_period, period)
+            if sos is not None:
+                self.lowpass = StreamingLowpass(sos, n_columns)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all samples and restart the output timeline.
+        """
+        self.next_time = self.t_start
+        self.last_time = None
+        self.last_values = None
+        if self.lowpass is not None:
+            self.lowpass.reset()
+
+    def process(self, times, values):
+        """
+        Push a block of samples and return the newly completed output samples.
+
+        Args:
+            times (numpy.ndarray): The sample timestamps of shape (N,), non-decreasing.
+            values (numpy.ndarray): The samples of shape (N, n_columns).
+
+        Returns:
+            tuple: The output times (M,) and values (M, n_columns).
+        """
+        times, values = unique_samples(times, values)
+        if self.last_time is not None:
+            is_new = times > self.last_time
+            times, values = times[is_new], values[is_new]
+        if len(times) == 0:
+            return np.empty(0), np.empty((0, self.n_columns))
+        if self.lowpass is not None:
+            values = self.lowpass.process(values)
+
+        if self.last_time is not None:
+            times = np.concatenate(([self.last_time], times))
+            values = np.vstack((self.last_values, values))
+        if self.next_time is None:
+            self.next_time = times[0]
+        target_times = make_timeline(self.next_time, times[-1], self.period)
+        self.last_time = times[-1]
+        self.last_values = values[-1].copy()
+        if len(target_times) == 0:
+            return target_times, np.empty((0, self.n_columns))
+        self.next_time = target_times[-1] + self.period
+
+        if self.method == "zoh":
+            return target_times, resample_zoh(times, values, target_times)
+        return target_times, resample_linear(times, values, target_times)
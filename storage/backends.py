@@ -0,0 +1,749 @@
+import os
+import sys
+import json
+import struct
+import argparse
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+
+class CsvStorage:
+    """
+    Storage backend writing measurement blocks as CSV text.
+    """
+    EXTENSION = ".csv"
+
+    def append(self, path, block, columns):
+        """
+        Append a block of samples to a CSV file, writing the header if the file is new.
+
+        Args:
+            path (str): The file path.
+            block (numpy.ndarray): Samples of shape (rows, columns).
+            columns (list of str): The column names of the block.
+        """
+        df = pd.DataFrame(block, columns=list(columns), copy=False)
+        if not os.path.isfile(path):
+            df.to_csv(path, sep=",", encoding="utf-8", index=False, header=True, mode="w")
+        else:
+            df.to_csv(path, sep=",", encoding="utf-8", index=False, header=False, mode="a")
+
+    def close(self, path):
+        """
+        Finish writing a file. CSV files need no finalization.
+
+        Args:
+            path (str): The file path.
+        """
+        pass
+
+    def close_all(self):
+        """
+        Finish writing all files. CSV files need no finalization.
+        """
+        pass
+
+    def write(self, path, df):
+        """
+        Write a whole DataFrame to a new CSV file.
+
+        Args:
+            path (str): The file path.
+            df (pd.DataFrame): The data to write.
+        """
+        df.to_csv(path, sep=",", encoding="utf-8", index=False, header=True)
+
+    def read(self, path):
+        """
+        Read a CSV file into a DataFrame.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            pd.DataFrame: The recorded data.
+        """
+        return pd.read_csv(path, header=0)
+
+    def iter_chunks(self, path, chunk_rows):
+        """
+        Read a CSV file in blocks of at most `chunk_rows` samples.
+
+        Args:
+            path (str): The file path.
+            chunk_rows (int): The maximum number of samples per block.
+
+        Yields:
+            tuple: A tuple (block, columns) with the samples of shape (rows, columns)
+                and the column names.
+        """
+        for df in pd.read_csv(path, header=0, chunksize=chunk_rows):
+            yield df.to_numpy(dtype=np.float64), list(df.columns)
+
+
+class BinaryStorage:
+    """
+    Storage backend writing measurement blocks as raw little-endian float64 rows.
+
+    A file starts with an 8 byte magic, a little-endian uint32 header length and a
+    JSON header describing the columns. The rest of the file is a row-major array
+    of float64 values, so blocks are appended without any text formatting.
+    """
+    EXTENSION = ".bin"
+    MAGIC = b"VDDMRAW1"
+    DTYPE = np.dtype("<f8")
+
+    def append(self, path, block, columns):
+        """
+        Append a block of samples to a binary file, writing the header if the file is new.
+
+        Args:
+            path (str): The file path.
+            block (numpy.ndarray): Samples of shape (rows, columns).
+            columns (list of str): The column names of the block.
+        """
+        block = np.ascontiguousarray(block, dtype=self.DTYPE)
+        is_new = not os.path.isfile(path)
+        with open(path, "ab") as f:
+            if is_new:
+                f.write(self.build_header(columns))
+            f.write(memoryview(block).cast("B"))
+
+    def close(self, path):
+        """
+        Finish writing a file. Binary files need no finalization.
+
+        Args:
+            path (str): The file path.
+        """
+        pass
+
+    def close_all(self):
+        """
+        Finish writing all files. Binary files need no finalization.
+        """
+        pass
+
+    def write(self, path, df):
+        """
+        Write a whole DataFrame to a new binary file.
+
+        Args:
+            path (str): The file path.
+            df (pd.DataFrame): The data to write.
+        """
+        if os.path.isfile(path):
+            os.remove(path)
+        self.append(path, df.to_numpy(dtype=self.DTYPE), df.columns)
+
+    def build_header(self, columns):
+        """
+        Build the file header for the given columns.
+
+        Args:
+            columns (list of str): The column names.
+
+        Returns:
+            bytes: The encoded header.
+        """
+        header = json.dumps({"columns": list(columns), "dtype": self.DTYPE.str}).encode("utf-8")
+        return self.MAGIC + struct.pack("<I", len(header)) + header
+
+    def read_header(self, path):
+        """
+        Read the header of a binary file.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            tuple: A tuple (columns, data_offset) with the column names and the byte
+                offset of the first sample.
+        """
+        with open(path, "rb") as f:
+            magic = f.read(len(self.MAGIC))
+            if magic != self.MAGIC:
+                raise ValueError(f"Not a binary measurement file: {path}")
+            (header_length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_length).decode("utf-8"))
+        return header["columns"], len(self.MAGIC) + 4 + header_length
+
+    def read_array(self, path):
+        """
+        Read the samples of a binary file as an array.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            tuple: A tuple (array, columns) with the samples of shape (rows, columns)
+                and the column names.
+        """
+        columns, offset = self.read_header(path)
+        data = np.fromfile(path, dtype=self.DTYPE, offset=offset)
+        # Drop a partially written trailing row, e.g. after a power loss
+        rows = len(data) // len(columns)
+        return data[:rows * len(columns)].reshape(rows, len(columns)), columns
+
+    def read(self, path):
+        """
+        Read a binary file into a DataFrame.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            pd.DataFrame: The recorded data.
+        """
+        data, columns = self.read_array(path)
+        return pd.DataFrame(data, columns=columns, copy=False)
+
+    def iter_chunks(self, path, chunk_rows):
+        """
+        Read a binary file in blocks of at most `chunk_rows` samples.
+
+        The file is memory-mapped, so only the blocks being processed are loaded.
+
+        Args:
+            path (str): The file path.
+            chunk_rows (int): The maximum number of samples per block.
+
+        Yields:
+            tuple: A tuple (block, columns) with the samples of shape (rows, columns)
+                and the column names.
+        """
+        columns, offset = self.read_header(path)
+        rows = (os.path.getsize(path) - offset) // (self.DTYPE.itemsize * len(columns))
+        if rows == 0:
+            return
+        data = np.memmap(path, dtype=self.DTYPE, mode="r", offset=offset, shape=(rows, len(columns)))
+        for start in range(0, rows, chunk_rows):
+            yield np.array(data[start:start + chunk_rows]), columns
+
+
+class ParquetStorage:
+    """
+    Storage backend writing measurement blocks as Parquet row groups.
+
+    A Parquet file cannot be reopened for appending, so a writer is kept open per
+    path until close() is called. Appending to a closed file rewrites its row
+    groups into a new writer first, so no samples are lost. Requires pyarrow.
+    """
+    EXTENSION = ".parquet"
+
+    def __init__(self):
+        if pa is None:
+            raise ImportError("pyarrow is required for the parquet storage format")
+        self.writers = {}
+
+    def append(self, path, block, columns):
+        """
+        Append a block of samples as a new row group.
+
+        Args:
+            path (str): The file path.
+            block (numpy.ndarray): Samples of shape (rows, columns).
+            columns (list of str): The column names of the block.
+        """
+        table = pa.Table.from_arrays([pa.array(block[:, i]) for i in range(block.shape[1])],
+                                     names=list(columns))
+        writer = self.writers.get(path)
+        if writer is not None and not os.path.isfile(path):
+            # The file was deleted while its writer was open, e.g. when a new measurement starts
+            self.close(path)
+            writer = None
+        if writer is None:
+            writer = self._open_writer(path, table.schema)
+        writer.write_table(table)
+
+    def _open_writer(self, path, schema):
+        if not os.path.isfile(path):
+            writer = pq.ParquetWriter(path, schema)
+            self.writers[path] = writer
+            return writer
+        # Continue a closed file: copy its row groups into a new file, since the footer cannot be reopened
+        previous_path = path + ".previous"
+        os.replace(path, previous_path)
+        writer = None
+        try:
+            previous = pq.ParquetFile(previous_path)
+            if previous.schema_arrow.names != schema.names:
+                raise ValueError(f"Columns do not match the existing file: {path}")
+            writer = pq.ParquetWriter(path, schema)
+            for i in range(previous.num_row_groups):
+                writer.write_table(previous.read_row_group(i).cast(schema))
+        except Exception:
+            if writer is not None:
+                writer.close()
+            os.replace(previous_path, path)
+            raise
+        os.remove(previous_path)
+        self.writers[path] = writer
+        return writer
+
+    def close(self, path):
+        """
+        Close the writer of a file so that the Parquet footer is written.
+
+        Args:
+            path (str): The file path.
+        """
+        writer = self.writers.pop(path, None)
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception as e:
+                print(f"Error closing the Parquet writer of {path}: {e}")
+
+    def close_all(self):
+        """
+        Close the writers of all files.
+        """
+        for path in list(self.writers):
+            self.close(path)
+
+    def write(self, path, df):
+        """
+        Write a whole DataFrame to a new Parquet file.
+
+        Args:
+            path (str): The file path.
+            df (pd.DataFrame): The data to write.
+        """
+        df.to_parquet(path, index=False)
+
+    def read(self, path):
+        """
+        Read a Parquet file into a DataFrame.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            pd.DataFrame: The recorded data.
+        """
+        return pd.read_parquet(path)
+
+    def iter_chunks(self, path, chunk_rows):
+        """
+        Read a Parquet file in blocks of at most `chunk_rows` samples.
+
+        Args:
+            path (str): The file path.
+            chunk_rows (int): The maximum number of samples per block.
+
+        Yields:
+            tuple: A tuple (block, columns) with the samples of shape (rows, columns)
+                and the column names.
+        """
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            df = batch.to_pandas()
+            yield df.to_numpy(dtype=np.float64), list(df.columns)
+
+
+class ChunkedStorage:
+    """
+    Storage backend writing measurement samples as time-indexed, column-major chunks.
+
+    A file starts with an 8 byte magic, a little-endian uint32 header length and a
+    JSON header describing the columns. Samples are written in chunks of
+    `chunk_rows` rows (the last chunk may be shorter). Every chunk is a uint64 row
+    count followed by the float64 values stored column by column, so one column of
+    a chunk is a contiguous run of bytes. When the file is closed, a JSON index
+    with the byte offset, row count, first/last time and per-column min/max of
+    every chunk is appended, followed by its uint64 length and a footer magic.
+
+    Readers use the index to read only the chunks overlapping a time window, and
+    only the requested columns of them, through np.memmap. A file whose index is
+    missing (e.g. after a power loss) is indexed by scanning the chunk headers.
+    """
+    EXTENSION = ".chunked"
+    MAGIC = b"VDDMCHK1"
+    FOOTER_MAGIC = b"VDDMIDX1"
+    DTYPE = np.dtype("<f8")
+    COUNT = struct.Struct("<Q")
+
+    def __init__(self, chunk_rows=4096):
+        """
+        Initialize the backend.
+
+        Args:
+            chunk_rows (int, optional): The number of samples per chunk.
+        """
+        self.chunk_rows = int(chunk_rows)
+        self.writers = {}  # path -> {"columns", "pending" (list of arrays), "pending_rows", "chunks"}
+
+    def append(self, path, block, columns):
+        """
+        Append a block of samples. Complete chunks are written immediately and the
+        remaining samples are kept in memory until the chunk is full or the file is closed.
+
+        Args:
+            path (str): The file path.
+            block (numpy.ndarray): Samples of shape (rows, columns).
+            columns (list of str): The column names of the block.
+        """
+        writer = self.writers.get(path)
+        if writer is None or not os.path.isfile(path):
+            writer = self._open_writer(path, columns)
+        # The block may be a view of a buffer that is reused, so it is copied
+        writer["pending"].append(np.array(block, dtype=self.DTYPE))
+        writer["pending_rows"] += len(block)
+        if writer["pending_rows"] >= self.chunk_rows:
+            self._write_chunks(path, writer, is_final=False)
+
+    def close(self, path):
+        """
+        Write the remaining samples and the index of a file.
+
+        Args:
+            path (str): The file path.
+        """
+        writer = self.writers.pop(path, None)
+        if writer is None or not os.path.isfile(path):
+            return
+        self._write_chunks(path, writer, is_final=True)
+        index = json.dumps({"columns": writer["columns"], "chunks": writer["chunks"]}).encode("utf-8")
+        with open(path, "ab") as f:
+            f.write(index + self.COUNT.pack(len(index)) + self.FOOTER_MAGIC)
+
+    def close_all(self):
+        """
+        Write the remaining samples and the index of all open files.
+        """
+        for path in list(self.writers):
+            self.close(path)
+
+    def write(self, path, df):
+        """
+        Write a whole DataFrame to a new chunked file.
+
+        Args:
+            path (str): The file path.
+            df (pd.DataFrame): The data to write.
+        """
+        if os.path.isfile(path):
+            os.remove(path)
+        self.writers.pop(path, None)
+        self.append(path, df.to_numpy(dtype=self.DTYPE), df.columns)
+        self.close(path)
+
+    def _open_writer(self, path, columns):
+        columns = [str(column) for column in columns]
+        chunks = []
+        if os.path.isfile(path):
+            # Continue an existing file: drop its index, which is rewritten on close
+            file_columns, chunks, data_end = self._load_index(path)
+            if file_columns != columns:
+                raise ValueError(f"Columns do not match the existing file: {path}")
+            with open(path, "r+b") as f:
+                f.truncate(data_end)
+        else:
+            header = json.dumps({"columns": columns, "dtype": self.DTYPE.str,
+                                 "chunk_rows": self.chunk_rows}).encode("utf-8")
+            # Pad the header so that every chunk, and thus every float64 value, is 8-byte aligned
+            header += b" " * (-(len(self.MAGIC) + 4 + len(header)) % self.DTYPE.itemsize)
+            with open(path, "wb") as f:
+                f.write(self.MAGIC + struct.pack("<I", len(header)) + header)
+        writer = {"columns": columns, "pending": [], "pending_rows": 0, "chunks": chunks}
+        self.writers[path] = writer
+        return writer
+
+    def _write_chunks(self, path, writer, is_final):
+        data = np.concatenate(writer["pending"]) if writer["pending"] else np.empty((0, len(writer["columns"])))
+        n_full = len(data) // self.chunk_rows * self.chunk_rows
+        end = len(data) if is_final else n_full
+        time_index = self.time_column_index(writer["columns"])
+        with open(path, "ab") as f:
+            for start in range(0, end, self.chunk_rows):
+                chunk = data[start:min(start + self.chunk_rows, end)]
+                offset = f.tell()
+                f.write(self.COUNT.pack(len(chunk)))
+                f.write(memoryview(np.ascontiguousarray(chunk.T)).cast("B"))
+                writer["chunks"].append(self._chunk_entry(chunk, offset, time_index))
+        writer["pending"] = [data[end:]] if end < len(data) else []
+        writer["pending_rows"] = len(data) - end
+
+    @staticmethod
+    def _chunk_entry(chunk, offset, time_index):
+        def finite_or_none(values):
+            return [None if np.isnan(value) else float(value) for value in values]
+
+        # fmin/fmax ignore NaN and give NaN (without a warning) only for all-NaN columns
+        return {
+            "offset": offset,
+            "rows": len(chunk),
+            "t_first": float(chunk[0, time_index]),
+            "t_last": float(chunk[-1, time_index]),
+            "min": finite_or_none(np.fmin.reduce(chunk, axis=0)),
+            "max": finite_or_none(np.fmax.reduce(chunk, axis=0)),
+        }
+
+    @staticmethod
+    def time_column_index(columns):
+        """
+        Return the index of the column used as the time axis of the index.
+
+        Args:
+            columns (list of str): The column names.
+
+        Returns:
+            int: The index of "Time", or 0 if there is no "Time" column.
+        """
+        return list(columns).index("Time") if "Time" in columns else 0
+
+    def read_header(self, path):
+        """
+        Read the header of a chunked file.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            tuple: A tuple (columns, data_offset) with the column names and the byte
+                offset of the first chunk.
+        """
+        with open(path, "rb") as f:
+            magic = f.read(len(self.MAGIC))
+            if magic != self.MAGIC:
+                raise ValueError(f"Not a chunked measurement file: {path}")
+            (header_length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_length).decode("utf-8"))
+        return header["columns"], len(self.MAGIC) + 4 + header_length
+
+    def _load_index(self, path):
+        # Returns (columns, chunk entries, byte offset of the end of the last chunk)
+        columns, data_offset = self.read_header(path)
+        size = os.path.getsize(path)
+        footer_length = self.COUNT.size + len(self.FOOTER_MAGIC)
+        with open(path, "rb") as f:
+            if size >= data_offset + footer_length:
+                f.seek(size - footer_length)
+                footer = f.read(footer_length)
+                if footer[self.COUNT.size:] == self.FOOTER_MAGIC:
+                    (index_length,) = self.COUNT.unpack(footer[:self.COUNT.size])
+                    index_start = size - footer_length - index_length
+                    f.seek(index_start)
+                    index = json.loads(f.read(index_length).decode("utf-8"))
+                    return columns, index["chunks"], index_start
+        return columns, *self._scan_chunks(path, columns, data_offset, size)
+
+    def _scan_chunks(self, path, columns, data_offset, size):
+        # Rebuild the index of a file that was not closed, dropping a partially written chunk
+        chunks = []
+        time_index = self.time_column_index(columns)
+        offset = data_offset
+        with open(path, "rb") as f:
+            while offset + self.COUNT.size <= size:
+                f.seek(offset)
+                (rows,) = self.COUNT.unpack(f.read(self.COUNT.size))
+                chunk_end = offset + self.COUNT.size + rows * len(columns) * self.DTYPE.itemsize
+                if rows == 0 or chunk_end > size:
+                    break
+                values = np.fromfile(f, dtype=self.DTYPE, count=rows * len(columns)).reshape(len(columns), rows)
+                chunks.append(self._chunk_entry(values.T, offset, time_index))
+                offset = chunk_end
+        return chunks, offset
+
+    def read_index(self, path):
+        """
+        Read the chunk index of a file.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            tuple: A tuple (columns, chunks) with the column names and, for every chunk,
+                a dictionary with its "offset", "rows", "t_first", "t_last", "min" and "max".
+        """
+        columns, chunks, _ = self._load_index(path)
+        return columns, chunks
+
+    def iter_range(self, path, t0=None, t1=None, columns=None):
+        """
+        Read the samples with t0 <= Time <= t1 chunk by chunk.
+
+        Only the chunks overlapping the window are mapped, and only the requested
+        columns of them are read. Blocks are zero-copy views of the file when all
+        columns or a contiguous run of columns are requested.
+
+        Args:
+            path (str): The file path.
+            t0 (float, optional): The start of the window. Defaults to the start of the recording.
+            t1 (float, optional): The end of the window. Defaults to the end of the recording.
+            columns (list of str, optional): The columns to read. Defaults to all columns.
+
+        Yields:
+            tuple: A tuple (block, columns) with the samples of shape (rows, columns)
+                and the column names.
+        """
+        file_columns, chunks = self.read_index(path)
+        columns = list(file_columns) if columns is None else list(columns)
+        column_index = {column: index for index, column in enumerate(file_columns)}
+        missing = [column for column in columns if column not in column_index]
+        if missing:
+            raise KeyError(f"Columns {missing} are not in {path}")
+        selected = [column_index[column] for column in columns]
+        is_contiguous = selected == list(range(selected[0], selected[0] + len(selected))) if selected else True
+        time_index = self.time_column_index(file_columns)
+
+        # The index is ordered by time, so the overlapping chunks are found by binary search
+        t_first = np.array([chunk["t_first"] for chunk in chunks])
+        t_last = np.array([chunk["t_last"] for chunk in chunks])
+        first = 0 if t0 is None else int(np.searchsorted(t_last, t0, side="left"))
+        last = len(chunks) if t1 is None else int(np.searchsorted(t_first, t1, side="right"))
+        if first >= last:
+            return
+        file_map = np.memmap(path, dtype=np.uint8, mode="r")
+        for chunk in chunks[first:last]:
+            data_start = chunk["offset"] + self.COUNT.size
+            data_end = data_start + chunk["rows"] * len(file_columns) * self.DTYPE.itemsize
+            data = file_map[data_start:data_end].view(self.DTYPE).reshape(len(file_columns), chunk["rows"])
+            time = data[time_index]
+            start = 0 if t0 is None else int(np.searchsorted(time, t0, side="left"))
+            end = chunk["rows"] if t1 is None else int(np.searchsorted(time, t1, side="right"))
+            if start >= end:
+                continue
+            if is_contiguous:
+                block = data[selected[0]:selected[0] + len(selected), start:end].T if selected \
+                    else np.empty((end - start, 0))
+            else:
+                block = data[selected, start:end].T
+            yield block, columns
+
+    def read_range(self, path, t0=None, t1=None, columns=None):
+        """
+        Read the samples with t0 <= Time <= t1 into a DataFrame.
+
+        Args:
+            path (str): The file path.
+            t0 (float, optional): The start of the window. Defaults to the start of the recording.
+            t1 (float, optional): The end of the window. Defaults to the end of the recording.
+            columns (list of str, optional): The columns to read. Defaults to all columns.
+
+        Returns:
+            pd.DataFrame: The samples of the window.
+        """
+        if columns is None:
+            columns = self.read_header(path)[0]
+        blocks = [block for block, _ in self.iter_range(path, t0, t1, columns)]
+        data = np.concatenate(blocks) if blocks else np.empty((0, len(columns)))
+        return pd.DataFrame(data, columns=list(columns))
+
+    def read(self, path):
+        """
+        Read a chunked file into a DataFrame.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            pd.DataFrame: The recorded data.
+        """
+        return self.read_range(path)
+
+    def iter_chunks(self, path, chunk_rows):
+        """
+        Read a chunked file in blocks of at most `chunk_rows` samples.
+
+        Args:
+            path (str): The file path.
+            chunk_rows (int): The maximum number of samples per block.
+
+        Yields:
+            tuple: A tuple (block, columns) with the samples of shape (rows, columns)
+                and the column names.
+        """
+        for block, columns in self.iter_range(path):
+            for start in range(0, len(block), chunk_rows):
+                yield np.array(block[start:start + chunk_rows]), columns
+
+
+STORAGE_BACKENDS = {
+    "csv": CsvStorage,
+    "binary": BinaryStorage,
+    "parquet": ParquetStorage,
+    "chunked": ChunkedStorage,
+}
+
+
+def create_storage(storage_format):
+    """
+    Create the storage backend for the given format name.
+
+    Args:
+        storage_format (str): One of "csv", "binary", "parquet" or "chunked".
+
+    Returns:
+        object: The storage backend instance.
+    """
+    try:
+        return STORAGE_BACKENDS[storage_format]()
+    except KeyError:
+        raise ValueError(f"Unknown storage format: {storage_format}. "
+                         f"Choose from {', '.join(STORAGE_BACKENDS)}")
+
+
+def storage_for_path(path):
+    """
+    Create the storage backend matching the extension of a file.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        object: The storage backend instance.
+    """
+    extension = os.path.splitext(path)[1]
+    for backend_class in STORAGE_BACKENDS.values():
+        if backend_class.EXTENSION == extension:
+            return backend_class()
+    raise ValueError(f"Unknown file extension: {extension}")
+
+
+def read_recording(path):
+    """
+    Read a recorded file of any supported format into a DataFrame.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        pd.DataFrame: The recorded data.
+    """
+    return storage_for_path(path).read(path)
+
+
+def convert_to_csv(path, csv_path=None):
+    """
+    Convert a recorded file to CSV for offline use.
+
+    Args:
+        path (str): The path of the recorded file.
+        csv_path (str, optional): The output path. Defaults to the input path with a .csv extension.
+
+    Returns:
+        str: The path of the written CSV file.
+    """
+    if csv_path is None:
+        csv_path = os.path.splitext(path)[0] + CsvStorage.EXTENSION
+    CsvStorage().write(csv_path, read_recording(path))
+    return csv_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert recorded measurement files to CSV.")
+    parser.add_argument("paths", nargs="+", help="Recorded files (.bin, .parquet or .chunked)")
+    args = parser.parse_args()
+    for recording_path in args.paths:
+        print(f"Converted {recording_path} -> {convert_to_csv(recording_path)}")
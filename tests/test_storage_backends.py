@@ -0,0 +1,66 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from storage.backends import STORAGE_BACKENDS, create_storage, read_recording
+
+COLUMNS = ["Time", "x", "y"]
+
+
+def make_block(start, rows):
+    time = np.arange(start, start + rows, dtype=np.float64)
+    return np.column_stack((time, time * 2.0, time * 3.0))
+
+
+def storage_or_skip(storage_format):
+    if storage_format == "parquet":
+        pytest.importorskip("pyarrow")
+    return create_storage(storage_format)
+
+
+@pytest.mark.parametrize("storage_format", sorted(STORAGE_BACKENDS))
+def test_append_after_close_all_keeps_previous_rows(tmp_path, storage_format):
+    storage = storage_or_skip(storage_format)
+    path = str(tmp_path / ("recording" + storage.EXTENSION))
+
+    storage.append(path, make_block(0, 5), COLUMNS)
+    storage.close_all()
+    storage.append(path, make_block(5, 3), COLUMNS)
+    storage.append(path, make_block(8, 2), COLUMNS)
+    storage.close_all()
+
+    df = read_recording(path)
+    assert list(df.columns) == COLUMNS
+    np.testing.assert_array_equal(df.to_numpy(), make_block(0, 10))
+
+
+@pytest.mark.parametrize("storage_format", sorted(STORAGE_BACKENDS))
+def test_append_after_file_was_deleted_starts_a_new_file(tmp_path, storage_format):
+    storage = storage_or_skip(storage_format)
+    path = str(tmp_path / ("recording" + storage.EXTENSION))
+
+    storage.append(path, make_block(0, 5), COLUMNS)
+    os.remove(path)
+    storage.append(path, make_block(100, 4), COLUMNS)
+    storage.close_all()
+
+    np.testing.assert_array_equal(read_recording(path).to_numpy(), make_block(100, 4))
+
+
+def test_parquet_append_with_other_columns_keeps_the_file(tmp_path):
+    pytest.importorskip("pyarrow")
+    storage = create_storage("parquet")
+    path = str(tmp_path / "recording.parquet")
+
+    storage.append(path, make_block(0, 5), COLUMNS)
+    storage.close_all()
+    with pytest.raises(ValueError):
+        storage.append(path, make_block(5, 3)[:, :2], COLUMNS[:2])
+
+    assert os.listdir(tmp_path) == ["recording.parquet"]
+    np.testing.assert_array_equal(read_recording(path).to_numpy(), make_block(0, 5))
@@ -0,0 +1,296 @@
+import json
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+import numpy as np
+
+
+def log_bucket_bounds(min_sec=1e-6, max_sec=10.0, buckets_per_decade=10):
+    """
+    Return logarithmically spaced histogram bucket upper bounds.
+
+    Args:
+        min_sec (float, optional): The upper bound of the first bucket in seconds.
+        max_sec (float, optional): The upper bound of the last finite bucket in seconds.
+        buckets_per_decade (int, optional): The number of buckets per factor of ten.
+
+    Returns:
+        list of float: The ascending bucket upper bounds in seconds.
+    """
+    bounds = []
+    bound = min_sec
+    ratio = 10 ** (1 / buckets_per_decade)
+    while bound < max_sec * (1 + 1e-9):
+        bounds.append(bound)
+        bound *= ratio
+    return bounds
+
+
+DEFAULT_BUCKET_BOUNDS = log_bucket_bounds()
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    The buckets are allocated once, so recording a duration is a binary search
+    and an integer increment. Durations above the last bound are counted in an
+    overflow bucket. Percentiles are estimated as the upper bound of the bucket
+    holding the requested rank.
+    """
+
+    def __init__(self, bucket_bounds=DEFAULT_BUCKET_BOUNDS):
+        """
+        Initialize the histogram.
+
+        Args:
+            bucket_bounds (list of float, optional): The ascending bucket upper bounds in seconds.
+        """
+        self.bucket_bounds = list(bucket_bounds)
+        self.counts = [0] * (len(self.bucket_bounds) + 1)  # Last bucket counts overflows
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, duration):
+        """
+        Record one duration.
+
+        Args:
+            duration (float): The duration in seconds.
+        """
+        self.counts[bisect_left(self.bucket_bounds, duration)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def percentile(self, percent):
+        """
+        Estimate a percentile of the recorded durations.
+
+        Args:
+            percent (float): The percentile in [0, 100].
+
+        Returns:
+            float or None: The upper bound of the bucket holding the percentile in
+                seconds (the maximum for the overflow bucket), or None if empty.
+        """
+        if self.count == 0:
+            return None
+        rank = max(1, int(round(self.count * percent / 100)))
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(self.bucket_bounds[index], self.max) if index < len(self.bucket_bounds) else self.max
+        return self.max
+
+    def reset(self):
+        """
+        Clear all recorded durations.
+        """
+        self.counts = [0] * (len(self.bucket_bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def snapshot(self):
+        """
+        Return the statistics of the histogram.
+
+        Returns:
+            dict: Count, mean, p50, p99 and max in seconds, and the non-empty buckets
+                as a mapping of upper bound to count.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max if self.count else None,
+            "buckets": {("inf" if index == len(self.bucket_bounds) else f"{self.bucket_bounds[index]:.3g}"): count
+                        for index, count in enumerate(list(self.counts)) if count},
+        }
+
+
+class Instrumentation:
+    """
+    Per-stage timings and event counters of the measurement loop.
+
+    Stages are timed with perf_counter() spans recorded into latency histograms,
+    and events (missed deadlines, None values, exceptions) are counted. The
+    measurement loop only records; the GUI or the end of the measurement reads
+    a snapshot or dumps it to a file. Use create_instrumentation to obtain a
+    no-op instance when instrumentation is disabled.
+    """
+    enabled = True
+
+    def __init__(self, bucket_bounds=DEFAULT_BUCKET_BOUNDS):
+        """
+        Initialize the instrumentation.
+
+        Args:
+            bucket_bounds (list of float, optional): The bucket upper bounds of every stage histogram in seconds.
+        """
+        self.bucket_bounds = bucket_bounds
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()  # Guards the creation of new stages and counters only
+
+    @staticmethod
+    def now():
+        """
+        Return the current time of the monotonic clock used for spans.
+
+        Returns:
+            float: The perf_counter() time in seconds.
+        """
+        return perf_counter()
+
+    def record(self, stage, start_time):
+        """
+        Record the span of a stage that started at `start_time` and ends now.
+
+        Args:
+            stage (str): The name of the stage.
+            start_time (float): The perf_counter() time at which the stage started.
+
+        Returns:
+            float: The end time of the span, usable as the start time of the next stage.
+        """
+        end_time = perf_counter()
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, LatencyHistogram(self.bucket_bounds))
+        histogram.record(end_time - start_time)
+        return end_time
+
+    def increment(self, counter, value=1):
+        """
+        Increment an event counter.
+
+        Args:
+            counter (str): The name of the counter.
+            value (int, optional): The increment.
+        """
+        if value:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def count_none(self, sample, value_columns=None):
+        """
+        Count the missing values of a sample in the "none_values" counter.
+
+        Args:
+            sample (dict or numpy.ndarray): The sample as a mapping of column to value,
+                or as a float row in which missing values are NaN.
+            value_columns (slice or numpy.ndarray, optional): The sensor value columns of a row,
+                e.g. SampleSchema.data_slice, so that NaN time slots are not counted.
+                Defaults to the whole row.
+        """
+        if isinstance(sample, np.ndarray):
+            if value_columns is not None:
+                sample = sample[value_columns]
+            self.increment("none_values", int(np.count_nonzero(np.isnan(sample))))
+        else:
+            self.increment("none_values", sum(value is None for value in sample.values()))
+
+    def reset(self):
+        """
+        Clear all histograms and counters.
+        """
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def snapshot(self):
+        """
+        Return the current statistics. Safe to call from another thread.
+
+        Returns:
+            dict: {"stages": {stage: histogram statistics}, "counters": {counter: value}}.
+        """
+        with self._lock:
+            histograms = dict(self.histograms)
+        return {
+            "stages": {stage: histogram.snapshot() for stage, histogram in histograms.items()},
+            "counters": dict(self.counters),
+        }
+
+    def dump(self, path):
+        """
+        Write the current statistics to a JSON file.
+
+        Args:
+            path (str): The path of the JSON file.
+        """
+        try:
+            with open(path, "w") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            print(f"Instrumentation was saved to \"{path}\"")
+        except OSError as e:
+            print(f"Could not save instrumentation to {path}: {e}")
+
+    def format_summary(self):
+        """
+        Format the stage statistics as text, one line per stage, followed by the counters.
+
+        Returns:
+            str: The summary.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for stage, stats in snapshot["stages"].items():
+            if stats["count"]:
+                lines.append("{0}: n={1} p50<={2:.1f}us p99<={3:.1f}us max={4:.1f}us".format(
+                    stage, stats["count"], stats["p50"] * 1e6, stats["p99"] * 1e6, stats["max"] * 1e6))
+        if snapshot["counters"]:
+            lines.append(" / ".join(f"{counter}: {value}" for counter, value in snapshot["counters"].items()))
+        return "\n".join(lines)
+
+
+class NullInstrumentation:
+    """
+    Instrumentation with the same interface that records nothing.
+    """
+    enabled = False
+
+    @staticmethod
+    def now():
+        return 0.0
+
+    def record(self, stage, start_time):
+        return 0.0
+
+    def increment(self, counter, value=1):
+        pass
+
+    def count_none(self, sample, value_columns=None):
+        pass
+
+    def reset(self):
+        pass
+
+    def snapshot(self):
+        return {"stages": {}, "counters": {}}
+
+    def dump(self, path):
+        pass
+
+    def format_summary(self):
+        return ""
+
+
+def create_instrumentation(enabled):
+    """
+    Create the instrumentation of the measurement loop.
+
+    Args:
+        enabled (bool): Whether timings and counters are recorded.
+
+    Returns:
+        Instrumentation or NullInstrumentation: The instrumentation.
+    """
+    return Instrumentation() if enabled else NullInstrumentation()
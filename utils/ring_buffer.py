@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+
+class RingBuffer:
+    """
+    Fixed-capacity, column-typed ring buffer for measurement samples.
+
+    The storage is a single pre-allocated (capacity x columns) NumPy array, so
+    appending a sample is O(1) and never allocates. The oldest samples can be
+    obtained as zero-copy views for flushing to disk.
+    """
+
+    def __init__(self, columns, capacity, dtype=np.float64):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            columns (list of str): Column names in storage order.
+            capacity (int): Maximum number of samples held by the buffer.
+            dtype (numpy.dtype, optional): Element type of every column. Defaults to float64.
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be greater than zero.")
+        self.columns = tuple(columns)
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self.column_index = {column: index for index, column in enumerate(self.columns)}
+        self._data = np.full((self.capacity, len(self.columns)), np.nan, dtype=self.dtype)
+        self._start = 0  # Index of the oldest sample
+        self._size = 0  # Number of valid samples
+
+    def __len__(self):
+        return self._size
+
+    def is_full(self):
+        """
+        Check whether the buffer holds `capacity` samples.
+
+        Returns:
+            bool: True if the next append would overwrite the oldest sample.
+        """
+        return self._size == self.capacity
+
+    def append(self, values):
+        """
+        Append one sample to the buffer.
+
+        If the buffer is full, the oldest sample is overwritten.
+
+        Args:
+            values (sequence of float): Values in column order. None is stored as NaN.
+        """
+        row = self._data[(self._start + self._size) % self.capacity]
+        for index, value in enumerate(values):
+            row[index] = np.nan if value is None else value
+        self._advance()
+
+    def append_row(self, row):
+        """
+        Append one sample given as a float row in column order.
+
+        Columns beyond the length of `row` are set to NaN. Unlike append, the
+        row is copied with a single slice assignment, so None values must
+        already have been converted to NaN.
+
+        Args:
+            row (numpy.ndarray): Values of the first len(row) columns.
+        """
+        target = self._data[(self._start + self._size) % self.capacity]
+        n = len(row)
+        target[:n] = row
+        target[n:] = np.nan
+        self._advance()
+
+    def append_dict(self, data):
+        """
+        Append one sample given as a dictionary.
+
+        Columns missing from `data` and None values are stored as NaN. Keys that
+        are not part of the buffer columns are ignored.
+
+        Args:
+            data (dict): Mapping of column name to value.
+        """
+        row = self._data[(self._start + self._size) % self.capacity]
+        row.fill(np.nan)
+        for column, value in data.items():
+            index = self.column_index.get(column)
+            if index is not None and value is not None:
+                row[index] = value
+        self._advance()
+
+    def _advance(self):
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def views(self):
+        """
+        Return zero-copy views of the buffered samples, from oldest to newest.
+
+        Because the data may wrap around the end of the storage array, the
+        samples are returned as up to two contiguous blocks.
+
+        Returns:
+            tuple of numpy.ndarray: Blocks of shape (n, columns) in chronological order.
+        """
+        end = self._start + self._size
+        if end <= self.capacity:
+            return (self._data[self._start:end],)
+        return (self._data[self._start:], self._data[:end - self.capacity])
+
+    def latest(self, n):
+        """
+        Return the newest `n` samples in chronological order.
+
+        Args:
+            n (int): Number of samples to return. Clipped to the number of buffered samples.
+
+        Returns:
+            numpy.ndarray: Array of shape (n, columns). This is a view when the
+                samples are contiguous in storage and a copy otherwise.
+        """
+        n = min(int(n), self._size)
+        first = (self._start + self._size - n) % self.capacity
+        if first + n <= self.capacity:
+            return self._data[first:first + n]
+        return np.concatenate((self._data[first:], self._data[:first + n - self.capacity]))
+
+    def last_row(self):
+        """
+        Return a writable view of the newest sample.
+
+        Returns:
+            numpy.ndarray: View of shape (columns,) into the buffer storage.
+        """
+        if self._size == 0:
+            raise IndexError("The buffer is empty.")
+        return self._data[(self._start + self._size - 1) % self.capacity]
+
+    def consume(self, n):
+        """
+        Drop the oldest `n` samples from the buffer.
+
+        Args:
+            n (int): Number of samples to drop. Clipped to the number of buffered samples.
+        """
+        n = min(int(n), self._size)
+        self._start = (self._start + n) % self.capacity
+        self._size -= n
+        if self._size == 0:
+            self._start = 0
+
+    def clear(self):
+        """
+        Remove all samples from the buffer.
+        """
+        self._start = 0
+        self._size = 0
+
+    def to_numpy(self):
+        """
+        Return a copy of the buffered samples as a single array.
+
+        Returns:
+            numpy.ndarray: Array of shape (len(self), columns) in chronological order.
+        """
+        return np.concatenate(self.views())
+
+    def to_dataframe(self):
+        """
+        Return the buffered samples as a DataFrame.
+
+        Returns:
+            pd.DataFrame: A DataFrame with one column per buffer column.
+        """
+        return pd.DataFrame(self.to_numpy(), columns=list(self.columns))
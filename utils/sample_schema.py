@@ -0,0 +1,91 @@
+from operator import itemgetter
+
+import numpy as np
+
+
+class SampleSchema:
+    """
+    Fixed layout of one measurement sample, compiled once from the sensor columns.
+
+    Every column gets a slot in a float64 row: "Time", then one "Time_<sensor>"
+    slot per sensor if sensor timestamps are enabled, then the data columns of
+    every sensor in sensor order. The columns of a sensor occupy one contiguous
+    slice, so a sensor sample is written into the row with a single slice
+    assignment and no intermediate dictionary. Missing values (None) become NaN.
+    """
+
+    def __init__(self, sensor_columns, is_sensor_timestamps=False):
+        """
+        Compile the schema.
+
+        Args:
+            sensor_columns (dict): Mapping of sensor type to its data columns, in sensor order.
+            is_sensor_timestamps (bool, optional): Whether a "Time_<sensor>" slot is added per sensor.
+        """
+        sensor_columns = {sensor_type: tuple(columns) for sensor_type, columns in sensor_columns.items()}
+        self.time_columns = ("Time",) + (tuple("Time_" + sensor_type for sensor_type in sensor_columns)
+                                         if is_sensor_timestamps else ())
+        self.data_columns = tuple(column for columns in sensor_columns.values() for column in columns)
+        self.columns = self.time_columns + self.data_columns
+        self.dtype = np.dtype(np.float64)
+        self.width = len(self.columns)
+        self.data_start = len(self.time_columns)
+        # The sensor value columns of a row, without the time columns
+        self.data_slice = slice(self.data_start, self.width)
+
+        # sensor type -> (slice of its data columns, its columns, getter of its values, slot of its timestamp or None)
+        self.sensor_slots = {}
+        start = self.data_start
+        for index, (sensor_type, columns) in enumerate(sensor_columns.items()):
+            time_slot = 1 + index if is_sensor_timestamps else None
+            getter = itemgetter(*columns) if columns else None
+            self.sensor_slots[sensor_type] = (slice(start, start + len(columns)), columns, getter, time_slot)
+            start += len(columns)
+
+    def new_row(self):
+        """
+        Allocate a row for this schema.
+
+        Returns:
+            numpy.ndarray: A float64 vector of length `width` filled with NaN.
+        """
+        return np.full(self.width, np.nan, dtype=self.dtype)
+
+    def write(self, row, current_time, sensor_data_dict, sample_timestamps=None, time_origin=None):
+        """
+        Write one sample into a pre-allocated row.
+
+        Args:
+            row (numpy.ndarray): The row to overwrite, of length `width`.
+            current_time (float): The measurement time of the sample.
+            sensor_data_dict (dict): Mapping of sensor type to its sample, either a dictionary
+                keyed by column or a sequence in column order.
+            sample_timestamps (dict, optional): Mapping of sensor type to the perf_counter()
+                time at which its sample was acquired.
+            time_origin (float, optional): The perf_counter() time corresponding to Time == 0.
+
+        Returns:
+            numpy.ndarray: The row.
+        """
+        row[0] = current_time
+        for sensor_type, (columns_slice, columns, getter, time_slot) in self.sensor_slots.items():
+            data = sensor_data_dict.get(sensor_type)
+            if data is None:
+                row[columns_slice] = np.nan
+            elif isinstance(data, dict):
+                # Assigning a sequence to a float slice converts None to NaN
+                try:
+                    row[columns_slice] = getter(data)
+                except (KeyError, TypeError):
+                    row[columns_slice] = [data.get(column) for column in columns]
+            else:
+                row[columns_slice] = data
+            if time_slot is not None:
+                timestamp = None if sample_timestamps is None else sample_timestamps.get(sensor_type)
+                if data is None:
+                    row[time_slot] = np.nan
+                elif timestamp is None or time_origin is None:
+                    row[time_slot] = current_time
+                else:
+                    row[time_slot] = timestamp - time_origin
+        return row
@@ -0,0 +1,241 @@
+import json
+import struct
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+# Header layout: magic, version, number of columns, capacity, schema length,
+# followed by the 64-bit counters updated by the writer.
+SHARED_RING_MAGIC = b"VDDMSHM1"
+SHARED_RING_VERSION = 1
+HEADER_FORMAT = "<8sIIQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+COUNTERS_OFFSET = 64  # Cache-line aligned start of the counters
+WRITE_INDEX = 0  # Total number of samples written
+SEQUENCE = 1  # Seqlock counter, odd while a write is in progress
+N_COUNTERS = 2
+SCHEMA_OFFSET = COUNTERS_OFFSET + N_COUNTERS * 8
+
+_created_names = set()  # Blocks created by writers of this process
+
+
+def _data_offset(schema_length):
+    # The sample area starts on a 64-byte boundary after the schema
+    return (SCHEMA_OFFSET + schema_length + 63) // 64 * 64
+
+
+class SharedRingWriter:
+    """
+    Single-writer ring of float64 samples in shared memory.
+
+    The acquisition side appends samples, and readers in other processes map
+    the same memory with SharedRingReader and read the newest samples as NumPy
+    views without copying or locking. The header holds the column schema, the
+    total number of samples written and a sequence counter that is odd while a
+    write is in progress (seqlock), so readers can detect torn reads.
+    """
+
+    def __init__(self, name, columns, capacity):
+        """
+        Create the shared memory block.
+
+        An existing block with the same name (e.g. left over by a crashed writer)
+        is replaced.
+
+        Args:
+            name (str): The name of the shared memory block.
+            columns (list of str): Column names in storage order.
+            capacity (int): Maximum number of samples held by the ring.
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be greater than zero.")
+        self.name = name
+        self.columns = tuple(columns)
+        self.capacity = int(capacity)
+        schema = json.dumps({"columns": list(self.columns), "dtype": "<f8"}).encode()
+        data_offset = _data_offset(len(schema))
+        size = data_offset + self.capacity * len(self.columns) * 8
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created_names.add(name)
+
+        buf = self.shm.buf
+        struct.pack_into(HEADER_FORMAT, buf, 0, SHARED_RING_MAGIC, SHARED_RING_VERSION,
+                         len(self.columns), self.capacity, len(schema))
+        buf[SCHEMA_OFFSET:SCHEMA_OFFSET + len(schema)] = schema
+        self.counters = np.ndarray((N_COUNTERS,), dtype=np.uint64, buffer=buf, offset=COUNTERS_OFFSET)
+        self.counters[:] = 0
+        self.data = np.ndarray((self.capacity, len(self.columns)), dtype=np.float64, buffer=buf, offset=data_offset)
+        self._write_index = 0
+
+    def append(self, values):
+        """
+        Append one sample.
+
+        Args:
+            values (numpy.ndarray): The sample of shape (columns,) in column order.
+        """
+        counters = self.counters
+        counters[SEQUENCE] += 1
+        self.data[self._write_index % self.capacity] = values
+        self._write_index += 1
+        counters[WRITE_INDEX] = self._write_index
+        counters[SEQUENCE] += 1
+
+    def append_block(self, block):
+        """
+        Append several samples at once.
+
+        Args:
+            block (numpy.ndarray): The samples of shape (n, columns) in column order.
+        """
+        block = block[-self.capacity:]
+        n = len(block)
+        if n == 0:
+            return
+        counters = self.counters
+        counters[SEQUENCE] += 1
+        start = self._write_index % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = block[:first]
+        self.data[:n - first] = block[first:]
+        self._write_index += n
+        counters[WRITE_INDEX] = self._write_index
+        counters[SEQUENCE] += 1
+
+    def close(self, unlink=True):
+        """
+        Release the shared memory block.
+
+        Args:
+            unlink (bool, optional): Whether to destroy the block. Readers that are
+                still attached keep their mapping until they close it.
+        """
+        self.counters = None
+        self.data = None
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            _created_names.discard(self.name)
+
+
+class SharedRingReader:
+    """
+    Reader of a ring created by SharedRingWriter in another process.
+
+    Reading never blocks the writer. latest() returns zero-copy views, which the
+    writer overwrites once it has written `capacity - n` further samples;
+    is_intact() tells whether views obtained earlier are still valid.
+    latest_copy() returns a consistent copy using the sequence counter.
+    """
+
+    def __init__(self, name):
+        """
+        Attach to an existing shared memory block.
+
+        Args:
+            name (str): The name of the shared memory block.
+        """
+        self.name = name
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13, attaching registers the block with the resource tracker,
+            # which would destroy it when this reader exits
+            self.shm = shared_memory.SharedMemory(name=name)
+            if name not in _created_names:  # The writer of this process keeps the registration
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        buf = self.shm.buf
+        magic, version, n_columns, capacity, schema_length = struct.unpack_from(HEADER_FORMAT, buf, 0)
+        if magic != SHARED_RING_MAGIC or version != SHARED_RING_VERSION:
+            self.shm.close()
+            raise ValueError(f"Shared memory block {name} is not a shared ring.")
+        schema = json.loads(bytes(buf[SCHEMA_OFFSET:SCHEMA_OFFSET + schema_length]))
+        self.columns = tuple(schema["columns"])
+        self.column_index = {column: index for index, column in enumerate(self.columns)}
+        self.capacity = capacity
+        self.counters = np.ndarray((N_COUNTERS,), dtype=np.uint64, buffer=buf, offset=COUNTERS_OFFSET)
+        self.data = np.ndarray((capacity, n_columns), dtype=np.float64, buffer=buf,
+                               offset=_data_offset(schema_length))
+        self.data.flags.writeable = False
+
+    def write_index(self):
+        """
+        Return the total number of samples written so far.
+
+        Returns:
+            int: The write index.
+        """
+        return int(self.counters[WRITE_INDEX])
+
+    def latest(self, n):
+        """
+        Return zero-copy views of the newest `n` samples, from oldest to newest.
+
+        Args:
+            n (int): Number of samples. Clipped to the number of available samples.
+
+        Returns:
+            tuple: (blocks, write_index) where blocks are up to two read-only views
+                of shape (k, columns) in chronological order, and write_index is the
+                write index the views were taken at (for is_intact).
+        """
+        write_index = self.write_index()
+        n = min(int(n), write_index, self.capacity)
+        start = (write_index - n) % self.capacity
+        if start + n <= self.capacity:
+            return (self.data[start:start + n],), write_index
+        return (self.data[start:], self.data[:start + n - self.capacity]), write_index
+
+    def is_intact(self, write_index, n):
+        """
+        Check whether views returned by latest(n) at `write_index` were not overwritten yet.
+
+        Args:
+            write_index (int): The write index returned by latest.
+            n (int): The number of samples requested.
+
+        Returns:
+            bool: True if the writer has not reached the viewed samples.
+        """
+        # The writer is about to write the row after the current write index, so one row of margin is kept
+        return self.write_index() - write_index + 1 <= self.capacity - min(n, self.capacity)
+
+    def latest_copy(self, n, retries=10):
+        """
+        Return a consistent copy of the newest `n` samples.
+
+        Args:
+            n (int): Number of samples.
+            retries (int, optional): Number of attempts when a write overlaps the copy.
+
+        Returns:
+            numpy.ndarray or None: Array of shape (n, columns), or None if no
+                consistent copy could be made.
+        """
+        for _ in range(retries):
+            sequence = int(self.counters[SEQUENCE])
+            if sequence % 2:
+                continue  # A write is in progress
+            blocks, write_index = self.latest(n)
+            copy = np.concatenate(blocks) if len(blocks) > 1 else blocks[0].copy()
+            if int(self.counters[SEQUENCE]) == sequence or self.is_intact(write_index, len(copy)):
+                return copy
+        return None
+
+    def close(self):
+        """
+        Detach from the shared memory block.
+        """
+        self.counters = None
+        self.data = None
+        self.shm.close()
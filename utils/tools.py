@@ -1,15 +1,148 @@
+import asyncio
+import time
 from time import perf_counter
-def wait_process(wait_sec):
+
+# Remaining time [s] below which waiting switches from sleeping to spinning
+SPIN_THRESHOLD_SEC = 0.002
+
+
+def wait_process(wait_sec, spin_threshold=SPIN_THRESHOLD_SEC):
     """
     Pauses the execution of the program for the specified number of seconds.
 
-    This function uses a busy-wait loop to delay execution, effectively blocking 
-    the program for the duration of the specified wait time.
+    This function sleeps until shortly before the end of the wait time and then
+    busy-waits for the remaining `spin_threshold` seconds, so it is accurate
+    without keeping a CPU core busy for the whole interval.
 
     Args:
         wait_sec (float): The amount of time, in seconds, to wait before continuing.
+        spin_threshold (float, optional): The time, in seconds, spent busy-waiting at the end.
+    """
+    wait_until(perf_counter() + wait_sec, spin_threshold)
+
+
+def wait_until(deadline, spin_threshold=SPIN_THRESHOLD_SEC):
+    """
+    Blocks until perf_counter() reaches the given deadline.
+
+    Args:
+        deadline (float): The absolute perf_counter() time to wait for.
+        spin_threshold (float, optional): The time, in seconds, spent busy-waiting at the end.
     """
-    until = perf_counter() + wait_sec
-    while perf_counter() < until:
+    remaining = deadline - perf_counter()
+    if remaining > spin_threshold:
+        time.sleep(remaining - spin_threshold)
+    while perf_counter() < deadline:
         pass
-    return
\ No newline at end of file
+
+
+async def wait_until_async(deadline, spin_threshold=SPIN_THRESHOLD_SEC):
+    """
+    Waits until perf_counter() reaches the given deadline without blocking the event loop.
+
+    Args:
+        deadline (float): The absolute perf_counter() time to wait for.
+        spin_threshold (float, optional): The time, in seconds, spent busy-waiting at the end.
+    """
+    remaining = deadline - perf_counter()
+    if remaining > spin_threshold:
+        await asyncio.sleep(remaining - spin_threshold)
+    while perf_counter() < deadline:
+        pass
+
+
+class DeadlineScheduler:
+    """
+    Periodic scheduler based on absolute deadlines.
+
+    The n-th iteration is released at start + n * period, so the execution time
+    of an iteration does not accumulate into drift. When an iteration overruns
+    one or more deadlines, the missed deadlines are counted and skipped.
+    """
+
+    def __init__(self, period, spin_threshold=SPIN_THRESHOLD_SEC):
+        """
+        Initialize the scheduler.
+
+        Args:
+            period (float): The period between two iterations in seconds.
+            spin_threshold (float, optional): The time, in seconds, spent busy-waiting before each deadline.
+        """
+        self.period = period
+        self.spin_threshold = spin_threshold
+        self.start_time = None
+        self.iteration = 0
+        self.missed_deadlines = 0
+
+    def start(self, start_time=None):
+        """
+        Start the schedule.
+
+        Args:
+            start_time (float, optional): The perf_counter() time of the first iteration.
+                                          Defaults to the current time.
+        """
+        self.start_time = perf_counter() if start_time is None else start_time
+        self.iteration = 0
+        self.missed_deadlines = 0
+
+    def set_period(self, period):
+        """
+        Change the period, keeping the current iteration as the new time origin.
+
+        The deadline of the current iteration (computed with the old period) becomes
+        the new origin, so the next deadline comes one new period after it.
+
+        Args:
+            period (float): The new period in seconds.
+        """
+        if self.start_time is not None:
+            self.start_time = self.start_time + self.iteration * self.period
+            self.iteration = 0
+        self.period = period
+
+    def next_deadline(self):
+        """
+        Return the absolute time at which the next iteration is released.
+
+        Returns:
+            float: The perf_counter() time of the next deadline.
+        """
+        return self.start_time + (self.iteration + 1) * self.period
+
+    def _advance(self):
+        if self.start_time is None:
+            self.start()
+        self.iteration += 1
+        deadline = self.start_time + self.iteration * self.period
+        now = perf_counter()
+        missed = 0
+        if now > deadline:
+            # Skip the deadlines that already passed instead of bursting to catch up
+            missed = int((now - deadline) // self.period) + 1
+            self.iteration += missed
+            self.missed_deadlines += missed
+            deadline = self.start_time + self.iteration * self.period
+        return deadline, missed
+
+    def wait_next(self):
+        """
+        Block until the next deadline.
+
+        Returns:
+            int: The number of deadlines missed since the previous call.
+        """
+        deadline, missed = self._advance()
+        wait_until(deadline, self.spin_threshold)
+        return missed
+
+    async def wait_next_async(self):
+        """
+        Wait until the next deadline without blocking the event loop.
+
+        Returns:
+            int: The number of deadlines missed since the previous call.
+        """
+        deadline, missed = self._advance()
+        await wait_until_async(deadline, self.spin_threshold)
+        return missed